@@ -0,0 +1,171 @@
+"""Drawma gallery scraper: message processing, manifest I/O, variants and a full run."""
+import sys
+import time
+
+import pytest
+
+from conftest import project_modules
+
+scrape_gallery, fake_slack, src, derivatives = project_modules(
+    "surreal-prompt-bot", "scrape_gallery", "tests.fake_slack", "src", "src.derivatives"
+)
+
+DAY = 86400
+
+
+@pytest.fixture
+def gallery_src(monkeypatch):
+    """Put the project's src modules back, so the variants process pool can pickle them."""
+    monkeypatch.setitem(sys.modules, "src", src)
+    monkeypatch.setitem(sys.modules, "src.derivatives", derivatives)
+
+
+def _prompts(history: list[dict]) -> list[dict]:
+    return [{"text": m["text"], "ts": m["ts"]} for m in history if m.get("bot_id")]
+
+
+@pytest.fixture(scope="module")
+def images(drawma_history):
+    return scrape_gallery.extract_images_from_messages(drawma_history)
+
+
+@pytest.fixture(scope="module")
+def manifest(images, drawma_history):
+    associated = scrape_gallery.associate_images_with_prompts(images, _prompts(drawma_history))
+    return [
+        {"id": img["file_id"], "filename": f"{img['file_id']}.jpg", "date": "2025-01-01",
+         "prompt": img["prompt"], "artist": img["user"], "width": img["width"],
+         "height": img["height"]}
+        for img in associated
+    ]
+
+
+@pytest.fixture
+def gallery_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_gallery, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(scrape_gallery, "MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr(scrape_gallery, "PROMPTS_PATH", tmp_path / "prompts.json")
+    monkeypatch.setattr(scrape_gallery, "SYNC_STATE_PATH", tmp_path / "sync-state.json")
+    monkeypatch.setattr(scrape_gallery, "USER_CACHE_PATH", tmp_path / "users.json")
+    monkeypatch.setattr(scrape_gallery, "CHANNEL_CACHE_PATH", tmp_path / "channels.json")
+    monkeypatch.setattr(scrape_gallery, "REPORT_PATH", tmp_path / "run-report.json")
+    return tmp_path
+
+
+def test_extract_images_from_messages(benchmark, drawma_history):
+    images = benchmark(scrape_gallery.extract_images_from_messages, drawma_history)
+    assert len(images) > 1000
+
+
+def test_associate_images_with_prompts(benchmark, images, drawma_history):
+    prompts = _prompts(drawma_history)
+    result = benchmark(scrape_gallery.associate_images_with_prompts, images, prompts)
+    assert all(entry["prompt"] for entry in result)
+
+
+def test_filter_new_images(benchmark, images, manifest):
+    new = benchmark(scrape_gallery.filter_new_images, images, manifest[len(manifest) // 2:])
+    assert len(new) == len(manifest) // 2
+
+
+def test_save_manifest(benchmark, manifest, gallery_dir):
+    benchmark(scrape_gallery.save_manifest, list(manifest))
+    assert scrape_gallery.MANIFEST_PATH.exists()
+
+
+def test_load_manifest(benchmark, manifest, gallery_dir):
+    scrape_gallery.save_manifest(list(manifest))
+    loaded = benchmark(scrape_gallery.load_manifest)
+    assert len(loaded) == len(manifest)
+
+
+def test_make_variants(benchmark, tmp_path):
+    """WebP/AVIF variants of one phone-sized drawing, from scratch."""
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "drawing.jpg"
+    noise = Image.effect_noise((3024, 4032), 64)
+    Image.merge("RGB", (noise, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise)).save(source)
+
+    def fresh():
+        for path in (tmp_path / derivatives.VARIANTS_DIR).glob("*"):
+            path.unlink()
+        return (source, "0" * 64, tmp_path), {}
+
+    variants = benchmark.pedantic(derivatives.make_variants, setup=fresh, rounds=3)
+    assert len(variants) == 2 * len(derivatives.WIDTHS)
+
+
+def _replay_fixture(history: list[dict]) -> dict:
+    """Fake Slack fixture from the recorded history, shifted to end today."""
+    shift = (int(time.time()) // DAY - int(float(history[0]["ts"])) // DAY) * DAY
+
+    def moved(msg):
+        msg = {**msg, "ts": f"{float(msg['ts']) + shift:.6f}"}
+        if "thread_ts" in msg:
+            msg["thread_ts"] = f"{float(msg['thread_ts']) + shift:.6f}"
+        return msg
+
+    history = [moved(m) for m in history]
+    top_level = [m for m in history if "thread_ts" not in m]
+    threads = {m["ts"]: [m] for m in top_level}
+    for msg in reversed(history):
+        if "thread_ts" in msg:
+            threads[msg["thread_ts"]].append(msg)
+    for parent, *replies in threads.values():
+        if replies:
+            parent["latest_reply"] = replies[-1]["ts"]
+    files = {
+        f["id"]: {"content": f["id"].encode() * 256, "mimetype": f["mimetype"]}
+        for m in history for f in m.get("files", [])
+    }
+    users = {m["user"]: {"profile": {"display_name": m["user"].lower()}} for m in history}
+    return {
+        "bot_user_id": "UBOT",
+        "channels": [{"id": "C0DRAWMA", "name": "drawma"}],
+        "messages": {"C0DRAWMA": top_level},
+        "replies": {"C0DRAWMA": threads},
+        "users": users,
+        "files": files,
+    }
+
+
+def test_gallery_run_against_fake_slack(benchmark, drawma_history, tmp_path, monkeypatch, gallery_src):
+    """Full scrape_gallery.main(): history, threads, users and downloads."""
+    fixture = _replay_fixture(drawma_history)
+    runs = iter(range(1000))
+
+    def fresh_gallery():
+        out = tmp_path / f"run-{next(runs)}"
+        out.mkdir()
+        monkeypatch.setattr(scrape_gallery, "OUTPUT_DIR", out)
+        monkeypatch.setattr(scrape_gallery, "MANIFEST_PATH", out / "manifest.json")
+        monkeypatch.setattr(scrape_gallery, "PROMPTS_PATH", out / "prompts.json")
+        monkeypatch.setattr(scrape_gallery, "SYNC_STATE_PATH", out / "sync-state.json")
+        monkeypatch.setattr(scrape_gallery, "USER_CACHE_PATH", out / "users.json")
+        monkeypatch.setattr(scrape_gallery, "CHANNEL_CACHE_PATH", out / "channels.json")
+        monkeypatch.setattr(scrape_gallery, "REPORT_PATH", out / "run-report.json")
+        return ([],), {}
+
+    with fake_slack.FakeSlack(fixture) as server:
+        monkeypatch.setenv("SLACK_API_URL", server.api_url)
+        monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-bench")
+        result = benchmark.pedantic(scrape_gallery.main, setup=fresh_gallery, rounds=5)
+
+    assert result == 0
+    assert len(scrape_gallery.load_manifest()) > 0
+
+
+def test_incremental_gallery_run_against_fake_slack(
+    benchmark, drawma_history, gallery_dir, monkeypatch, gallery_src
+):
+    """A daily scrape_gallery.main() after the first: only new history and threads are read."""
+    fixture = _replay_fixture(drawma_history)
+
+    with fake_slack.FakeSlack(fixture) as server:
+        monkeypatch.setenv("SLACK_API_URL", server.api_url)
+        monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-bench")
+        assert scrape_gallery.main([]) == 0
+        result = benchmark.pedantic(scrape_gallery.main, args=([],), rounds=5)
+
+    assert result == 0
+    assert scrape_gallery.load_sync_state()["watermark"] is not None
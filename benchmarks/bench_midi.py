@@ -0,0 +1,95 @@
+"""LLM replies to posts: prompt building, reply parsing and the MIDI pipeline."""
+import copy
+import shutil
+
+import pytest
+
+from conftest import REPO_ROOT, read_fixture, project_modules
+
+midi_bot, midi_generator, midi_config = project_modules(
+    "midi-bot", "bot", "src.generator", "src.config"
+)
+(surreal_generator,) = project_modules("surreal-prompt-bot", "src.generator")
+
+HEADLINES = [f"Headline number {i} about something surprising" for i in range(10)]
+INSPIRATIONS = ["Remedios Varo", "a broken music box"]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return midi_bot._load_catalog()
+
+
+@pytest.fixture(scope="module")
+def midi_params(catalog):
+    return midi_generator.parse_llm_response(read_fixture("llm/midi_params.txt"))
+
+
+def test_surreal_prompt_from_llm_reply(benchmark, monkeypatch):
+    """Template loading, message building and mrkdwn cleanup of a recorded reply."""
+    reply = read_fixture("llm/surreal_prompt.txt").strip()
+    monkeypatch.setattr(surreal_generator, "chat", lambda *args: reply)
+    prompt = benchmark(
+        surreal_generator.generate_prompt, HEADLINES, INSPIRATIONS, "model", 1.0, "hf_token"
+    )
+    assert "<think>" not in prompt
+
+
+def test_music_params_from_llm_reply(benchmark, catalog, monkeypatch):
+    """Prompt building, JSON extraction and validation of a recorded reply."""
+    reply = read_fixture("llm/midi_params.txt").strip()
+    monkeypatch.setattr(midi_generator, "chat", lambda *args: reply)
+    params = benchmark(
+        midi_generator.generate_music_params,
+        HEADLINES, INSPIRATIONS, catalog, "model", 1.0, "hf_token",
+    )
+    assert params["scale"] == "Hirajoshi"
+
+
+def _node_ready() -> bool:
+    return bool(shutil.which("node")) and (
+        REPO_ROOT / "midi-bot" / "node_modules" / "@magenta" / "music"
+    ).is_dir()
+
+
+needs_node = pytest.mark.skipif(
+    not _node_ready(), reason="needs node and `npm ci` in midi-bot"
+)
+
+
+def _song_config(sections: list[str]) -> dict:
+    config = copy.deepcopy(midi_config.DEFAULT_CONFIG)
+    config["song"]["sections"] = sections
+    config["export"]["combined"] = True
+    return config
+
+
+@needs_node
+@pytest.mark.parametrize("sections", [["verse"], ["intro", "verse", "chorus", "verse", "chorus"]],
+                         ids=["1-section", "5-sections"])
+def test_midi_pipeline_stub_rnn(benchmark, catalog, midi_params, sections, tmp_path, monkeypatch):
+    """Node.js generation (one process per song) with the RNNs stubbed out."""
+    monkeypatch.setenv("MIDI_BOT_STUB_RNN", "1")
+    config = _song_config(sections)
+    previews = benchmark.pedantic(
+        midi_bot._generate_files, args=(midi_params, catalog, config, tmp_path / "out"), rounds=5
+    )
+    assert previews == []
+    assert (tmp_path / "out" / "song.mid").exists()
+
+
+@needs_node
+def test_midi_pipeline_stub_rnn_warm_worker(benchmark, catalog, midi_params, tmp_path, monkeypatch):
+    """Same, on a resident generator (--keep-warm), after one warm-up song."""
+    monkeypatch.setenv("MIDI_BOT_STUB_RNN", "1")
+    config = _song_config(["verse"])
+    worker = midi_bot.MidiWorker(REPO_ROOT / "midi-bot" / "generate_midi.js")
+    try:
+        midi_bot._generate_files(midi_params, catalog, config, tmp_path / "warmup", worker)
+        previews = benchmark.pedantic(
+            midi_bot._generate_files,
+            args=(midi_params, catalog, config, tmp_path / "out", worker), rounds=10,
+        )
+    finally:
+        worker.close()
+    assert previews == []
@@ -0,0 +1,30 @@
+"""Headline scraping: parsing recorded homepages for every source."""
+from types import SimpleNamespace
+
+import pytest
+
+from bot_core import scraper
+
+
+@pytest.fixture
+def recorded_get(news_html, monkeypatch):
+    """Serve requests.get from the recorded homepages."""
+    pages = {url: news_html[name] for name, (url, _) in scraper.SOURCES.items()}
+
+    def get(url, **kwargs):
+        html = pages[url]
+        return SimpleNamespace(text=html, content=html.encode(), raise_for_status=lambda: None)
+
+    monkeypatch.setattr("requests.get", get)
+
+
+@pytest.mark.parametrize("source", sorted(scraper.SOURCES))
+def test_parse_source(benchmark, news_html, source):
+    _, parse = scraper.SOURCES[source]
+    headlines = benchmark(parse, news_html[source])
+    assert len(headlines) == 5
+
+
+def test_scrape_all_sources(benchmark, recorded_get):
+    headlines = benchmark(scraper.scrape_all_sources, sorted(scraper.SOURCES))
+    assert len(headlines) == 5 * len(scraper.SOURCES)
@@ -0,0 +1,17 @@
+"""Song title page generation (slack-song-generator)."""
+from conftest import project_modules
+
+(generator,) = project_modules("slack-song-generator", "src.generator")
+
+
+def test_generate_chaos_styles(benchmark, song_titles):
+    config = generator.GeneratorConfig(seed=42)
+    styles = benchmark(generator.generate_chaos_styles, song_titles, config)
+    assert len(styles) == len(song_titles)
+
+
+def test_generate_html(benchmark, song_titles, tmp_path):
+    config = generator.GeneratorConfig(seed=42)
+    output = tmp_path / "index.html"
+    benchmark(generator.generate_html, song_titles, config, output)
+    assert output.stat().st_size > 0
@@ -0,0 +1,63 @@
+"""Shared fixtures: recorded payloads and per-project module loading."""
+import gzip
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Top-level names the projects share (each has its own src and tests package)
+_PROJECT_MODULES = ("src", "tests", "bot", "scrape_gallery")
+
+
+def _is_project_module(name: str) -> bool:
+    return any(name == m or name.startswith(m + ".") for m in _PROJECT_MODULES)
+
+
+def project_modules(project: str, *names: str) -> list:
+    """Import modules (e.g. "bot", "src.generator") from a project directory.
+
+    Each project is imported in isolation: its src/bot modules are loaded
+    fresh and then taken out of sys.modules again, so the projects' src
+    packages don't collide within one benchmark session.
+    """
+    saved = {k: sys.modules.pop(k) for k in list(sys.modules) if _is_project_module(k)}
+    sys.path.insert(0, str(REPO_ROOT / project))
+    try:
+        return [importlib.import_module(name) for name in names]
+    finally:
+        sys.path.remove(str(REPO_ROOT / project))
+        for k in [k for k in sys.modules if _is_project_module(k)]:
+            del sys.modules[k]
+        sys.modules.update(saved)
+
+
+def read_fixture(relative: str) -> str:
+    path = FIXTURES / relative
+    if path.suffix == ".gz":
+        return gzip.decompress(path.read_bytes()).decode()
+    return path.read_text()
+
+
+@pytest.fixture(scope="session")
+def news_html() -> dict[str, str]:
+    """Recorded homepage HTML per news source."""
+    return {
+        path.name.removesuffix(".html.gz"): read_fixture(f"news/{path.name}")
+        for path in sorted((FIXTURES / "news").glob("*.html.gz"))
+    }
+
+
+@pytest.fixture(scope="session")
+def drawma_history() -> list[dict]:
+    """A year of recorded #drawma messages (prompts and drawing replies)."""
+    return json.loads(read_fixture("slack/drawma_history.json.gz"))
+
+
+@pytest.fixture(scope="session")
+def song_titles() -> list[str]:
+    return json.loads(read_fixture("song_titles.json"))
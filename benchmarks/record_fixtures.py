@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""(Re)build the recorded fixtures the benchmarks replay.
+
+By default every fixture is synthesized deterministically, shaped like the
+real payloads: news homepages use each site's markup (the selectors the
+scrapers look for, surrounded by a realistic amount of unrelated markup),
+and the Slack history looks like a year of #drawma (one bot prompt a day,
+drawings posted as replies). With --live the news pages are recorded from
+the real sites instead.
+
+    python record_fixtures.py            # synthesize everything
+    python record_fixtures.py --live     # also record live news HTML
+
+The LLM replies in fixtures/llm/ are hand-written and not touched here.
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+from pathlib import Path
+
+FIXTURES = Path(__file__).parent / "fixtures"
+REPO_ROOT = Path(__file__).parent.parent
+
+WORDS = (
+    "senate markets storm court election rally tariffs drought vaccine strike "
+    "summit inflation border wildfire treaty merger protest budget satellite "
+    "harvest verdict pipeline glacier festival ceasefire recall heatwave "
+    "startup museum orbit referendum flood auction scandal pandemic"
+).split()
+
+# Headline markup per source, matching the selectors in bot_core.scraper
+HEADLINE_MARKUP = {
+    "reuters": '<li><div data-testid="Heading">{}</div></li>',
+    "bbc": '<div class="gs-c-promo"><h3 class="gs-c-promo-heading__title">{}</h3></div>',
+    "cnn": '<div class="card"><span class="container__headline-text">{}</span></div>',
+    "foxnews": '<article><h2 class="title"><a href="/story">{}</a></h2></article>',
+    "ft": '<div class="o-teaser"><a class="js-teaser-heading-link" href="/x">{}</a></div>',
+    "npr": '<article><div class="story-text"><a href="/s"><h3 class="title">{}</h3></a></div></article>',
+    "guardian": '<div class="fc-item"><div class="fc-item__title">{}</div></div>',
+    "breitbart": '<article><h2><a href="/p">{}</a></h2></article>',
+}
+
+# Roughly a homepage's worth of non-headline markup around each headline
+FILLER_BLOCKS = 25
+
+
+def _headline(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(5, 9))
+    return " ".join(words).capitalize()
+
+
+def _filler(rng: random.Random) -> str:
+    items = "".join(
+        f'<li class="nav-item-{i}"><a href="/section/{rng.choice(WORDS)}">{rng.choice(WORDS)}</a></li>'
+        for i in range(8)
+    )
+    return (
+        f'<div class="ad-slot" data-slot="{rng.randint(1, 999)}"><ul>{items}</ul>'
+        f'<p class="summary">{" ".join(rng.choices(WORDS, k=30))}</p>'
+        f'<img src="/img/{rng.randint(1, 10**6)}.jpg" alt="" loading="lazy"></div>'
+    )
+
+
+def synthesize_news(source: str, rng: random.Random, headlines: int = 120) -> str:
+    markup = HEADLINE_MARKUP[source]
+    body = []
+    for _ in range(headlines):
+        body.append(markup.format(_headline(rng)))
+        body.extend(_filler(rng) for _ in range(rng.randint(1, FILLER_BLOCKS // 5)))
+    script = "window.__STATE__ = " + json.dumps({"items": rng.choices(WORDS, k=2000)})
+    return (
+        f"<!DOCTYPE html><html><head><title>{source}</title>"
+        f"<script>{script}</script></head><body><main>{''.join(body)}</main></body></html>"
+    )
+
+
+def record_news(live: bool) -> None:
+    sys.path.insert(0, str(REPO_ROOT / "bot-core"))
+    from bot_core.scraper import HEADERS, SOURCES, TIMEOUT
+
+    news_dir = FIXTURES / "news"
+    news_dir.mkdir(parents=True, exist_ok=True)
+    for source, (url, _) in SOURCES.items():
+        if live:
+            import requests
+
+            resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+            resp.raise_for_status()
+            html = resp.text
+        else:
+            html = synthesize_news(source, random.Random(source))
+        (news_dir / f"{source}.html.gz").write_bytes(gzip.compress(html.encode(), mtime=0))
+        print(f"news/{source}.html.gz: {len(html)} bytes of HTML")
+
+
+def synthesize_drawma_history(rng: random.Random, days: int = 365) -> list[dict]:
+    """conversations_history + replies for a year of #drawma, newest first."""
+    start = 1735689600  # 2025-01-01 00:00 UTC
+    artists = [f"U{n:09d}" for n in range(40)]
+    messages = []
+    for day in range(days):
+        prompt_ts = start + day * 86400 + 15 * 3600
+        messages.append({
+            "type": "message", "user": "UBOT", "bot_id": "B01", "ts": f"{prompt_ts}.000100",
+            "text": f"*Today's prompt:* {_headline(rng)}", "reply_count": 3,
+        })
+        for n in range(rng.randint(1, 5)):
+            ts = prompt_ts + rng.randint(60, 8 * 3600)
+            file_id = f"F{day:04d}{n:02d}{rng.randint(0, 10**5):05d}"
+            ext, mimetype = rng.choice([("jpg", "image/jpeg"), ("png", "image/png")])
+            messages.append({
+                "type": "message", "user": rng.choice(artists), "ts": f"{ts}.000200",
+                "thread_ts": f"{prompt_ts}.000100", "text": "",
+                "files": [{
+                    "id": file_id, "name": f"IMG_{file_id}.{ext}", "mimetype": mimetype,
+                    "url_private_download": f"https://files.slack.com/files-pri/T1-{file_id}/download",
+                    "original_w": rng.choice([3024, 4032]), "original_h": rng.choice([3024, 4032]),
+                }],
+            })
+    messages.sort(key=lambda m: float(m["ts"]), reverse=True)
+    return messages
+
+
+def synthesize_song_titles(rng: random.Random, count: int = 500) -> list[str]:
+    return [" ".join(rng.sample(WORDS, rng.randint(2, 5))).title() for _ in range(count)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild benchmark fixtures")
+    parser.add_argument("--live", action="store_true", help="Record news HTML from the real sites")
+    args = parser.parse_args()
+
+    record_news(args.live)
+
+    slack_dir = FIXTURES / "slack"
+    slack_dir.mkdir(parents=True, exist_ok=True)
+    history = synthesize_drawma_history(random.Random("drawma"))
+    (slack_dir / "drawma_history.json.gz").write_bytes(
+        gzip.compress(json.dumps(history).encode(), mtime=0)
+    )
+    print(f"slack/drawma_history.json.gz: {len(history)} messages")
+
+    titles = synthesize_song_titles(random.Random("songs"))
+    (FIXTURES / "song_titles.json").write_text(json.dumps(titles, indent=1) + "\n")
+    print(f"song_titles.json: {len(titles)} titles")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared building blocks for the Slack bots: config, scraping, sampling, LLM and Slack clients."""
@@ -0,0 +1,85 @@
+"""Configuration loader with YAML support and CLI overrides.
+
+Each bot owns its DEFAULT_CONFIG; this module does the loading and merging.
+"""
+import copy
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def load_config(config_path: Path, defaults: dict[str, Any]) -> dict[str, Any]:
+    """Load config from YAML file, falling back to defaults.
+
+    The result never shares nested dicts with defaults, so overriding a
+    value for one run cannot leak into the next (e.g. under the scheduler).
+    """
+    import yaml
+
+    config = copy.deepcopy(defaults)
+    if config_path.exists():
+        with open(config_path) as f:
+            file_config = yaml.safe_load(f) or {}
+        config = deep_merge(config, file_config)
+    return config
+
+
+def deep_merge(base: dict, override: dict) -> dict:
+    """Deep merge override into base."""
+    result = base.copy()
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = deep_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def merge_cli_args(config: dict[str, Any], args) -> dict[str, Any]:
+    """Merge the CLI arguments every bot shares into config."""
+    if getattr(args, "channel", None):
+        config["slack"]["channel"] = args.channel
+    if getattr(args, "temperature", None) is not None:
+        config["prompt"]["temperature"] = args.temperature
+    if getattr(args, "sources", None):
+        config["sources"] = args.sources.split(",")
+    if getattr(args, "no_inspirations", False):
+        config["inspirations"]["pick_count"] = 0
+    return config
+
+
+def load_bot_config(
+    script_dir: Path,
+    args,
+    defaults: dict[str, Any],
+    merge: Callable[[dict[str, Any], Any], dict[str, Any]] = merge_cli_args,
+) -> tuple[dict[str, Any], Path]:
+    """Load a bot's config file (args.config) with its CLI overrides.
+
+    Both the config file and a relative outbox.path are resolved against
+    script_dir. Returns (config, outbox_path).
+    """
+    config = load_config(script_dir / args.config, defaults)
+    config = merge(config, args)
+    outbox_path = script_dir / Path(config["outbox"]["path"]).expanduser()
+    return config, outbox_path
+
+
+def get_tokens(dry_run: bool) -> tuple[str, str | None] | None:
+    """Read (hf_token, slack_token) from the environment, or None if missing.
+
+    The Slack token is only required when the run will post.
+    """
+    hf_token = os.environ.get("HF_TOKEN")
+    if not hf_token:
+        logger.error("HF_TOKEN environment variable not set")
+        return None
+
+    slack_token = os.environ.get("SLACK_BOT_TOKEN")
+    if not slack_token and not dry_run:
+        logger.error("SLACK_BOT_TOKEN environment variable not set")
+        return None
+    return hf_token, slack_token
@@ -0,0 +1,23 @@
+"""Import-time checks for the bots' tests: what `import <module>` loads and how long it takes."""
+import subprocess
+import sys
+from pathlib import Path
+
+
+def import_times(module: str, cwd: Path) -> dict[str, int]:
+    """Cumulative import time in microseconds per module loaded by `import module`.
+
+    Runs a fresh interpreter with python -X importtime in cwd, so nothing
+    already imported by the caller is counted.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
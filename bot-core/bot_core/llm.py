@@ -0,0 +1,83 @@
+"""Chat-completion client for the Hugging Face Inference API."""
+import logging
+import re
+from pathlib import Path
+
+from bot_core import tracing
+
+logger = logging.getLogger(__name__)
+
+MAX_TOKENS = 1000
+
+
+def load_template(template_path: Path) -> tuple[str, str]:
+    """Load prompt template from file. Returns (system_prompt, user_template)."""
+    if not template_path.exists():
+        raise FileNotFoundError(f"Template file not found: {template_path}")
+
+    content = template_path.read_text()
+    parts = content.split("---", 1)
+
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].strip()
+    else:
+        # No separator, treat whole thing as user template
+        return "", content.strip()
+
+
+def build_messages(system_prompt: str, user_prompt: str) -> list[dict]:
+    """Chat messages for a system prompt (optional) and a user prompt."""
+    logger.debug(f"System prompt:\n{system_prompt}")
+    logger.debug(f"User prompt:\n{user_prompt}")
+
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
+
+
+def strip_think_tags(text: str) -> str:
+    """Remove <think>...</think> blocks (and unclosed ones) that some models emit."""
+    text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL).strip()
+    return re.sub(r'<think>.*', '', text, flags=re.DOTALL).strip()
+
+
+def _reply_text(response) -> str:
+    """The reply text, recording its size and token usage on the current span."""
+    text = response.choices[0].message.content.strip()
+    tracing.add("bytes", len(text.encode()))
+    tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    if isinstance(tokens, int):
+        tracing.add("tokens", tokens)
+    return text
+
+
+def chat(messages: list[dict], model: str, temperature: float, api_key: str) -> str:
+    """Run a chat completion. Returns the reply text, stripped."""
+    from huggingface_hub import InferenceClient
+
+    client = InferenceClient(token=api_key)
+    with tracing.span("llm", model=model):
+        response = client.chat_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS,
+        )
+        return _reply_text(response)
+
+
+async def chat_async(messages: list[dict], model: str, temperature: float, api_key: str) -> str:
+    """Async variant of chat using AsyncInferenceClient."""
+    from huggingface_hub import AsyncInferenceClient
+
+    client = AsyncInferenceClient(token=api_key)
+    with tracing.span("llm", model=model):
+        response = await client.chat_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS,
+        )
+        return _reply_text(response)
@@ -0,0 +1,247 @@
+"""Durable outbox for Slack posts, so a delivery failure never costs a regeneration.
+
+Generated posts are written to a local SQLite database (synchronous=FULL, so
+each commit is fsynced) before any Slack call is made. A drain pass then
+delivers pending entries, recording per-entry progress so that a retry can
+skip the steps that already succeeded. An entry is claimed (status
+'sending') before its handler runs, so overlapping drains, e.g. a --drain
+run next to a scheduled one, never deliver it twice.
+"""
+import inspect
+import json
+import logging
+import sqlite3
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from bot_core import tracing
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+# A claim older than this is assumed to belong to a drain that died mid-delivery
+CLAIM_TIMEOUT = 30 * 60
+
+# handler(payload, progress) -> True once the entry is fully delivered.
+# Handlers may record finished steps in progress; it is persisted either way.
+Handler = Callable[[dict, dict], bool]
+
+# Async drains of the same database take turns, so that bots sharing an event
+# loop never deliver one entry twice. asyncio locks are bound to the loop that
+# first uses them, so each loop gets its own set (a resident worker may call
+# asyncio.run many times).
+_drain_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Path, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@dataclass
+class OutboxEntry:
+    id: str
+    kind: str
+    payload: dict
+    progress: dict = field(default_factory=dict)
+    attempts: int = 0
+    status: str = "pending"
+
+
+class Outbox:
+    """SQLite-backed queue of outbound posts."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS posts (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                progress TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created REAL NOT NULL,
+                claimed REAL
+            )"""
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(posts)")}
+        if "claimed" not in columns:  # outboxes created before claims existed
+            self.conn.execute("ALTER TABLE posts ADD COLUMN claimed REAL")
+        self.conn.commit()
+
+    def enqueue(self, kind: str, payload: dict) -> OutboxEntry:
+        """Durably store a new post. Returns the queued entry."""
+        entry = OutboxEntry(id=uuid.uuid4().hex, kind=kind, payload=payload)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO posts (id, kind, payload, created) VALUES (?, ?, ?, ?)",
+                (entry.id, kind, json.dumps(payload), time.time()),
+            )
+        logger.info(f"Queued {kind} post {entry.id}")
+        return entry
+
+    def get(self, entry_id: str) -> OutboxEntry | None:
+        row = self.conn.execute(
+            "SELECT id, kind, payload, progress, attempts, status FROM posts WHERE id = ?",
+            (entry_id,),
+        ).fetchone()
+        return _to_entry(row) if row else None
+
+    def pending(self) -> list[OutboxEntry]:
+        """Pending entries, oldest first."""
+        rows = self.conn.execute(
+            "SELECT id, kind, payload, progress, attempts, status FROM posts "
+            "WHERE status = 'pending' ORDER BY created"
+        ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def dead(self) -> list[OutboxEntry]:
+        """Entries given up on after max_attempts, oldest first."""
+        rows = self.conn.execute(
+            "SELECT id, kind, payload, progress, attempts, status FROM posts "
+            "WHERE status = 'dead' ORDER BY created"
+        ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def _requeue_stale(self) -> None:
+        """Return entries whose claim timed out to the pending queue."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE posts SET status = 'pending', claimed = NULL "
+                "WHERE status = 'sending' AND claimed < ?",
+                (time.time() - CLAIM_TIMEOUT,),
+            )
+        if cursor.rowcount:
+            logger.warning(f"Requeued {cursor.rowcount} post(s) left in flight by an earlier drain")
+
+    def _claim(self, entry_id: str) -> OutboxEntry | None:
+        """Mark a pending entry as in flight. Returns it, or None if another drain got there first."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE posts SET status = 'sending', claimed = ? "
+                "WHERE id = ? AND status = 'pending'",
+                (time.time(), entry_id),
+            )
+        return self.get(entry_id) if cursor.rowcount == 1 else None
+
+    def _update(self, entry: OutboxEntry, error: str | None = None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE posts SET progress = ?, status = ?, attempts = ?, last_error = ?, "
+                "claimed = NULL WHERE id = ?",
+                (json.dumps(entry.progress), entry.status, entry.attempts, error, entry.id),
+            )
+
+    def _settle(
+        self, entry: OutboxEntry, delivered: bool, error: str | None, max_attempts: int
+    ) -> bool:
+        """Record a delivery attempt. Returns True if the entry is still pending."""
+        pending = False
+        if delivered:
+            entry.status = "sent"
+            logger.info(f"Delivered {entry.kind} post {entry.id}")
+        elif entry.attempts >= max_attempts:
+            entry.status = "dead"
+            logger.error(f"Giving up on {entry.kind} post {entry.id} after {entry.attempts} attempts")
+        else:
+            pending = True
+            entry.status = "pending"
+            logger.warning(f"Delivery of {entry.kind} post {entry.id} failed (attempt {entry.attempts})")
+        self._update(entry, error)
+        return pending
+
+    def drain(self, handlers: dict[str, Handler], max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Try to deliver every pending entry. Returns how many remain pending.
+
+        Entries that fail max_attempts times are marked dead and kept for
+        inspection rather than retried forever. Entries another drain is
+        delivering right now are left to it and not counted.
+        """
+        self._requeue_stale()
+        remaining = 0
+        for entry in self.pending():
+            handler = handlers.get(entry.kind)
+            if handler is None:
+                remaining += 1
+                continue
+            entry = self._claim(entry.id)
+            if entry is None:  # another drain is delivering it
+                continue
+
+            entry.attempts += 1
+            error = None
+            with tracing.span("deliver", kind=entry.kind, attempt=entry.attempts) as span:
+                try:
+                    delivered = handler(entry.payload, entry.progress)
+                except Exception as e:
+                    delivered, error = False, str(e)
+                span.set(delivered=bool(delivered))
+            remaining += self._settle(entry, delivered, error, max_attempts)
+        return remaining
+
+    async def drain_async(
+        self, handlers: dict[str, Callable], max_attempts: int = MAX_ATTEMPTS
+    ) -> int:
+        """Like drain, but handlers may return awaitables (e.g. be coroutines)."""
+        import asyncio
+
+        locks = _drain_locks.setdefault(asyncio.get_running_loop(), {})
+        lock = locks.setdefault(self.path.resolve(), asyncio.Lock())
+        async with lock:
+            self._requeue_stale()
+            remaining = 0
+            for entry in self.pending():
+                handler = handlers.get(entry.kind)
+                if handler is None:
+                    remaining += 1
+                    continue
+                entry = self._claim(entry.id)
+                if entry is None:  # another drain is delivering it
+                    continue
+
+                entry.attempts += 1
+                error = None
+                with tracing.span("deliver", kind=entry.kind, attempt=entry.attempts) as span:
+                    try:
+                        delivered = handler(entry.payload, entry.progress)
+                        if inspect.isawaitable(delivered):
+                            delivered = await delivered
+                    except Exception as e:
+                        delivered, error = False, str(e)
+                    span.set(delivered=bool(delivered))
+                remaining += self._settle(entry, delivered, error, max_attempts)
+            return remaining
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _to_entry(row) -> OutboxEntry:
+    entry_id, kind, payload, progress, attempts, status = row
+    return OutboxEntry(
+        id=entry_id,
+        kind=kind,
+        payload=json.loads(payload),
+        progress=json.loads(progress),
+        attempts=attempts,
+        status=status,
+    )
+
+
+def report_delivery(outbox: Outbox, entry_id: str) -> int:
+    """Log whether a just-queued post went out. Returns the bot's exit code."""
+    if outbox.get(entry_id).status == "sent":
+        logger.info("Successfully posted to Slack!")
+        return 0
+    logger.error("Failed to post to Slack (queued; retry with --drain)")
+    return 1
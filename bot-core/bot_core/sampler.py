@@ -1,4 +1,4 @@
-"""Inspiration sampler - picks random artistic inspirations from text file."""
+"""Inspiration sampler - picks random artistic inspirations (and headlines) for a prompt."""
 import logging
 import random
 from pathlib import Path
@@ -28,3 +28,11 @@ def sample_inspirations(inspirations: list[str], count: int) -> list[str]:
         return inspirations[:]
 
     return random.sample(inspirations, count)
+
+
+def pick_headlines(headlines: list[str], max_headlines: int) -> list[str]:
+    """Pick a random subset of at most max_headlines headlines."""
+    if len(headlines) > max_headlines:
+        headlines = random.sample(headlines, max_headlines)
+    logger.info(f"Using {len(headlines)} headlines")
+    return headlines
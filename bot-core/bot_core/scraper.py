@@ -0,0 +1,202 @@
+"""News headline scrapers for various sources."""
+import logging
+from functools import partial
+from typing import Callable
+
+from bot_core import tracing
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = 10
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; SurrealPromptBot/1.0)"
+}
+
+
+def _soup(html: str):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser")
+
+
+def _parse_reuters(html: str) -> list[str]:
+    """Parse Reuters homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h3, [data-testid='Heading']")[:10]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_bbc(html: str) -> list[str]:
+    """Parse BBC News homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h2, h3")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 15:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_cnn(html: str) -> list[str]:
+    """Parse CNN homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("span.container__headline-text, h3")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_foxnews(html: str) -> list[str]:
+    """Parse Fox News homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h2.title, h3.title, .title a")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_ft(html: str) -> list[str]:
+    """Parse Financial Times homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("a.js-teaser-heading-link, h3")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_npr(html: str) -> list[str]:
+    """Parse NPR homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h2.title, h3.title, .title a, .story-text a")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_guardian(html: str) -> list[str]:
+    """Parse The Guardian homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h3, .fc-item__title")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _parse_breitbart(html: str) -> list[str]:
+    """Parse Breitbart homepage headlines."""
+    soup = _soup(html)
+    headlines = []
+    for el in soup.select("h2 a, h3 a, .title a")[:15]:
+        text = el.get_text(strip=True)
+        if text and len(text) > 10:
+            headlines.append(text)
+    return headlines[:5]
+
+
+def _scrape(url: str, parse: Callable[[str], list[str]]) -> list[str]:
+    import requests
+
+    resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+    resp.raise_for_status()
+    tracing.add("bytes", len(resp.content))
+    return parse(resp.text)
+
+
+SOURCES: dict[str, tuple[str, Callable[[str], list[str]]]] = {
+    "reuters": ("https://www.reuters.com/", _parse_reuters),
+    "bbc": ("https://www.bbc.com/news", _parse_bbc),
+    "cnn": ("https://www.cnn.com/", _parse_cnn),
+    "foxnews": ("https://www.foxnews.com/", _parse_foxnews),
+    "ft": ("https://www.ft.com/", _parse_ft),
+    "npr": ("https://www.npr.org/", _parse_npr),
+    "guardian": ("https://www.theguardian.com/us", _parse_guardian),
+    "breitbart": ("https://www.breitbart.com/", _parse_breitbart),
+}
+
+SCRAPERS: dict[str, Callable[[], list[str]]] = {
+    name: partial(_scrape, url, parse) for name, (url, parse) in SOURCES.items()
+}
+
+
+def scrape_source(source: str) -> list[str]:
+    """Scrape headlines from a single source. Returns empty list on failure."""
+    if source not in SCRAPERS:
+        logger.warning(f"Unknown source: {source}")
+        return []
+
+    with tracing.span("scrape_source", source=source) as span:
+        try:
+            headlines = SCRAPERS[source]()
+        except Exception as e:
+            logger.warning(f"Failed to scrape {source}: {e}")
+            span.set(error=str(e))
+            return []
+        span.set(headlines=len(headlines))
+        return headlines
+
+
+def scrape_all_sources(sources: list[str]) -> list[str]:
+    """Scrape headlines from all specified sources."""
+    all_headlines = []
+    for source in sources:
+        headlines = scrape_source(source)
+        logger.info(f"Scraped {len(headlines)} headlines from {source}")
+        all_headlines.extend(headlines)
+    return all_headlines
+
+
+async def scrape_source_async(session, source: str) -> list[str]:
+    """Async variant of scrape_source using a shared aiohttp session."""
+    import aiohttp
+
+    if source not in SOURCES:
+        logger.warning(f"Unknown source: {source}")
+        return []
+
+    url, parse = SOURCES[source]
+    with tracing.span("scrape_source", source=source) as span:
+        try:
+            async with session.get(
+                url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=TIMEOUT)
+            ) as resp:
+                resp.raise_for_status()
+                html = await resp.text()
+            tracing.add("bytes", len(html.encode()))
+            headlines = parse(html)
+        except Exception as e:
+            logger.warning(f"Failed to scrape {source}: {e}")
+            span.set(error=str(e))
+            return []
+        span.set(headlines=len(headlines))
+        return headlines
+
+
+async def scrape_all_sources_async(sources: list[str]) -> list[str]:
+    """Scrape all sources concurrently. Headlines keep the order of sources."""
+    import asyncio
+
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(
+            *(scrape_source_async(session, source) for source in sources)
+        )
+    all_headlines = []
+    for source, headlines in zip(sources, results):
+        logger.info(f"Scraped {len(headlines)} headlines from {source}")
+        all_headlines.extend(headlines)
+    return all_headlines
@@ -0,0 +1,197 @@
+"""Rate-limit-aware wrapper around slack_sdk's WebClient.
+
+Throttles each API method with a token bucket sized to its Slack rate-limit
+tier, and sleeps for Retry-After when Slack still answers 429 ratelimited.
+Works with both WebClient and AsyncWebClient.
+"""
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from bot_core import tracing
+
+if TYPE_CHECKING:
+    from slack_sdk.errors import SlackApiError
+
+logger = logging.getLogger(__name__)
+
+# Requests per minute for each Slack rate-limit tier
+TIER_1, TIER_2, TIER_3, TIER_4 = 1, 20, 50, 100
+
+METHOD_RATES = {
+    "auth_test": TIER_4,
+    "chat_postMessage": 60,  # special tier: ~1 message/second per channel
+    "conversations_history": TIER_3,
+    "conversations_info": TIER_3,
+    "conversations_list": TIER_2,
+    "conversations_replies": TIER_3,
+    "files_info": TIER_4,
+    "files_upload_v2": TIER_2,
+    "users_info": TIER_4,
+    "users_list": TIER_2,
+}
+DEFAULT_RATE = TIER_2
+
+MAX_RETRIES = 5
+
+DEFAULT_API_URL = "https://slack.com/api/"
+
+
+def api_base_url() -> str:
+    """Slack Web API base URL; SLACK_API_URL overrides it (e.g. a local fake)."""
+    return os.environ.get("SLACK_API_URL", DEFAULT_API_URL)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() returns seconds the caller must wait."""
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve a token even if it is not there yet; the deficit is the wait
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimitedClient:
+    """Proxy for a WebClient that throttles API calls per method.
+
+    Any attribute that is not an API method is passed straight through.
+    Coroutine methods (AsyncWebClient) are wrapped so that waits use
+    async_sleep (asyncio.sleep by default) instead of blocking the event loop. Time spent waiting is
+    recorded per method in ``stats``.
+    """
+
+    def __init__(
+        self,
+        client,
+        rates: dict[str, int] | None = None,
+        max_retries: int = MAX_RETRIES,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.rates = {**METHOD_RATES, **(rates or {})}
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.clock = clock
+        self.buckets: dict[str, TokenBucket] = {}
+        self.stats: dict[str, dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, method: str) -> TokenBucket:
+        with self.lock:
+            if method not in self.buckets:
+                rate = self.rates.get(method, DEFAULT_RATE)
+                self.buckets[method] = TokenBucket(rate, self.clock)
+                self.stats[method] = {"calls": 0, "retries": 0, "throttled_seconds": 0.0}
+            return self.buckets[method]
+
+    def _record(self, method: str, key: str, amount: float) -> None:
+        with self.lock:
+            self.stats[method][key] += amount
+
+    def _wait(self, method: str, seconds: float) -> None:
+        if seconds > 0:
+            self._record(method, "throttled_seconds", seconds)
+            self.sleep(seconds)
+
+    async def _await(self, method: str, seconds: float) -> None:
+        if seconds > 0:
+            self._record(method, "throttled_seconds", seconds)
+            if self.async_sleep is None:
+                import asyncio
+
+                self.async_sleep = asyncio.sleep
+            await self.async_sleep(seconds)
+
+    def _retry_delay(self, method: str, error: "SlackApiError") -> float:
+        retry_after = _retry_after(error)
+        logger.warning(f"{method} rate limited, retrying in {retry_after}s")
+        self._record(method, "retries", 1)
+        tracing.add("retries")
+        return retry_after
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """Call a WebClient method, throttled and retried on ratelimited."""
+        from slack_sdk.errors import SlackApiError
+
+        bucket = self._bucket(method)
+        func = getattr(self.client, method)
+        for attempt in range(self.max_retries + 1):
+            self._wait(method, bucket.acquire())
+            self._record(method, "calls", 1)
+            try:
+                return func(*args, **kwargs)
+            except SlackApiError as e:
+                if not _is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self._wait(method, self._retry_delay(method, e))
+
+    async def acall(self, method: str, *args, **kwargs) -> Any:
+        """Await an AsyncWebClient method, throttled and retried on ratelimited."""
+        from slack_sdk.errors import SlackApiError
+
+        bucket = self._bucket(method)
+        func = getattr(self.client, method)
+        for attempt in range(self.max_retries + 1):
+            await self._await(method, bucket.acquire())
+            self._record(method, "calls", 1)
+            try:
+                return await func(*args, **kwargs)
+            except SlackApiError as e:
+                if not _is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                await self._await(method, self._retry_delay(method, e))
+
+    @property
+    def throttled_seconds(self) -> float:
+        """Total time spent waiting on rate limits, across all methods."""
+        return sum(s["throttled_seconds"] for s in self.stats.values())
+
+    def log_stats(self) -> None:
+        """Log call counts and throttling time per method."""
+        for method, s in sorted(self.stats.items()):
+            logger.info(
+                f"Slack {method}: {int(s['calls'])} calls, {int(s['retries'])} retries, "
+                f"{s['throttled_seconds']:.1f}s throttled"
+            )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        if inspect.iscoroutinefunction(attr):
+            return lambda *args, **kwargs: self.acall(name, *args, **kwargs)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+
+def _is_rate_limited(error: "SlackApiError") -> bool:
+    response = error.response
+    if response is None:
+        return False
+    return response.status_code == 429 or response.get("error") == "ratelimited"
+
+
+def _retry_after(error: "SlackApiError") -> float:
+    headers = getattr(error.response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(1.0, float(value))
+    except (TypeError, ValueError):
+        return 1.0
@@ -0,0 +1,255 @@
+"""Timing spans and a JSON run report for bot runs.
+
+A run is a tree of spans, one per pipeline stage:
+
+    with tracing.run("surreal-prompt-bot", report_path) as root:
+        with tracing.span("scrape", sources=8):
+            ...
+            tracing.add("bytes", len(resp.content))
+
+Spans nest through a context variable, so they work across asyncio tasks
+and asyncio.to_thread. Counters added with no open span (e.g. from a plain
+worker thread) go to the root span of the active run. Outside a run,
+span() and add() cost next to nothing and record nothing.
+
+When the run ends, the report (durations, counters such as bytes and
+retries, per-span attributes) is written as JSON and, if an endpoint is
+configured, exported as OTLP/HTTP JSON to a collector.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+OTLP_TIMEOUT = 5
+
+_current: ContextVar["Span | None"] = ContextVar("bot_core_span", default=None)
+_active_run: "Span | None" = None
+
+
+class Span:
+    """One timed stage of a run, with attributes, counters and child spans."""
+
+    def __init__(self, name: str, parent: "Span | None" = None, **attributes: Any):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes: dict[str, Any] = dict(attributes)
+        self.counters: dict[str, int] = {}
+        self.children: list[Span] = []
+        self.error: str | None = None
+        self.start_time = time.time()
+        self.end_time: float | None = None
+        self._start = time.perf_counter()
+        self.duration: float | None = None
+        self._lock = threading.Lock()
+        if parent is not None:
+            with parent._lock:
+                parent.children.append(self)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.duration = time.perf_counter() - self._start
+        self.end_time = self.start_time + self.duration
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def totals(self) -> dict[str, int]:
+        """Counters summed over this span and all its descendants."""
+        totals = dict(self.counters)
+        for child in self.children:
+            for key, value in child.totals().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "duration_s": round(self.duration, 4) if self.duration is not None else None,
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.counters:
+            data["counters"] = self.counters
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a stage as a child of the current span."""
+    parent = _current.get() or _active_run
+    current = Span(name, parent, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current.reset(token)
+
+
+def add(counter: str, amount: int = 1) -> None:
+    """Add to a counter (e.g. "bytes", "retries") on the current span."""
+    current = _current.get() or _active_run
+    if current is not None:
+        current.add(counter, amount)
+
+
+def current_span() -> Span | None:
+    return _current.get() or _active_run
+
+
+@contextmanager
+def run(
+    name: str,
+    report_path: Path | None = None,
+    otlp_endpoint: str | None = None,
+    **attributes: Any,
+) -> Iterator[Span]:
+    """Trace one bot run; write the report (and export OTLP) when it ends.
+
+    otlp_endpoint defaults to $OTEL_EXPORTER_OTLP_ENDPOINT. Failing to write
+    or export the report is logged and never fails the run.
+    """
+    global _active_run
+
+    root = Span(name, **attributes)
+    token = _current.set(root)
+    previous, _active_run = _active_run, root
+    try:
+        yield root
+    except BaseException as e:
+        root.finish(e)
+        raise
+    else:
+        root.finish()
+    finally:
+        _current.reset(token)
+        _active_run = previous
+        _log_summary(root)
+        if report_path is not None:
+            try:
+                write_report(root, report_path)
+            except OSError as e:
+                logger.warning(f"Could not write run report: {e}")
+        endpoint = otlp_endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+        if endpoint:
+            try:
+                export_otlp(root, endpoint)
+            except Exception as e:
+                logger.warning(f"Could not export run trace to {endpoint}: {e}")
+
+
+def bot_run(name: str, args, config: dict[str, Any], **attributes: Any):
+    """Trace one bot run, configured from the bot's "report" config and CLI args.
+
+    --report overrides report.path; the run records whether it was a dry run
+    and whether it ran on asyncio, plus any extra attributes.
+    """
+    report_path = getattr(args, "report", None) or config["report"]["path"]
+    return run(
+        name,
+        report_path=Path(report_path).expanduser(),
+        otlp_endpoint=config["report"]["otlp_endpoint"],
+        dry_run=bool(args.dry_run),
+        mode="async" if getattr(args, "use_async", False) else "sync",
+        **attributes,
+    )
+
+
+def report(root: Span) -> dict[str, Any]:
+    """The JSON run report for a finished run."""
+    return {
+        "run": root.name,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(root.start_time)),
+        "duration_s": round(root.duration or 0.0, 4),
+        "totals": root.totals(),
+        "spans": root.to_dict(),
+    }
+
+
+def write_report(root: Span, path: Path) -> None:
+    """Write the run report as JSON, replacing any previous one atomically."""
+    import json
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report(root), indent=2) + "\n")
+    tmp.replace(path)
+    logger.info(f"Run report written to {path}")
+
+
+def _log_summary(root: Span) -> None:
+    stages = ", ".join(f"{child.name} {child.duration:.2f}s" for child in root.children
+                       if child.duration is not None)
+    logger.info(f"{root.name} took {root.duration or 0.0:.2f}s ({stages or 'no stages'})")
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_spans(current: Span) -> Iterator[dict[str, Any]]:
+    attributes = {**current.attributes, **current.counters}
+    data = {
+        "traceId": current.trace_id,
+        "spanId": current.span_id,
+        "name": current.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(int(current.start_time * 1e9)),
+        "endTimeUnixNano": str(int((current.end_time or current.start_time) * 1e9)),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+        # STATUS_CODE_OK / STATUS_CODE_ERROR
+        "status": {"code": 2, "message": current.error} if current.error else {"code": 1},
+    }
+    if current.parent is not None:
+        data["parentSpanId"] = current.parent.span_id
+    yield data
+    for child in current.children:
+        yield from _otlp_spans(child)
+
+
+def export_otlp(root: Span, endpoint: str) -> None:
+    """POST the run's spans to an OTLP/HTTP collector (JSON encoding)."""
+    import requests
+
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": root.name}},
+        ]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": list(_otlp_spans(root)),
+        }],
+    }]}
+    url = endpoint.rstrip("/")
+    if not url.endswith("/v1/traces"):
+        url += "/v1/traces"
+    resp = requests.post(url, json=payload, timeout=OTLP_TIMEOUT)
+    resp.raise_for_status()
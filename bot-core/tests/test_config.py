@@ -0,0 +1,60 @@
+"""Tests for the shared config loader."""
+from argparse import Namespace
+from pathlib import Path
+
+from bot_core.config import deep_merge, get_tokens, load_bot_config, load_config, merge_cli_args
+
+DEFAULTS = {
+    "slack": {"channel": "#general"},
+    "prompt": {"temperature": 1.0, "model": "m"},
+    "inspirations": {"pick_count": 2},
+    "sources": ["bbc"],
+}
+
+
+def test_load_config_merges_file_over_defaults(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("prompt:\n  temperature: 0.5\n")
+
+    config = load_config(path, DEFAULTS)
+
+    assert config["prompt"] == {"temperature": 0.5, "model": "m"}
+    assert config["slack"]["channel"] == "#general"
+
+
+def test_load_config_does_not_share_defaults():
+    """Overriding one run's config must not leak into the defaults."""
+    config = load_config(Path("/nonexistent/config.yaml"), DEFAULTS)
+    merge_cli_args(config, Namespace(channel="#other", temperature=None,
+                                     sources=None, no_inspirations=True))
+
+    assert DEFAULTS["slack"]["channel"] == "#general"
+    assert DEFAULTS["inspirations"]["pick_count"] == 2
+    assert load_config(Path("/nonexistent/config.yaml"), DEFAULTS) == DEFAULTS
+
+
+def test_deep_merge_replaces_lists_and_scalars():
+    merged = deep_merge({"a": {"b": 1, "c": [1]}}, {"a": {"c": [2]}, "d": 3})
+    assert merged == {"a": {"b": 1, "c": [2]}, "d": 3}
+
+
+def test_load_bot_config_resolves_paths_against_the_bot(tmp_path):
+    (tmp_path / "config.yaml").write_text("outbox:\n  path: state/outbox.db\n")
+    args = Namespace(config="config.yaml", channel="#other", temperature=None,
+                     sources=None, no_inspirations=False)
+
+    config, outbox_path = load_bot_config(tmp_path, args, DEFAULTS)
+
+    assert config["slack"]["channel"] == "#other"
+    assert outbox_path == tmp_path / "state" / "outbox.db"
+
+
+def test_get_tokens_needs_slack_token_only_to_post(monkeypatch):
+    monkeypatch.setenv("HF_TOKEN", "hf")
+    monkeypatch.delenv("SLACK_BOT_TOKEN", raising=False)
+
+    assert get_tokens(dry_run=True) == ("hf", None)
+    assert get_tokens(dry_run=False) is None
+
+    monkeypatch.delenv("HF_TOKEN")
+    assert get_tokens(dry_run=True) is None
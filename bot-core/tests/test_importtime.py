@@ -0,0 +1,12 @@
+"""Tests for the -X importtime helper."""
+from bot_core.importtime import import_times
+
+
+def test_import_times_lists_loaded_modules(tmp_path):
+    (tmp_path / "light.py").write_text("import json\n")
+
+    times = import_times("light", tmp_path)
+
+    assert times["light"] >= times["json"] > 0
+    assert "bot_core" not in times
+
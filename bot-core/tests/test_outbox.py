@@ -0,0 +1,178 @@
+"""Tests for the durable Slack outbox."""
+import asyncio
+import time
+
+import pytest
+
+from bot_core.outbox import CLAIM_TIMEOUT, Outbox, report_delivery
+
+
+def test_enqueue_persists_across_instances(tmp_path):
+    """Queued posts survive reopening the database."""
+    Outbox(tmp_path / "outbox.db").enqueue("prompt", {"message": "hi"})
+
+    pending = Outbox(tmp_path / "outbox.db").pending()
+    assert len(pending) == 1
+    assert pending[0].kind == "prompt"
+    assert pending[0].payload == {"message": "hi"}
+
+
+def test_drain_marks_delivered_entries_sent(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("prompt", {"message": "hi"})
+
+    remaining = outbox.drain({"prompt": lambda payload, progress: True})
+
+    assert remaining == 0
+    assert outbox.get(entry.id).status == "sent"
+
+
+def test_drain_keeps_failures_pending_with_progress(tmp_path):
+    """Failed entries stay pending and keep the progress the handler recorded."""
+    outbox = Outbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("midi", {"channel": "#test"})
+
+    def handler(payload, progress):
+        progress["thread_ts"] = "123.456"
+        raise RuntimeError("slack down")
+
+    assert outbox.drain({"midi": handler}) == 1
+    stored = outbox.get(entry.id)
+    assert stored.status == "pending"
+    assert stored.attempts == 1
+    assert stored.progress == {"thread_ts": "123.456"}
+
+
+def test_drain_gives_up_after_max_attempts(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("prompt", {"message": "hi"})
+
+    for _ in range(3):
+        outbox.drain({"prompt": lambda payload, progress: False}, max_attempts=3)
+
+    assert outbox.get(entry.id).status == "dead"
+    assert outbox.pending() == []
+
+
+def test_overlapping_drains_deliver_once(tmp_path):
+    """A second drain (e.g. another process) skips entries already in flight."""
+    outbox = Outbox(tmp_path / "outbox.db")
+    entry = outbox.enqueue("prompt", {"message": "hi"})
+    delivered = []
+
+    def deliver(payload, progress):
+        # Runs while this drain holds the claim
+        other = Outbox(tmp_path / "outbox.db")
+        assert other.drain({"prompt": deliver}) == 0
+        delivered.append(payload["message"])
+        return True
+
+    assert outbox.drain({"prompt": deliver}) == 0
+    assert delivered == ["hi"]
+    assert outbox.get(entry.id).status == "sent"
+
+
+def test_drain_requeues_stale_claims(tmp_path):
+    """Entries left in flight by a drain that died are retried after CLAIM_TIMEOUT."""
+    outbox = Outbox(tmp_path / "outbox.db")
+    stale = outbox.enqueue("prompt", {"message": "stale"})
+    fresh = outbox.enqueue("prompt", {"message": "fresh"})
+    with outbox.conn:
+        outbox.conn.execute(
+            "UPDATE posts SET status = 'sending', claimed = ? WHERE id = ?",
+            (time.time() - CLAIM_TIMEOUT - 1, stale.id),
+        )
+        outbox.conn.execute(
+            "UPDATE posts SET status = 'sending', claimed = ? WHERE id = ?", (time.time(), fresh.id)
+        )
+
+    assert outbox.drain({"prompt": lambda payload, progress: True}) == 0
+    assert outbox.get(stale.id).status == "sent"
+    assert outbox.get(fresh.id).status == "sending"
+
+
+def test_drain_skips_unknown_kinds(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    outbox.enqueue("other", {})
+
+    assert outbox.drain({"prompt": lambda payload, progress: True}) == 1
+    assert outbox.pending()[0].attempts == 0
+
+
+def test_drain_async_awaits_coroutine_handlers(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    sent = outbox.enqueue("prompt", {"message": "hi"})
+    failed = outbox.enqueue("midi", {})
+
+    async def deliver(payload, progress):
+        return True
+
+    async def fail(payload, progress):
+        raise RuntimeError("slack down")
+
+    remaining = asyncio.run(outbox.drain_async({"prompt": deliver, "midi": fail}))
+
+    assert remaining == 1
+    assert outbox.get(sent.id).status == "sent"
+    assert outbox.get(failed.id).attempts == 1
+
+
+def test_concurrent_async_drains_deliver_once(tmp_path):
+    """Two bots draining the same outbox on one loop never double-post."""
+    Outbox(tmp_path / "outbox.db").enqueue("prompt", {"message": "hi"})
+    delivered = []
+
+    async def deliver(payload, progress):
+        await asyncio.sleep(0.01)
+        delivered.append(payload["message"])
+        return True
+
+    async def both():
+        await asyncio.gather(
+            Outbox(tmp_path / "outbox.db").drain_async({"prompt": deliver}),
+            Outbox(tmp_path / "outbox.db").drain_async({"prompt": deliver}),
+        )
+
+    asyncio.run(both())
+    assert delivered == ["hi"]
+
+
+def test_async_drains_work_across_event_loops(tmp_path):
+    """A resident worker can drain under asyncio.run again and again."""
+    delivered = []
+
+    async def deliver(payload, progress):
+        await asyncio.sleep(0.01)
+        delivered.append(payload["message"])
+        return True
+
+    async def both():
+        await asyncio.gather(
+            Outbox(tmp_path / "outbox.db").drain_async({"prompt": deliver}),
+            Outbox(tmp_path / "outbox.db").drain_async({"prompt": deliver}),
+        )
+
+    for message in ("first", "second"):
+        Outbox(tmp_path / "outbox.db").enqueue("prompt", {"message": message})
+        asyncio.run(both())
+    assert delivered == ["first", "second"]
+
+
+def test_report_delivery_exit_codes(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    sent = outbox.enqueue("prompt", {"message": "hi"})
+    outbox.drain({"prompt": lambda payload, progress: True})
+    failed = outbox.enqueue("prompt", {"message": "again"})
+    outbox.drain({"prompt": lambda payload, progress: False})
+
+    assert report_delivery(outbox, sent.id) == 0
+    assert report_delivery(outbox, failed.id) == 1
+
+
+def test_dead_lists_given_up_entries(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    dead = outbox.enqueue("prompt", {"message": "hi"})
+    outbox.drain({"prompt": lambda payload, progress: False}, max_attempts=1)
+    outbox.enqueue("prompt", {"message": "again"})
+
+    assert [entry.id for entry in outbox.dead()] == [dead.id]
@@ -4,7 +4,7 @@ from pathlib import Path
 
 import pytest
 
-from src.sampler import load_inspirations, sample_inspirations
+from bot_core.sampler import load_inspirations, pick_headlines, sample_inspirations
 
 
 def test_load_inspirations_from_file():
@@ -42,3 +42,9 @@ def test_sample_inspirations_zero_count():
     """Returns empty list for zero count."""
     sampled = sample_inspirations(["a", "b", "c"], count=0)
     assert sampled == []
+
+
+def test_pick_headlines_caps_the_count():
+    headlines = [f"h{i}" for i in range(10)]
+    assert len(pick_headlines(headlines, 3)) == 3
+    assert pick_headlines(headlines[:2], 3) == ["h0", "h1"]
@@ -3,7 +3,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from src.scraper import scrape_source, scrape_all_sources, SCRAPERS
+from bot_core.scraper import scrape_source, scrape_all_sources, SCRAPERS
 
 
 def test_scrape_source_returns_headlines():
@@ -12,7 +12,7 @@ def test_scrape_source_returns_headlines():
     mock_response.text = "<html><h3>This is a test headline that is long enough</h3><h3>Another story headline here</h3></html>"
     mock_response.raise_for_status = MagicMock()
 
-    with patch("src.scraper.requests.get", return_value=mock_response):
+    with patch("requests.get", return_value=mock_response):
         headlines = scrape_source("reuters")
 
     assert isinstance(headlines, list)
@@ -22,7 +22,7 @@ def test_scrape_source_returns_headlines():
 
 def test_scrape_source_handles_failure():
     """Scraper returns empty list on failure, doesn't crash."""
-    with patch("src.scraper.requests.get", side_effect=Exception("Network error")):
+    with patch("requests.get", side_effect=Exception("Network error")):
         headlines = scrape_source("reuters")
 
     assert headlines == []
@@ -30,7 +30,7 @@ def test_scrape_source_handles_failure():
 
 def test_scrape_all_sources_aggregates():
     """Scrape all combines headlines from multiple sources."""
-    with patch("src.scraper.scrape_source") as mock_scrape:
+    with patch("bot_core.scraper.scrape_source") as mock_scrape:
         mock_scrape.side_effect = [
             ["Headline 1", "Headline 2"],
             ["Headline 3"],
@@ -47,3 +47,20 @@ def test_all_sources_have_scrapers():
     default_sources = ["reuters", "foxnews", "cnn", "bbc", "ft", "npr", "guardian", "breitbart"]
     for source in default_sources:
         assert source in SCRAPERS, f"Missing scraper for {source}"
+
+
+def test_scrape_all_sources_async_keeps_source_order():
+    """Async scraping runs sources concurrently but aggregates in order."""
+    import asyncio
+
+    from bot_core.scraper import scrape_all_sources_async
+
+    async def fake_scrape(session, source):
+        # Later sources finish first
+        await asyncio.sleep({"reuters": 0.02, "bbc": 0.01, "cnn": 0}[source])
+        return [f"{source} headline"] if source != "cnn" else []
+
+    with patch("bot_core.scraper.scrape_source_async", side_effect=fake_scrape):
+        headlines = asyncio.run(scrape_all_sources_async(["reuters", "bbc", "cnn"]))
+
+    assert headlines == ["reuters headline", "bbc headline"]
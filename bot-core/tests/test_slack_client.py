@@ -0,0 +1,126 @@
+"""Tests for the rate-limit-aware Slack client wrapper."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from bot_core.slack_client import RateLimitedClient, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _ratelimited_error(retry_after="3"):
+    response = MagicMock()
+    response.status_code = 429
+    response.headers = {"Retry-After": retry_after}
+    response.get.return_value = "ratelimited"
+    return SlackApiError("ratelimited", response)
+
+
+def test_token_bucket_allows_burst_then_waits():
+    """A full bucket serves its capacity immediately, then paces calls."""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)  # 1 token/second
+
+    waits = [bucket.acquire() for _ in range(60)]
+    assert all(w == 0 for w in waits)
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert bucket.acquire() == pytest.approx(2.0)
+
+
+def test_passes_calls_through():
+    """API methods are forwarded with their arguments and results."""
+    inner = MagicMock()
+    inner.users_info.return_value = {"user": {"id": "U1"}}
+    client = RateLimitedClient(inner)
+
+    assert client.users_info(user="U1") == {"user": {"id": "U1"}}
+    inner.users_info.assert_called_once_with(user="U1")
+    assert client.stats["users_info"]["calls"] == 1
+
+
+def test_retries_after_ratelimited():
+    """A 429 sleeps for Retry-After and retries the call."""
+    clock = FakeClock()
+    inner = MagicMock()
+    inner.conversations_history.side_effect = [_ratelimited_error("3"), {"messages": []}]
+    client = RateLimitedClient(inner, sleep=clock.sleep, clock=clock)
+
+    assert client.conversations_history(channel="C1") == {"messages": []}
+    assert inner.conversations_history.call_count == 2
+    assert client.stats["conversations_history"]["retries"] == 1
+    assert client.throttled_seconds == pytest.approx(3.0)
+
+
+def test_gives_up_after_max_retries():
+    """Persistent rate limiting eventually re-raises."""
+    clock = FakeClock()
+    inner = MagicMock()
+    inner.users_info.side_effect = _ratelimited_error("1")
+    client = RateLimitedClient(inner, max_retries=2, sleep=clock.sleep, clock=clock)
+
+    with pytest.raises(SlackApiError):
+        client.users_info(user="U1")
+    assert inner.users_info.call_count == 3
+
+
+def test_other_errors_are_not_retried():
+    """Non-rate-limit API errors propagate immediately."""
+    response = MagicMock()
+    response.status_code = 200
+    response.get.return_value = "channel_not_found"
+    inner = MagicMock()
+    inner.chat_postMessage.side_effect = SlackApiError("channel_not_found", response)
+    client = RateLimitedClient(inner)
+
+    with pytest.raises(SlackApiError):
+        client.chat_postMessage(channel="#nope", text="hi")
+    assert inner.chat_postMessage.call_count == 1
+
+
+def test_throttles_to_method_tier():
+    """Calls beyond a method's burst are paced by its tier rate."""
+    clock = FakeClock()
+    inner = MagicMock()
+    client = RateLimitedClient(inner, rates={"conversations_list": 2},
+                               sleep=clock.sleep, clock=clock)
+
+    for _ in range(3):
+        client.conversations_list()
+    # 2/minute: third call waits 30 seconds
+    assert client.throttled_seconds == pytest.approx(30.0)
+
+
+def test_async_client_methods_are_awaited_and_retried():
+    """Coroutine methods are wrapped so retries wait with async_sleep."""
+    clock = FakeClock()
+    calls = []
+
+    async def fake_sleep(seconds):
+        clock.sleep(seconds)
+
+    class AsyncInner:
+        async def chat_postMessage(self, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise _ratelimited_error("2")
+            return {"ok": True}
+
+    client = RateLimitedClient(AsyncInner(), async_sleep=fake_sleep, clock=clock)
+
+    result = asyncio.run(client.chat_postMessage(channel="C1", text="hi"))
+
+    assert result == {"ok": True}
+    assert len(calls) == 2
+    assert client.stats["chat_postMessage"]["retries"] == 1
+    assert clock.now == pytest.approx(2.0)
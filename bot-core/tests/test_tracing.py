@@ -0,0 +1,117 @@
+"""Tests for run tracing and the run report."""
+import asyncio
+import json
+import threading
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from bot_core import tracing
+
+
+def test_spans_nest_and_counters_roll_up(tmp_path):
+    report_path = tmp_path / "report.json"
+    with tracing.run("bot", report_path, mode="sync") as root:
+        with tracing.span("scrape", sources=2) as scrape:
+            with tracing.span("scrape_source", source="bbc"):
+                tracing.add("bytes", 100)
+            with tracing.span("scrape_source", source="cnn"):
+                tracing.add("bytes", 50)
+            scrape.set(headlines=7)
+        with tracing.span("post"):
+            tracing.add("retries")
+            tracing.add("retries")
+        root.set(exit_code=0)
+
+    report = json.loads(report_path.read_text())
+    assert report["run"] == "bot"
+    assert report["totals"] == {"bytes": 150, "retries": 2}
+    spans = report["spans"]
+    assert spans["attributes"] == {"mode": "sync", "exit_code": 0}
+    assert [c["name"] for c in spans["children"]] == ["scrape", "post"]
+    scrape = spans["children"][0]
+    assert scrape["attributes"] == {"sources": 2, "headlines": 7}
+    assert [c["counters"]["bytes"] for c in scrape["children"]] == [100, 50]
+    assert all(c["duration_s"] >= 0 for c in scrape["children"])
+
+
+def test_report_written_when_run_fails(tmp_path):
+    report_path = tmp_path / "report.json"
+    with pytest.raises(RuntimeError):
+        with tracing.run("bot", report_path):
+            with tracing.span("generate"):
+                raise RuntimeError("model unavailable")
+
+    spans = json.loads(report_path.read_text())["spans"]
+    assert spans["error"] == "RuntimeError: model unavailable"
+    assert spans["children"][0]["error"] == "RuntimeError: model unavailable"
+
+
+def test_async_tasks_and_threads_attach_to_the_right_span():
+    async def fetch(name):
+        with tracing.span("fetch", source=name):
+            await asyncio.sleep(0)
+            tracing.add("bytes", 1)
+
+    async def pipeline():
+        with tracing.span("scrape"):
+            await asyncio.gather(fetch("a"), fetch("b"))
+            await asyncio.to_thread(tracing.add, "bytes", 10)
+
+    with tracing.run("bot") as root:
+        asyncio.run(pipeline())
+        # Plain threads don't inherit the context; their counts go to the run
+        thread = threading.Thread(target=tracing.add, args=("retries",))
+        thread.start()
+        thread.join()
+
+    scrape = root.children[0]
+    assert [c.name for c in scrape.children] == ["fetch", "fetch"]
+    assert scrape.counters == {"bytes": 10}
+    assert root.counters == {"retries": 1}
+    assert root.totals() == {"bytes": 12, "retries": 1}
+
+
+def test_outside_a_run_nothing_is_recorded():
+    tracing.add("bytes", 5)
+    with tracing.span("orphan") as span:
+        tracing.add("bytes", 5)
+    assert span.parent is None
+    assert tracing.current_span() is None
+
+
+def test_otlp_export_payload():
+    with patch("requests.post") as mock_post:
+        with tracing.run("bot", otlp_endpoint="http://localhost:4318") as root:
+            with tracing.span("llm", model="m"):
+                tracing.add("tokens", 42)
+
+    url = mock_post.call_args.args[0]
+    assert url == "http://localhost:4318/v1/traces"
+    resource = mock_post.call_args.kwargs["json"]["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "bot"}
+    spans = resource["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["bot", "llm"]
+    assert spans[1]["parentSpanId"] == root.span_id
+    assert spans[1]["traceId"] == spans[0]["traceId"] == root.trace_id
+    attributes = {a["key"]: a["value"] for a in spans[1]["attributes"]}
+    assert attributes == {"model": {"stringValue": "m"}, "tokens": {"intValue": "42"}}
+
+
+def test_otlp_failure_does_not_fail_the_run():
+    with patch("requests.post", side_effect=ConnectionError("refused")):
+        with tracing.run("bot", otlp_endpoint="http://localhost:4318"):
+            pass
+
+
+def test_bot_run_reads_report_settings(tmp_path):
+    config = {"report": {"path": str(tmp_path / "default.json"), "otlp_endpoint": None}}
+    args = Namespace(dry_run=True, use_async=True, report=str(tmp_path / "cli.json"))
+
+    with tracing.bot_run("bot", args, config, keep_warm=False) as root:
+        pass
+
+    assert root.attributes == {"dry_run": True, "mode": "async", "keep_warm": False}
+    assert (tmp_path / "cli.json").exists()
+    assert not (tmp_path / "default.json").exists()
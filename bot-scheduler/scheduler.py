@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Bot Scheduler - one long-running process that hosts every bot on a schedule.
+
+Each job runs in its own resident worker process. The worker imports the
+job's module once (a fresh interpreter per job keeps each project's `src`
+package separate) and then calls its main() on every scheduled run, so
+imports, catalogs and the Node.js MIDI generator stay warm between runs.
+
+Schedules are UTC cron expressions, as in the GitHub Actions workflows.
+A random jitter is added to every run, a job that is still running when its
+next run comes due is skipped, and SIGTERM/SIGINT let running jobs finish
+(up to a grace period) before the workers are stopped.
+"""
+
+import argparse
+import importlib
+import logging
+import multiprocessing
+import random
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import yaml
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# (min, max) for minute, hour, day of month, month, day of week (0/7 = Sunday)
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> set[int]:
+    """Parse one cron field: *, n, a-b, lists, and /step on any of them."""
+    values = set()
+    for part in text.split(","):
+        span, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if span == "*":
+            start, end = low, high
+        elif "-" in span:
+            start, end = (int(v) for v in span.split("-", 1))
+        else:
+            start = int(span)
+            end = high if step > 1 else start
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Invalid cron field: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A standard five-field cron expression, evaluated in UTC."""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(text, low, high)
+            for text, (low, high) in zip(fields, CRON_RANGES)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_month = dt.day in self.days
+        in_week = dt.isoweekday() % 7 in self.weekdays
+        if self.any_day:
+            return in_week
+        if self.any_weekday:
+            return in_month
+        # Like cron: when both are restricted, either one matching is enough
+        return in_month or in_week
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after dt."""
+        dt = dt.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+@dataclass
+class Job:
+    name: str
+    project: Path
+    module: str
+    schedule: CronSchedule
+    args: list[str] = field(default_factory=list)
+    jitter: float = 0.0
+    timeout: float = 3600.0
+    next_run: float = 0.0
+
+
+def _serve(project: str, module_name: str, conn) -> None:
+    """Worker process body: import the job's module once, run main() per request."""
+    # The scheduler coordinates shutdown; don't die mid-run on a terminal ^C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.path.insert(0, project)
+    module = importlib.import_module(module_name)
+
+    while True:
+        args = conn.recv()
+        if args is None:
+            break
+        sys.argv = [f"{module_name}.py", *args]
+        try:
+            code = module.main()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            logging.getLogger(module_name).exception("Run failed")
+            code = 1
+        conn.send(code or 0)
+
+
+class ResidentWorker:
+    """A worker process that keeps one job's module loaded between runs."""
+
+    def __init__(self, project: Path, module: str):
+        self.project = project
+        self.module = module
+        self.process = None
+        self.conn = None
+
+    def _start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve,
+            args=(str(self.project), self.module, child_conn),
+            name=f"{self.project.name}/{self.module}",
+        )
+        self.process.start()
+        child_conn.close()
+
+    def run(self, args: list[str], timeout: float) -> int:
+        """Run the module's main() with args. Returns its exit code."""
+        if self.process is None or not self.process.is_alive():
+            self._start()
+        self.conn.send(list(args))
+        if not self.conn.poll(timeout):
+            logger.error(f"{self.process.name} timed out after {timeout}s, restarting it")
+            self.kill()
+            return 1
+        try:
+            return self.conn.recv()
+        except EOFError:
+            logger.error(f"{self.process.name} exited during a run")
+            self.kill()
+            return 1
+
+    def kill(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.process = None
+
+    def stop(self, timeout: float = 10) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout)
+        self.kill()
+
+
+class Scheduler:
+    """Runs jobs on their schedules in resident workers."""
+
+    def __init__(
+        self,
+        jobs: list[Job],
+        grace: float = 600.0,
+        clock=time.time,
+        rng: random.Random | None = None,
+        worker_factory=ResidentWorker,
+    ):
+        self.jobs = jobs
+        self.grace = grace
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.workers = {job.name: worker_factory(job.project, job.module) for job in jobs}
+        self.threads: dict[str, threading.Thread] = {}
+        self.stop_event = threading.Event()
+
+    def schedule_next(self, job: Job, now: float) -> None:
+        fire = job.schedule.next_after(datetime.fromtimestamp(now, timezone.utc))
+        job.next_run = fire.timestamp() + self.rng.uniform(0, job.jitter)
+        logger.info(f"Next {job.name} run at "
+                    f"{datetime.fromtimestamp(job.next_run, timezone.utc):%Y-%m-%d %H:%M:%S} UTC")
+
+    def is_running(self, name: str) -> bool:
+        thread = self.threads.get(name)
+        return thread is not None and thread.is_alive()
+
+    def start_job(self, job: Job) -> bool:
+        """Start a run of job in the background unless one is still going."""
+        if self.is_running(job.name):
+            logger.warning(f"{job.name} is still running, skipping this run")
+            return False
+        thread = threading.Thread(target=self._run_job, args=(job,), name=job.name)
+        self.threads[job.name] = thread
+        thread.start()
+        return True
+
+    def _run_job(self, job: Job) -> None:
+        logger.info(f"Starting {job.name}")
+        start = time.monotonic()
+        code = self.workers[job.name].run(job.args, job.timeout)
+        elapsed = time.monotonic() - start
+        if code == 0:
+            logger.info(f"{job.name} finished in {elapsed:.1f}s")
+        else:
+            logger.error(f"{job.name} failed with exit code {code} after {elapsed:.1f}s")
+
+    def run_pending(self, now: float) -> list[str]:
+        """Start every job that is due. Returns the names of jobs started."""
+        started = []
+        for job in self.jobs:
+            if now < job.next_run:
+                continue
+            self.schedule_next(job, now)
+            if self.start_job(job):
+                started.append(job.name)
+        return started
+
+    def run_forever(self, run_now: list[str] | None = None) -> None:
+        now = self.clock()
+        for job in self.jobs:
+            self.schedule_next(job, now)
+            if job.name in (run_now or []):
+                self.start_job(job)
+
+        while not self.stop_event.is_set():
+            self.run_pending(self.clock())
+            wait = min(job.next_run for job in self.jobs) - self.clock()
+            # Wake at least once a minute, in case the wall clock jumps
+            self.stop_event.wait(max(0.0, min(wait, 60.0)))
+        self.shutdown()
+
+    def request_stop(self, *_) -> None:
+        logger.info("Shutdown requested, waiting for running jobs")
+        self.stop_event.set()
+
+    def shutdown(self) -> None:
+        """Let running jobs finish (up to the grace period), then stop workers."""
+        deadline = time.monotonic() + self.grace
+        for name, thread in self.threads.items():
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                logger.warning(f"{name} still running after {self.grace}s grace, killing it")
+                self.workers[name].kill()
+        for worker in self.workers.values():
+            worker.stop()
+        logger.info("Scheduler stopped")
+
+
+def load_schedule(path: Path) -> tuple[list[Job], dict]:
+    """Load jobs and scheduler settings from YAML. Returns (jobs, settings)."""
+    with open(path) as f:
+        config = yaml.safe_load(f)
+
+    defaults = config.get("defaults", {})
+    jobs = []
+    for name, spec in config["jobs"].items():
+        spec = {**defaults, **spec}
+        if not spec.get("enabled", True):
+            continue
+        jobs.append(Job(
+            name=name,
+            project=REPO_ROOT / spec["project"],
+            module=spec.get("module", "bot"),
+            schedule=CronSchedule(spec["cron"]),
+            args=[str(a) for a in spec.get("args", [])],
+            jitter=float(spec.get("jitter", 0)),
+            timeout=float(spec.get("timeout", 3600)),
+        ))
+    return jobs, config.get("scheduler", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run all bots on their schedules in one long-running process"
+    )
+    parser.add_argument(
+        "--config",
+        default=str(Path(__file__).parent / "schedule.yaml"),
+        help="Schedule file (default: schedule.yaml next to this script)"
+    )
+    parser.add_argument(
+        "--run-now",
+        action="append",
+        default=[],
+        metavar="JOB",
+        help="Also run this job immediately on startup (repeatable)"
+    )
+    args = parser.parse_args()
+
+    jobs, settings = load_schedule(Path(args.config))
+    unknown = set(args.run_now) - {job.name for job in jobs}
+    if unknown:
+        parser.error(f"Unknown job(s): {', '.join(sorted(unknown))}")
+    if not jobs:
+        logger.error("No enabled jobs in schedule")
+        return 1
+
+    scheduler = Scheduler(jobs, grace=float(settings.get("shutdown_grace", 600)))
+    signal.signal(signal.SIGTERM, scheduler.request_stop)
+    signal.signal(signal.SIGINT, scheduler.request_stop)
+    scheduler.run_forever(run_now=args.run_now)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Tests for the bot scheduler."""
+import random
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from scheduler import (
+    CronSchedule,
+    Job,
+    ResidentWorker,
+    Scheduler,
+    load_schedule,
+)
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_cron_daily_next_run():
+    schedule = CronSchedule("0 15 * * *")
+
+    assert schedule.next_after(_utc(2026, 3, 1, 9, 30)) == _utc(2026, 3, 1, 15, 0)
+    # Strictly after: at the fire time, the next run is tomorrow
+    assert schedule.next_after(_utc(2026, 3, 1, 15, 0)) == _utc(2026, 3, 2, 15, 0)
+
+
+def test_cron_steps_lists_and_weekdays():
+    assert CronSchedule("*/20 * * * *").next_after(_utc(2026, 3, 1, 9, 41)) == _utc(2026, 3, 1, 10, 0)
+    assert CronSchedule("5,35 9-10 * * *").next_after(_utc(2026, 3, 1, 10, 36)) == _utc(2026, 3, 2, 9, 5)
+    # 2026-03-01 is a Sunday; 1 = Monday, 7 = Sunday
+    assert CronSchedule("0 8 * * 1").next_after(_utc(2026, 3, 1, 12, 0)) == _utc(2026, 3, 2, 8, 0)
+    assert CronSchedule("0 8 * * 7").next_after(_utc(2026, 3, 2, 12, 0)) == _utc(2026, 3, 8, 8, 0)
+
+
+@pytest.mark.parametrize("expr", ["* * *", "60 * * * *", "0 25 * * *", "*/0 * * * *"])
+def test_cron_rejects_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+class FakeWorker:
+    """Records runs; a run blocks until release is set."""
+
+    def __init__(self, project, module):
+        self.runs = []
+        self.release = threading.Event()
+        self.stopped = False
+
+    def run(self, args, timeout):
+        self.runs.append(args)
+        self.release.wait(5)
+        return 0
+
+    def kill(self):
+        self.release.set()
+
+    def stop(self):
+        self.stopped = True
+
+
+def _job(name="bot", jitter=0.0):
+    return Job(name=name, project=Path("/tmp"), module="bot",
+               schedule=CronSchedule("0 15 * * *"), jitter=jitter)
+
+
+def test_jitter_delays_within_bounds():
+    job = _job(jitter=300)
+    scheduler = Scheduler([job], rng=random.Random(1), worker_factory=FakeWorker)
+    fire = _utc(2026, 3, 1, 15, 0).timestamp()
+
+    for _ in range(20):
+        scheduler.schedule_next(job, _utc(2026, 3, 1, 9, 0).timestamp())
+        assert fire <= job.next_run <= fire + 300
+
+
+def test_skips_run_while_previous_is_still_going():
+    job = _job()
+    scheduler = Scheduler([job], worker_factory=FakeWorker)
+    worker = scheduler.workers["bot"]
+
+    assert scheduler.run_pending(_utc(2026, 3, 1, 15, 0).timestamp()) == ["bot"]
+    assert scheduler.run_pending(_utc(2026, 3, 2, 15, 0).timestamp()) == []
+
+    worker.release.set()
+    scheduler.threads["bot"].join()
+    assert scheduler.run_pending(_utc(2026, 3, 3, 15, 0).timestamp()) == ["bot"]
+    scheduler.threads["bot"].join()
+    assert len(worker.runs) == 2
+
+
+def test_shutdown_waits_for_running_jobs_then_stops_workers():
+    job = _job()
+    scheduler = Scheduler([job], grace=5, worker_factory=FakeWorker)
+    worker = scheduler.workers["bot"]
+    scheduler.start_job(job)
+
+    threading.Timer(0.1, worker.release.set).start()
+    scheduler.shutdown()
+
+    assert not scheduler.is_running("bot")
+    assert worker.stopped
+
+
+def test_resident_worker_keeps_module_loaded(tmp_path):
+    """main() runs repeatedly in one process, with module state kept between runs."""
+    (tmp_path / "fakebot.py").write_text(
+        "import sys\n"
+        "runs = []\n"
+        "def main():\n"
+        "    runs.append(sys.argv[1:])\n"
+        "    return len(runs) if sys.argv[1:] != ['--fail'] else 7\n"
+    )
+    worker = ResidentWorker(tmp_path, "fakebot")
+    try:
+        assert worker.run(["--dry-run"], timeout=30) == 1
+        pid = worker.process.pid
+        assert worker.run(["--dry-run"], timeout=30) == 2
+        assert worker.run(["--fail"], timeout=30) == 7
+        assert worker.process.pid == pid
+    finally:
+        worker.stop()
+    assert worker.process is None
+
+
+def test_repo_schedule_loads():
+    jobs, settings = load_schedule(Path(__file__).parent.parent / "schedule.yaml")
+
+    by_name = {job.name: job for job in jobs}
+    assert set(by_name) == {"drawma-gallery", "surreal-prompt-bot", "midi-bot"}
+    assert by_name["midi-bot"].args == ["--keep-warm"]
+    assert by_name["drawma-gallery"].module == "scrape_gallery"
+    assert all(job.project.is_dir() for job in jobs)
+    assert all(job.jitter == 300 for job in jobs)
+    assert settings["shutdown_grace"] == 600
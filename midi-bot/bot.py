@@ -2,41 +2,28 @@
 """Daily MIDI Bot - Generates 4 MIDI files and posts to Slack."""
 
 import argparse
-import importlib.util
+import functools
 import json
 import logging
 import os
-import random
+import shutil
 import subprocess
 import sys
 import tempfile
+import uuid
 from pathlib import Path
 
-# Import local midi-bot modules first (before any sys.path manipulation)
-from src.config import load_config, merge_cli_args
-from src.generator import (
-    generate_music_params, load_scales, load_instruments
-)
-from src.slack_poster import post_midi_to_slack
-
-
-# Import scraper/sampler from surreal-prompt-bot using importlib.util
-# to avoid namespace collision with midi-bot's own src/ package.
-def _import_from_surreal_prompt_bot(module_name):
-    """Import a module from surreal-prompt-bot/src/ without polluting sys.path."""
-    repo_root = Path(__file__).parent.parent
-    module_path = repo_root / "surreal-prompt-bot" / "src" / f"{module_name}.py"
-    spec = importlib.util.spec_from_file_location(f"spb_{module_name}", module_path)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
-    return mod
-
-
-_scraper = _import_from_surreal_prompt_bot("scraper")
-_sampler = _import_from_surreal_prompt_bot("sampler")
-scrape_all_sources = _scraper.scrape_all_sources
-load_inspirations = _sampler.load_inspirations
-sample_inspirations = _sampler.sample_inspirations
+from bot_core import tracing
+from bot_core.config import get_tokens, load_bot_config
+from bot_core.outbox import Outbox, report_delivery
+from bot_core.sampler import load_inspirations, pick_headlines, sample_inspirations
+from bot_core.scraper import scrape_all_sources, scrape_all_sources_async
+from src.catalog import MusicCatalog, load_catalog
+from src.config import DEFAULT_CONFIG, merge_cli_args
+from src.generator import generate_music_params, generate_music_params_async
+from src.midi_worker import MidiWorker
+from src.renderer import render_previews
+from src.slack_poster import TRACKS, post_midi_to_slack
 
 logging.basicConfig(
     level=logging.INFO,
@@ -44,19 +31,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Resident Node.js generator, kept between runs with --keep-warm
+_midi_worker: MidiWorker | None = None
+
 
-def run_midi_generation(params: dict, output_dir: Path) -> bool:
-    """Run the Node.js MIDI generator as a subprocess."""
+def _get_midi_worker(keep_warm: bool) -> MidiWorker | None:
+    global _midi_worker
+    if not keep_warm:
+        return None
+    if _midi_worker is None:
+        _midi_worker = MidiWorker(Path(__file__).parent / "generate_midi.js")
+    return _midi_worker
+
+
+def run_midi_generation(
+    params: dict, catalog: MusicCatalog, output_dir: Path, song: dict,
+    combined: bool = False, worker: MidiWorker | None = None,
+) -> bool:
+    """Run the Node.js MIDI generator as a subprocess (or on a resident worker)."""
     script_path = Path(__file__).parent / "generate_midi.js"
 
     # Add scale_intervals to params for the Node.js script
-    scales = load_scales(Path(__file__).parent / "scales.json")
-    scale_entry = next((s for s in scales if s["name"] == params["scale"]), None)
+    scale_entry = catalog.scale(params["scale"])
     if not scale_entry:
         logger.error(f"Scale not found: {params['scale']}")
         return False
 
-    node_params = {**params, "scale_intervals": scale_entry["intervals"]}
+    node_params = {
+        **params,
+        "scale_intervals": scale_entry["intervals"],
+        "bars_per_section": song["bars_per_section"],
+        "sections": song["sections"],
+        "combined": combined,
+    }
+    # RNN generation cost grows linearly with length; allow 5 min per 16 bars
+    total_bars = song["bars_per_section"] * len(song["sections"])
+    timeout = 300 * max(1, -(-total_bars // 16))
+
+    if worker is not None:
+        return worker.generate(node_params, output_dir, timeout)
 
     try:
         result = subprocess.run(
@@ -64,7 +77,7 @@ def run_midi_generation(params: dict, output_dir: Path) -> bool:
             input=json.dumps(node_params),
             capture_output=True,
             text=True,
-            timeout=300,
+            timeout=timeout,
             cwd=str(Path(__file__).parent),
         )
         logger.info(f"Node.js stdout: {result.stdout}")
@@ -73,107 +86,331 @@ def run_midi_generation(params: dict, output_dir: Path) -> bool:
             return False
         return True
     except subprocess.TimeoutExpired:
-        logger.error("MIDI generation timed out (5 min)")
+        logger.error(f"MIDI generation timed out ({timeout}s)")
         return False
     except Exception as e:
         logger.error(f"Failed to run Node.js generator: {e}")
         return False
 
 
-def run_bot(args) -> int:
-    """Main bot logic. Returns exit code."""
-    script_dir = Path(__file__).parent
-    config_path = script_dir / args.config
-    config = load_config(config_path)
-    config = merge_cli_args(config, args)
+def _midi_handler(catalog: MusicCatalog, slack_token: str):
+    """Outbox handler that uploads a queued MIDI post, resuming from progress."""
+    def deliver(payload: dict, progress: dict) -> bool:
+        files_dir = Path(payload["files_dir"])
+        previews = [files_dir / name for name in payload["previews"]]
+        expected = (1 if payload["combined"] else len(TRACKS)) + len(previews)
+        posted = post_midi_to_slack(
+            payload["params"], catalog, files_dir, payload["channel"], slack_token,
+            combined=payload["combined"], previews=previews, progress=progress,
+        )
+        delivered = posted and len(progress["uploaded"]) == expected
+        if delivered:
+            shutil.rmtree(files_dir, ignore_errors=True)
+        return delivered
 
-    # Get API keys
-    hf_token = os.environ.get("HF_TOKEN")
-    if not hf_token:
-        logger.error("HF_TOKEN environment variable not set")
-        return 1
+    return deliver
 
-    slack_token = os.environ.get("SLACK_BOT_TOKEN")
-    if not slack_token and not args.dry_run:
-        logger.error("SLACK_BOT_TOKEN environment variable not set")
-        return 1
 
-    # Scrape headlines (reusing surreal-prompt-bot scraper)
-    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
-    headlines = scrape_all_sources(config["sources"])
-    if not headlines:
-        logger.error("No headlines scraped from any source")
-        return 1
+def _remove_dead_files(outbox) -> None:
+    """Delete the generated files of posts the outbox has given up on.
+
+    The entries themselves stay in the outbox for inspection.
+    """
+    for entry in outbox.dead():
+        if entry.kind != "midi":
+            continue
+        files_dir = Path(entry.payload["files_dir"])
+        if files_dir.exists():
+            shutil.rmtree(files_dir, ignore_errors=True)
+            logger.info(f"Removed files of dead post {entry.id}")
+
 
-    max_headlines = config["prompt"]["max_headlines"]
-    if len(headlines) > max_headlines:
-        headlines = random.sample(headlines, max_headlines)
-    logger.info(f"Using {len(headlines)} headlines")
+def drain_outbox(outbox, config: dict, catalog: MusicCatalog, slack_token: str) -> int:
+    """Deliver queued MIDI posts. Returns the number still pending."""
+    deliver = _midi_handler(catalog, slack_token)
+    remaining = outbox.drain({"midi": deliver}, config["outbox"]["max_attempts"])
+    _remove_dead_files(outbox)
+    return remaining
 
-    # Sample musical inspirations
+
+async def drain_outbox_async(
+    outbox, config: dict, catalog: MusicCatalog, slack_token: str
+) -> int:
+    """Deliver queued MIDI posts without blocking the event loop.
+
+    Uploads keep using the threaded, resumable post_midi_to_slack; each
+    delivery runs in a worker thread.
+    """
+    import asyncio
+
+    deliver = _midi_handler(catalog, slack_token)
+    handlers = {"midi": lambda payload, progress: asyncio.to_thread(deliver, payload, progress)}
+    remaining = await outbox.drain_async(handlers, config["outbox"]["max_attempts"])
+    _remove_dead_files(outbox)
+    return remaining
+
+
+@functools.lru_cache(maxsize=1)
+def _load_catalog() -> MusicCatalog:
+    """Load scales + instruments catalog."""
+    script_dir = Path(__file__).parent
+    return load_catalog(script_dir / "scales.json", script_dir / "instruments.json")
+
+
+def _pick_inspirations(config: dict) -> list[str]:
+    """Sample musical inspirations."""
     inspirations = []
     if config["inspirations"]["pick_count"] > 0:
-        insp_path = script_dir / config["inspirations"]["file"]
+        insp_path = Path(__file__).parent / config["inspirations"]["file"]
         all_inspirations = load_inspirations(insp_path)
         inspirations = sample_inspirations(
             all_inspirations, config["inspirations"]["pick_count"]
         )
         logger.info(f"Using inspirations: {inspirations}")
+    return inspirations
 
-    # Load scales + instruments databases
-    scales = load_scales(script_dir / "scales.json")
-    instruments = load_instruments(script_dir / "instruments.json")
 
-    # Generate music parameters via LLM
-    logger.info("Generating music parameters via LLM...")
-    params = generate_music_params(
-        headlines=headlines,
-        inspirations=inspirations,
-        scales=scales,
-        instruments=instruments,
-        model=config["prompt"]["model"],
-        temperature=config["prompt"]["temperature"],
-        api_key=hf_token,
-    )
-    logger.info(f"Music params: {json.dumps(params, indent=2)}")
+def _generate_files(
+    params: dict, catalog: MusicCatalog, config: dict, dest_dir: Path,
+    worker: MidiWorker | None = None,
+) -> list[str] | None:
+    """Generate MIDI files (and previews) and copy them into dest_dir.
 
-    # Generate MIDI files
+    Returns the preview file names, or None if generation failed.
+    """
+    script_dir = Path(__file__).parent
+    # Previews of the full song need the combined file
+    combined = config["export"]["combined"]
+    preview = config["preview"]
     with tempfile.TemporaryDirectory() as midi_dir:
         midi_path = Path(midi_dir)
         logger.info("Generating MIDI files...")
 
-        if not run_midi_generation(params, midi_path):
-            logger.error("MIDI generation failed")
-            return 1
-
-        # Verify all 4 files exist
-        for track in ["melody", "drums", "bass", "chords"]:
+        with tracing.span("midi", warm=worker is not None):
+            if not run_midi_generation(
+                params, catalog, midi_path, config["song"],
+                combined=combined or preview["enabled"], worker=worker,
+            ):
+                logger.error("MIDI generation failed")
+                return None
+            tracing.add("bytes", sum(f.stat().st_size for f in midi_path.glob("*.mid")))
+
+        # Verify all 4 files (and the combined song, if requested) exist
+        expected = TRACKS + ["song"] if combined else TRACKS
+        for track in expected:
             if not (midi_path / f"{track}.mid").exists():
                 logger.error(f"Missing generated file: {track}.mid")
-                return 1
-
-        logger.info("All 4 MIDI files generated successfully")
-
-        if args.dry_run:
-            logger.info("Dry run - not posting to Slack")
-            # Copy files to a visible location for inspection
-            import shutil
-            dry_run_dir = script_dir / "dry-run-output"
-            dry_run_dir.mkdir(exist_ok=True)
-            for f in midi_path.glob("*.mid"):
-                shutil.copy2(f, dry_run_dir / f.name)
-            logger.info(f"MIDI files saved to {dry_run_dir}")
-            return 0
-
-        # Post to Slack
-        channel = config["slack"]["channel"]
-        logger.info(f"Posting to Slack channel {channel}...")
-        if post_midi_to_slack(params, instruments, midi_path, channel, slack_token):
-            logger.info("Successfully posted to Slack!")
-            return 0
-        else:
-            logger.error("Failed to post to Slack")
+                return None
+
+        logger.info(f"All {len(expected)} MIDI files generated successfully")
+
+        previews = []
+        if preview["enabled"]:
+            logger.info("Rendering audio previews...")
+            soundfont = script_dir / Path(preview["soundfont"]).expanduser()
+            with tracing.span("render", tracks=len(preview["tracks"])):
+                previews = render_previews(
+                    [midi_path / f"{track}.mid" for track in preview["tracks"]],
+                    midi_path,
+                    soundfont=soundfont,
+                    cache_dir=Path(preview["cache_dir"]).expanduser(),
+                    fmt=preview["format"],
+                    max_workers=preview["workers"],
+                )
+                tracing.add("bytes", sum(f.stat().st_size for f in previews))
+            logger.info(f"Rendered {len(previews)} preview(s)")
+
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        for f in [*midi_path.glob("*.mid"), *previews]:
+            shutil.copy2(f, dest_dir / f.name)
+    return [p.name for p in previews]
+
+
+def _files_dir(outbox_path: Path) -> Path:
+    """A fresh directory for one queued post's files, next to the outbox."""
+    return outbox_path.parent / "outbox-files" / uuid.uuid4().hex
+
+
+def _queue_post(outbox, config: dict, params: dict, files_dir: Path, previews: list[str]):
+    channel = config["slack"]["channel"]
+    logger.info(f"Posting to Slack channel {channel}...")
+    return outbox.enqueue("midi", {
+        "params": params,
+        "channel": channel,
+        "files_dir": str(files_dir),
+        "combined": config["export"]["combined"],
+        "previews": previews,
+    })
+
+
+def run_bot(args) -> int:
+    """Main bot logic. Returns exit code."""
+    if getattr(args, "use_async", False):
+        import asyncio
+
+        return asyncio.run(run_bot_async(args))
+
+    config, outbox_path = load_bot_config(Path(__file__).parent, args, DEFAULT_CONFIG, merge_cli_args)
+    keep_warm = bool(getattr(args, "keep_warm", False))
+    with tracing.bot_run("midi-bot", args, config, keep_warm=keep_warm) as run:
+        code = _run_pipeline(args, config, outbox_path)
+        run.set(exit_code=code)
+    return code
+
+
+def _run_pipeline(args, config: dict, outbox_path: Path) -> int:
+    # Only retry queued posts, no generation
+    if getattr(args, "drain", False):
+        slack_token = os.environ.get("SLACK_BOT_TOKEN")
+        if not slack_token:
+            logger.error("SLACK_BOT_TOKEN environment variable not set")
+            return 1
+        with tracing.span("post"):
+            remaining = drain_outbox(Outbox(outbox_path), config, _load_catalog(), slack_token)
+        logger.info(f"Outbox drained, {remaining} post(s) still pending")
+        return 0 if remaining == 0 else 1
+
+    # Get API keys
+    tokens = get_tokens(args.dry_run)
+    if tokens is None:
+        return 1
+    hf_token, slack_token = tokens
+    worker = _get_midi_worker(getattr(args, "keep_warm", False))
+
+    # Scrape headlines (reusing surreal-prompt-bot scraper)
+    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
+    with tracing.span("scrape", sources=len(config["sources"])) as span:
+        headlines = scrape_all_sources(config["sources"])
+        span.set(headlines=len(headlines))
+    if not headlines:
+        logger.error("No headlines scraped from any source")
+        return 1
+
+    headlines = pick_headlines(headlines, config["prompt"]["max_headlines"])
+    with tracing.span("inspirations"):
+        inspirations = _pick_inspirations(config)
+    catalog = _load_catalog()
+
+    # Generate music parameters via LLM
+    logger.info("Generating music parameters via LLM...")
+    with tracing.span("generate"):
+        params = generate_music_params(
+            headlines=headlines,
+            inspirations=inspirations,
+            catalog=catalog,
+            model=config["prompt"]["model"],
+            temperature=config["prompt"]["temperature"],
+            api_key=hf_token,
+        )
+    logger.info(f"Music params: {json.dumps(params, indent=2)}")
+
+    if args.dry_run:
+        # Copy files to a visible location for inspection
+        dry_run_dir = Path(__file__).parent / "dry-run-output"
+        if _generate_files(params, catalog, config, dry_run_dir, worker) is None:
+            return 1
+        logger.info("Dry run - not posting to Slack")
+        logger.info(f"MIDI files saved to {dry_run_dir}")
+        return 0
+
+    # Queue durably first (files move out of the temp dir into the
+    # outbox), so a Slack outage never forces a regeneration
+    files_dir = _files_dir(outbox_path)
+    previews = _generate_files(params, catalog, config, files_dir, worker)
+    if previews is None:
+        return 1
+
+    outbox = Outbox(outbox_path)
+    entry = _queue_post(outbox, config, params, files_dir, previews)
+    with tracing.span("post"):
+        drain_outbox(outbox, config, catalog, slack_token)
+    return report_delivery(outbox, entry.id)
+
+
+async def run_bot_async(args) -> int:
+    """Asyncio variant of run_bot. Returns exit code.
+
+    Scraping, inspiration sampling and catalog loading overlap, inference
+    uses AsyncInferenceClient, and the Node.js generator and uploads run in
+    worker threads, so several bots can share one event loop.
+    """
+    config, outbox_path = load_bot_config(Path(__file__).parent, args, DEFAULT_CONFIG, merge_cli_args)
+    keep_warm = bool(getattr(args, "keep_warm", False))
+    with tracing.bot_run("midi-bot", args, config, keep_warm=keep_warm) as run:
+        code = await _run_pipeline_async(args, config, outbox_path)
+        run.set(exit_code=code)
+    return code
+
+
+async def _run_pipeline_async(args, config: dict, outbox_path: Path) -> int:
+    import asyncio
+
+    if getattr(args, "drain", False):
+        slack_token = os.environ.get("SLACK_BOT_TOKEN")
+        if not slack_token:
+            logger.error("SLACK_BOT_TOKEN environment variable not set")
+            return 1
+        catalog = await asyncio.to_thread(_load_catalog)
+        with tracing.span("post"):
+            remaining = await drain_outbox_async(
+                Outbox(outbox_path), config, catalog, slack_token
+            )
+        logger.info(f"Outbox drained, {remaining} post(s) still pending")
+        return 0 if remaining == 0 else 1
+
+    tokens = get_tokens(args.dry_run)
+    if tokens is None:
+        return 1
+    hf_token, slack_token = tokens
+    worker = _get_midi_worker(getattr(args, "keep_warm", False))
+
+    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
+    with tracing.span("scrape", sources=len(config["sources"])) as span:
+        headlines, inspirations, catalog = await asyncio.gather(
+            scrape_all_sources_async(config["sources"]),
+            asyncio.to_thread(_pick_inspirations, config),
+            asyncio.to_thread(_load_catalog),
+        )
+        span.set(headlines=len(headlines))
+    if not headlines:
+        logger.error("No headlines scraped from any source")
+        return 1
+    headlines = pick_headlines(headlines, config["prompt"]["max_headlines"])
+
+    logger.info("Generating music parameters via LLM...")
+    with tracing.span("generate"):
+        params = await generate_music_params_async(
+            headlines=headlines,
+            inspirations=inspirations,
+            catalog=catalog,
+            model=config["prompt"]["model"],
+            temperature=config["prompt"]["temperature"],
+            api_key=hf_token,
+        )
+    logger.info(f"Music params: {json.dumps(params, indent=2)}")
+
+    if args.dry_run:
+        dry_run_dir = Path(__file__).parent / "dry-run-output"
+        if await asyncio.to_thread(
+            _generate_files, params, catalog, config, dry_run_dir, worker
+        ) is None:
             return 1
+        logger.info("Dry run - not posting to Slack")
+        logger.info(f"MIDI files saved to {dry_run_dir}")
+        return 0
+
+    files_dir = _files_dir(outbox_path)
+    previews = await asyncio.to_thread(
+        _generate_files, params, catalog, config, files_dir, worker
+    )
+    if previews is None:
+        return 1
+
+    outbox = Outbox(outbox_path)
+    entry = _queue_post(outbox, config, params, files_dir, previews)
+    with tracing.span("post"):
+        await drain_outbox_async(outbox, config, catalog, slack_token)
+    return report_delivery(outbox, entry.id)
 
 
 def main():
@@ -186,6 +423,22 @@ def main():
     parser.add_argument("--temperature", type=float, help="LLM temperature")
     parser.add_argument("--sources", help="Comma-separated news sources")
     parser.add_argument("--no-inspirations", action="store_true")
+    parser.add_argument("--bars", type=int, help="Bars per song section")
+    parser.add_argument("--sections",
+                        help="Comma-separated song sections (intro,verse,chorus)")
+    parser.add_argument("--combined", action="store_true",
+                        help="Also write one multi-track song.mid and upload only that")
+    parser.add_argument("--preview", action="store_true",
+                        help="Render and upload an offline audio preview")
+    parser.add_argument("--drain", action="store_true",
+                        help="Only retry queued Slack posts from the outbox")
+    parser.add_argument("--keep-warm", action="store_true",
+                        help="Keep the Node.js generator resident between runs "
+                             "(for long-running hosts like the bot scheduler)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run on asyncio, overlapping network-bound stages")
+    parser.add_argument("--report",
+                        help="Write the JSON run report here (default: report.path in config)")
     parser.add_argument("--config", default="config.yaml")
 
     args = parser.parse_args()
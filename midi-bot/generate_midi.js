@@ -2,13 +2,23 @@
 /**
  * MIDI generator using Magenta.js (ImprovRNN, DrumsRNN) + programmatic bass/chords.
  *
- * Reads JSON params from stdin, writes 4 MIDI files to the output directory.
+ * Reads JSON params from stdin, writes 4 MIDI files to the output directory
+ * (plus a combined multi-track song.mid when `combined` is set).
+ * Songs are built from sections (intro/verse/chorus) of `bars_per_section`
+ * bars each; RNN tracks are generated in progression-length chunks, each one
+ * primed with the tail of the previous chunk.
  *
  * Usage: echo '{"scale":"Hirajoshi",...}' | node generate_midi.js /tmp/midi-output
+ *
+ * With --serve it stays resident instead: each stdin line is a job
+ * {"output_dir": ..., "params": {...}} and gets one JSON result line
+ * ({"ok": true} or {"ok": false, "error": ...}) on stdout. RNN models are
+ * initialized once and reused across jobs.
  */
 
 const fs = require('fs');
 const path = require('path');
+const readline = require('readline');
 const { Note, Chord } = require('tonal');
 
 // Magenta.js imports (server-side Node.js paths)
@@ -18,10 +28,15 @@ const core = require('@magenta/music/node/core');
 const IMPROV_CHECKPOINT = 'https://storage.googleapis.com/magentadata/js/checkpoints/music_rnn/chord_pitches_improv';
 const DRUMS_CHECKPOINT = 'https://storage.googleapis.com/magentadata/js/checkpoints/music_rnn/drum_kit_rnn';
 
-const STEPS_PER_QUARTER = 4;
-const BARS = 4;
-const BEATS_PER_BAR = 4;
-const TOTAL_STEPS = BARS * BEATS_PER_BAR * STEPS_PER_QUARTER; // 64
+const {
+  STEPS_PER_QUARTER,
+  STEPS_PER_BAR,
+  CHUNK_STEPS,
+  buildSongPlan,
+  totalSteps,
+  chordsForRange,
+  chordSlots,
+} = require('./song_plan');
 
 // ── Scale quantization ──────────────────────────────────────────────────
 
@@ -39,28 +54,182 @@ function buildScalePitches(root, intervals, minPitch = 36, maxPitch = 96) {
   return Array.from(pitches).sort((a, b) => a - b);
 }
 
-function quantizeToScale(pitch, scalePitches) {
-  let closest = scalePitches[0];
-  let minDist = Math.abs(pitch - closest);
-  for (const sp of scalePitches) {
-    const dist = Math.abs(pitch - sp);
-    if (dist < minDist) {
-      minDist = dist;
-      closest = sp;
+const scaleTables = new Map();
+
+/**
+ * Precompute a 128-entry nearest-pitch table for a (root, scale, range) so
+ * quantization is a single array index per note. Tables are memoized for
+ * the lifetime of the process.
+ */
+function buildScaleTable(root, intervals, minPitch = 36, maxPitch = 96) {
+  const key = `${root}|${intervals.join(',')}|${minPitch}|${maxPitch}`;
+  const cached = scaleTables.get(key);
+  if (cached) return cached;
+
+  const pitches = buildScalePitches(root, intervals, minPitch, maxPitch);
+  if (!pitches.length) {
+    throw new Error(`No ${root} scale pitches between ${minPitch} and ${maxPitch} (intervals: ${intervals.join(',')})`);
+  }
+  const nearest = new Uint8Array(128);
+  // Sweep both sorted lists once; ties resolve to the lower scale pitch.
+  let i = 0;
+  for (let p = 0; p < 128; p++) {
+    while (i + 1 < pitches.length && Math.abs(pitches[i + 1] - p) < Math.abs(pitches[i] - p)) {
+      i++;
     }
+    nearest[p] = pitches[i];
   }
-  return closest;
+
+  const table = { pitches, nearest };
+  scaleTables.set(key, table);
+  return table;
+}
+
+function quantizeToScale(pitch, scaleTable) {
+  const index = Math.max(0, Math.min(127, Math.round(pitch)));
+  return scaleTable.nearest[index];
+}
+
+// ── Chunked RNN generation ─────────────────────────────────────────────
+
+function plainNote(n, offset = 0) {
+  return {
+    pitch: n.pitch,
+    velocity: n.velocity || 100,
+    quantizedStartStep: (n.quantizedStartStep || 0) + offset,
+    quantizedEndStep: (n.quantizedEndStep || 0) + offset,
+    isDrum: !!n.isDrum,
+  };
+}
+
+/** Quantized primer made of the last `contextSteps` steps before `endStep`. */
+function tailContext(notes, endStep, contextSteps, tempo) {
+  const start = endStep - contextSteps;
+  return {
+    quantizationInfo: { stepsPerQuarter: STEPS_PER_QUARTER },
+    totalQuantizedSteps: contextSteps,
+    tempos: [{ time: 0, qpm: tempo }],
+    notes: notes
+      .filter(n => n.quantizedEndStep > start && n.quantizedStartStep < endStep)
+      .map(n => ({
+        ...n,
+        quantizedStartStep: Math.max(0, n.quantizedStartStep - start),
+        quantizedEndStep: Math.min(endStep, n.quantizedEndStep) - start,
+      })),
+  };
+}
+
+/**
+ * Generate an RNN track across every section of the plan in CHUNK_STEPS
+ * pieces. Each chunk is primed with the final chord slot of the previous
+ * one, so only a bounded context is re-encoded and total cost is linear in
+ * song length. Returns the raw notes (absolute quantized steps).
+ */
+async function generateRnnNotes(rnn, plan, seed, params, chords = null) {
+  const slotSteps = chords ? CHUNK_STEPS / chords.length : STEPS_PER_BAR;
+  const notes = [];
+  const repeated = {};
+  let context = seed;
+  let primed = false; // context holds a full chord slot from an earlier chunk
+
+  for (const section of plan) {
+    let sectionNotes = repeated[section.name];
+
+    if (!sectionNotes) {
+      sectionNotes = [];
+      for (let offset = 0; offset < section.steps; offset += CHUNK_STEPS) {
+        const steps = Math.min(CHUNK_STEPS, section.steps - offset);
+        const chunkStart = section.startStep + offset;
+        let chunkChords;
+        if (chords) {
+          chunkChords = primed
+            ? chordsForRange(plan, chords, chunkStart - slotSteps, steps + slotSteps)
+            : chordsForRange(plan, chords, chunkStart, steps);
+        }
+        const chunk = await rnn.continueSequence(
+          context,
+          steps,
+          params.temperature * section.temperatureScale,
+          chunkChords
+        );
+        const chunkNotes = chunk.notes.map(n => plainNote(n, offset));
+        sectionNotes.push(...chunkNotes);
+        primed = true;
+        context = tailContext(chunkNotes, offset + steps, slotSteps, params.tempo);
+      }
+      if (section.repeat) repeated[section.name] = sectionNotes;
+    } else {
+      context = tailContext(sectionNotes, section.steps, slotSteps, params.tempo);
+    }
+
+    notes.push(...sectionNotes.map(n => plainNote(n, section.startStep)));
+    console.log(`  ${section.name}: ${section.steps / STEPS_PER_BAR} bars`);
+  }
+
+  return notes;
+}
+
+function quantizedTrack(params, plan, notes) {
+  return {
+    quantizationInfo: { stepsPerQuarter: STEPS_PER_QUARTER },
+    totalQuantizedSteps: totalSteps(plan),
+    tempos: [{ time: 0, qpm: params.tempo }],
+    timeSignatures: [{ time: 0, numerator: 4, denominator: 4 }],
+    notes,
+  };
+}
+
+// ── Model cache ─────────────────────────────────────────────────────────
+
+const rnnCache = new Map();
+
+/**
+ * Deterministic stand-in for MusicRNN, used when MIDI_BOT_STUB_RNN is set:
+ * no checkpoint download and no inference, so benchmarks time everything
+ * around the models. Walks up from the primer's last pitch, one note per
+ * eighth.
+ */
+class StubRnn {
+  async continueSequence(sequence, steps) {
+    const primer = sequence.notes[sequence.notes.length - 1];
+    let pitch = primer ? primer.pitch : 60;
+    const notes = [];
+    for (let step = 0; step < steps; step += 2) {
+      pitch = 48 + ((pitch - 48 + 2) % 36);
+      notes.push({
+        pitch,
+        velocity: 90,
+        quantizedStartStep: step,
+        quantizedEndStep: step + 2,
+        isDrum: !!(primer && primer.isDrum),
+      });
+    }
+    return { notes };
+  }
+}
+
+function loadRnn(checkpoint) {
+  if (process.env.MIDI_BOT_STUB_RNN) {
+    return Promise.resolve(new StubRnn());
+  }
+  if (!rnnCache.has(checkpoint)) {
+    const rnn = new mm.MusicRNN(checkpoint);
+    rnnCache.set(checkpoint, rnn.initialize().then(() => rnn).catch(err => {
+      rnnCache.delete(checkpoint);
+      throw err;
+    }));
+  }
+  return rnnCache.get(checkpoint);
 }
 
 // ── Melody generation (ImprovRNN) ───────────────────────────────────────
 
-async function generateMelody(params, scalePitches) {
-  const improvRnn = new mm.MusicRNN(IMPROV_CHECKPOINT);
-  await improvRnn.initialize();
+async function generateMelody(params, scaleTable, plan) {
+  const improvRnn = await loadRnn(IMPROV_CHECKPOINT);
 
   // Minimal seed: one note in the scale
   const rootMidi = Note.midi(params.root + '4') || 60;
-  const seedPitch = quantizeToScale(rootMidi, scalePitches);
+  const seedPitch = quantizeToScale(rootMidi, scaleTable);
 
   const seedSequence = {
     ticksPerQuarter: 220,
@@ -72,33 +241,22 @@ async function generateMelody(params, scalePitches) {
 
   const quantizedSeed = core.sequences.quantizeNoteSequence(seedSequence, STEPS_PER_QUARTER);
 
-  const continuation = await improvRnn.continueSequence(
-    quantizedSeed,
-    TOTAL_STEPS,
-    params.temperature,
-    params.chords
-  );
+  const notes = await generateRnnNotes(improvRnn, plan, quantizedSeed, params, params.chords);
 
   // Post-process: quantize to scale + set instrument
-  continuation.notes.forEach(n => {
-    n.pitch = quantizeToScale(n.pitch, scalePitches);
-    n.velocity = n.velocity || 100;
+  notes.forEach(n => {
+    n.pitch = quantizeToScale(n.pitch, scaleTable);
     n.program = params.melody_instrument;
     n.instrument = 0;
   });
 
-  // Set tempo
-  continuation.tempos = [{ time: 0, qpm: params.tempo }];
-
-  improvRnn.dispose();
-  return continuation;
+  return quantizedTrack(params, plan, notes);
 }
 
 // ── Drums generation (DrumsRNN) ─────────────────────────────────────────
 
-async function generateDrums(params) {
-  const drumsRnn = new mm.MusicRNN(DRUMS_CHECKPOINT);
-  await drumsRnn.initialize();
+async function generateDrums(params, plan) {
+  const drumsRnn = await loadRnn(DRUMS_CHECKPOINT);
 
   // Minimal seed: kick on beat 1
   const seedSequence = {
@@ -114,43 +272,35 @@ async function generateDrums(params) {
 
   const quantizedSeed = core.sequences.quantizeNoteSequence(seedSequence, STEPS_PER_QUARTER);
 
-  const continuation = await drumsRnn.continueSequence(
-    quantizedSeed,
-    TOTAL_STEPS,
-    params.temperature
-  );
+  const notes = await generateRnnNotes(drumsRnn, plan, quantizedSeed, params);
 
-  continuation.notes.forEach(n => {
-    n.velocity = n.velocity || 100;
+  notes.forEach(n => {
     n.isDrum = true;
   });
 
-  continuation.tempos = [{ time: 0, qpm: params.tempo }];
-
-  drumsRnn.dispose();
-  return continuation;
+  return quantizedTrack(params, plan, notes);
 }
 
 // ── Bass generation (programmatic) ──────────────────────────────────────
 
-function generateBass(params, scalePitches) {
-  const bassPitches = scalePitches.filter(p => p >= 36 && p <= 60);
+function generateBass(params, plan) {
+  // Fall back to the full range if the scale has no pitches in the bass range
+  const bassTable = buildScalePitches(params.root, params.scale_intervals, 36, 60).length
+    ? buildScaleTable(params.root, params.scale_intervals, 36, 60)
+    : buildScaleTable(params.root, params.scale_intervals);
   const secondsPerBeat = 60.0 / params.tempo;
-  const totalBeats = BARS * BEATS_PER_BAR;
-  const beatsPerChord = totalBeats / params.chords.length;
+  const totalBeats = totalSteps(plan) / STEPS_PER_QUARTER;
 
   const notes = [];
   const patterns = ['root-fifth', 'walking', 'syncopated'];
   const pattern = patterns[Math.floor(Math.random() * patterns.length)];
 
-  for (let ci = 0; ci < params.chords.length; ci++) {
-    const chordInfo = Chord.get(params.chords[ci]);
+  for (const { chord, startBeat: chordStartBeat, beats: beatsPerChord } of chordSlots(plan, params.chords)) {
+    const chordInfo = Chord.get(chord);
     const rootNote = chordInfo.tonic || params.root;
     const rootMidi = Note.midi(rootNote + '2') || 48;
-    const root = quantizeToScale(rootMidi, bassPitches.length ? bassPitches : scalePitches);
-    const fifth = quantizeToScale(rootMidi + 7, bassPitches.length ? bassPitches : scalePitches);
-
-    const chordStartBeat = ci * beatsPerChord;
+    const root = quantizeToScale(rootMidi, bassTable);
+    const fifth = quantizeToScale(rootMidi + 7, bassTable);
 
     if (pattern === 'root-fifth') {
       for (let beat = 0; beat < beatsPerChord; beat++) {
@@ -163,7 +313,7 @@ function generateBass(params, scalePitches) {
       }
     } else if (pattern === 'walking') {
       const walkNotes = [root, root + 2, fifth, fifth - 2].map(
-        p => quantizeToScale(p, bassPitches.length ? bassPitches : scalePitches)
+        p => quantizeToScale(p, bassTable)
       );
       for (let beat = 0; beat < beatsPerChord; beat++) {
         const pitch = walkNotes[beat % walkNotes.length];
@@ -204,27 +354,24 @@ function generateBass(params, scalePitches) {
 
 // ── Chords generation (programmatic) ────────────────────────────────────
 
-function generateChords(params, scalePitches) {
+function generateChords(params, scaleTable, plan) {
   const secondsPerBeat = 60.0 / params.tempo;
-  const totalBeats = BARS * BEATS_PER_BAR;
-  const beatsPerChord = totalBeats / params.chords.length;
+  const totalBeats = totalSteps(plan) / STEPS_PER_QUARTER;
 
   const notes = [];
   const rhythms = ['whole', 'half', 'comp'];
   const rhythm = rhythms[Math.floor(Math.random() * rhythms.length)];
 
-  for (let ci = 0; ci < params.chords.length; ci++) {
-    const chordInfo = Chord.get(params.chords[ci]);
+  for (const { chord, startBeat: chordStartBeat, beats: beatsPerChord } of chordSlots(plan, params.chords)) {
+    const chordInfo = Chord.get(chord);
     if (chordInfo.empty) continue;
 
     // Voice the chord at octave 4
     const chordNotes = chordInfo.notes.map(noteName => {
       const midi = Note.midi(noteName + '4');
-      return midi ? quantizeToScale(midi, scalePitches) : null;
+      return midi ? quantizeToScale(midi, scaleTable) : null;
     }).filter(Boolean);
 
-    const chordStartBeat = ci * beatsPerChord;
-
     if (rhythm === 'whole') {
       const startTime = chordStartBeat * secondsPerBeat;
       const endTime = (chordStartBeat + beatsPerChord) * secondsPerBeat;
@@ -272,57 +419,124 @@ function generateChords(params, scalePitches) {
   };
 }
 
-// ── Main ────────────────────────────────────────────────────────────────
+// ── Combined export ─────────────────────────────────────────────────────
 
-async function main() {
-  const outputDir = process.argv[2];
-  if (!outputDir) {
-    console.error('Usage: node generate_midi.js <output-dir>');
-    process.exit(1);
-  }
+/**
+ * Merge the four tracks into one sequence. Each source track gets its own
+ * instrument number, so sequenceProtoToMidi writes a Type-1 file with one
+ * MIDI track per part; drum notes go to the GM percussion channel (10).
+ */
+function combineTracks(params, tracks) {
+  const secondsPerStep = 60.0 / params.tempo / STEPS_PER_QUARTER;
+  const notes = [];
+  let totalTime = 0;
 
-  // Read params from stdin
-  const input = fs.readFileSync(0, 'utf-8');
-  const params = JSON.parse(input);
+  tracks.forEach((track, instrument) => {
+    for (const n of track.notes) {
+      const quantized = n.quantizedStartStep !== undefined;
+      const startTime = quantized ? n.quantizedStartStep * secondsPerStep : n.startTime;
+      const endTime = quantized ? n.quantizedEndStep * secondsPerStep : n.endTime;
+      notes.push({
+        pitch: n.pitch,
+        velocity: n.velocity,
+        startTime,
+        endTime,
+        program: n.program || 0,
+        isDrum: !!n.isDrum,
+        instrument,
+      });
+      totalTime = Math.max(totalTime, endTime);
+    }
+  });
+
+  return {
+    ticksPerQuarter: 220,
+    tempos: [{ time: 0, qpm: params.tempo }],
+    timeSignatures: [{ time: 0, numerator: 4, denominator: 4 }],
+    totalTime,
+    notes,
+    controlChanges: [],
+  };
+}
 
+// ── Main ────────────────────────────────────────────────────────────────
+
+async function generateSong(params, outputDir) {
   console.log(`Generating MIDI: ${params.scale} in ${params.root}, ${params.tempo} BPM`);
 
   // Load scale intervals from params (passed through from scales.json by Python)
-  const scalePitches = buildScalePitches(params.root, params.scale_intervals);
+  const scaleTable = buildScaleTable(params.root, params.scale_intervals);
+  const plan = buildSongPlan(params);
+  console.log(`Structure: ${plan.map(s => s.name).join(' / ')} (${totalSteps(plan) / STEPS_PER_BAR} bars)`);
 
   // Ensure output directory exists
   fs.mkdirSync(outputDir, { recursive: true });
+  const written = [];
+  const writeMidi = (name, sequence) => {
+    fs.writeFileSync(path.join(outputDir, name), Buffer.from(core.sequenceProtoToMidi(sequence)));
+    written.push(name);
+  };
 
   // Generate all 4 tracks
   console.log('Generating melody (ImprovRNN)...');
-  const melody = await generateMelody(params, scalePitches);
-  fs.writeFileSync(
-    path.join(outputDir, 'melody.mid'),
-    Buffer.from(core.sequenceProtoToMidi(melody))
-  );
+  const melody = await generateMelody(params, scaleTable, plan);
+  writeMidi('melody.mid', melody);
 
   console.log('Generating drums (DrumsRNN)...');
-  const drums = await generateDrums(params);
-  fs.writeFileSync(
-    path.join(outputDir, 'drums.mid'),
-    Buffer.from(core.sequenceProtoToMidi(drums))
-  );
+  const drums = await generateDrums(params, plan);
+  writeMidi('drums.mid', drums);
 
   console.log('Generating bass (programmatic)...');
-  const bass = generateBass(params, scalePitches);
-  fs.writeFileSync(
-    path.join(outputDir, 'bass.mid'),
-    Buffer.from(core.sequenceProtoToMidi(bass))
-  );
+  const bass = generateBass(params, plan);
+  writeMidi('bass.mid', bass);
 
   console.log('Generating chords (programmatic)...');
-  const chords = generateChords(params, scalePitches);
-  fs.writeFileSync(
-    path.join(outputDir, 'chords.mid'),
-    Buffer.from(core.sequenceProtoToMidi(chords))
-  );
+  const chords = generateChords(params, scaleTable, plan);
+  writeMidi('chords.mid', chords);
 
-  console.log('Done! Generated 4 MIDI files.');
+  if (params.combined) {
+    console.log('Writing combined multi-track song.mid...');
+    const song = combineTracks(params, [melody, drums, bass, chords]);
+    writeMidi('song.mid', song);
+  }
+
+  console.log(`Done! Generated ${written.length} MIDI files (${written.join(', ')}).`);
+}
+
+async function serve() {
+  // stdout carries only the result lines; progress goes to stderr
+  console.log = console.error.bind(console);
+  const lines = readline.createInterface({ input: process.stdin });
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    let result;
+    try {
+      const job = JSON.parse(line);
+      await generateSong(job.params, job.output_dir);
+      result = { ok: true };
+    } catch (err) {
+      console.error('MIDI generation failed:', err);
+      result = { ok: false, error: String((err && err.message) || err) };
+    }
+    process.stdout.write(JSON.stringify(result) + '\n');
+  }
+}
+
+async function main() {
+  if (process.argv[2] === '--serve') {
+    return serve();
+  }
+
+  const outputDir = process.argv[2];
+  if (!outputDir) {
+    console.error('Usage: node generate_midi.js <output-dir> | --serve');
+    process.exit(1);
+  }
+
+  // Read params from stdin
+  const input = fs.readFileSync(0, 'utf-8');
+  const params = JSON.parse(input);
+  await generateSong(params, outputDir);
 }
 
 main().catch(err => {
@@ -0,0 +1,96 @@
+/**
+ * Song structure for generate_midi.js: the section plan and where each chord
+ * of the progression falls. Kept free of Magenta/tonal so it loads (and can
+ * be tested) without the models.
+ *
+ * Every section starts the chord progression from its first chord, so a
+ * section replayed later in the song (the chorus) lines up with the same
+ * chords it was generated over, whatever the section length.
+ */
+
+const STEPS_PER_QUARTER = 4;
+const BEATS_PER_BAR = 4;
+const STEPS_PER_BAR = BEATS_PER_BAR * STEPS_PER_QUARTER; // 16
+const PROGRESSION_BARS = 4; // one pass through the 4-chord progression
+const CHUNK_STEPS = PROGRESSION_BARS * STEPS_PER_BAR; // 64
+
+// Per-section tweaks. Repeating sections are generated once and reused.
+const SECTION_STYLES = {
+  intro: { temperatureScale: 0.8, repeat: false },
+  verse: { temperatureScale: 1.0, repeat: false },
+  chorus: { temperatureScale: 1.1, repeat: true },
+};
+
+function buildSongPlan(params) {
+  const barsPerSection = Math.max(1, Math.round(params.bars_per_section || PROGRESSION_BARS));
+  const names = (params.sections || []).filter(name => {
+    if (!SECTION_STYLES[name]) {
+      console.warn(`Unknown section '${name}', skipping`);
+      return false;
+    }
+    return true;
+  });
+  if (!names.length) names.push('verse');
+
+  let startStep = 0;
+  return names.map(name => {
+    const section = { name, startStep, steps: barsPerSection * STEPS_PER_BAR, ...SECTION_STYLES[name] };
+    startStep += section.steps;
+    return section;
+  });
+}
+
+function totalSteps(plan) {
+  const last = plan[plan.length - 1];
+  return last.startStep + last.steps;
+}
+
+/** Chord playing at an absolute step (the progression restarts each section). */
+function chordAt(plan, chords, step) {
+  const slotSteps = CHUNK_STEPS / chords.length;
+  const section = plan.find(s => step < s.startStep + s.steps) || plan[plan.length - 1];
+  const slot = Math.floor(Math.max(0, step - section.startStep) / slotSteps);
+  return chords[slot % chords.length];
+}
+
+/** Chords covering [startStep, startStep + steps), one entry per chord slot. */
+function chordsForRange(plan, chords, startStep, steps) {
+  const slotSteps = CHUNK_STEPS / chords.length;
+  const count = Math.ceil(steps / slotSteps);
+  return Array.from({ length: count }, (_, i) => chordAt(plan, chords, startStep + i * slotSteps));
+}
+
+/**
+ * Every chord slot of the song, in beats: [{ chord, startBeat, beats }].
+ * A slot cut short by the end of its section keeps only the beats left.
+ */
+function chordSlots(plan, chords) {
+  const beatsPerChord = (PROGRESSION_BARS * BEATS_PER_BAR) / chords.length;
+  const slots = [];
+  for (const section of plan) {
+    const sectionStart = section.startStep / STEPS_PER_QUARTER;
+    const sectionBeats = section.steps / STEPS_PER_QUARTER;
+    for (let i = 0; i * beatsPerChord < sectionBeats; i++) {
+      slots.push({
+        chord: chords[i % chords.length],
+        startBeat: sectionStart + i * beatsPerChord,
+        beats: Math.min(beatsPerChord, sectionBeats - i * beatsPerChord),
+      });
+    }
+  }
+  return slots;
+}
+
+module.exports = {
+  STEPS_PER_QUARTER,
+  BEATS_PER_BAR,
+  STEPS_PER_BAR,
+  PROGRESSION_BARS,
+  CHUNK_STEPS,
+  SECTION_STYLES,
+  buildSongPlan,
+  totalSteps,
+  chordAt,
+  chordsForRange,
+  chordSlots,
+};
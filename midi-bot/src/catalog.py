@@ -0,0 +1,54 @@
+"""Scale and instrument catalog, loaded once and indexed for fast lookups."""
+import bisect
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class MusicCatalog:
+    scales: list[dict]
+    instruments: dict[str, list[dict]]
+    scales_by_name: dict[str, dict] = field(init=False)
+    names_by_program: dict[str, dict[int, str]] = field(init=False)
+    sorted_programs: dict[str, list[int]] = field(init=False)
+
+    def __post_init__(self):
+        self.scales_by_name = {s["name"]: s for s in self.scales}
+        self.names_by_program = {
+            role: {i["program"]: i["name"] for i in entries}
+            for role, entries in self.instruments.items()
+        }
+        self.sorted_programs = {
+            role: sorted(names) for role, names in self.names_by_program.items()
+        }
+
+    def scale(self, name: str) -> dict | None:
+        """Look up a scale entry by name."""
+        return self.scales_by_name.get(name)
+
+    def instrument_name(self, role: str, program: int) -> str:
+        """Look up an instrument name by role and MIDI program number."""
+        return self.names_by_program.get(role, {}).get(program, f"MIDI {program}")
+
+    def has_program(self, role: str, program) -> bool:
+        """Check whether a program number is valid for the given role."""
+        return program in self.names_by_program.get(role, {})
+
+    def closest_program(self, role: str, target: int) -> int:
+        """Find the valid program for a role nearest to target (lower wins ties)."""
+        programs = self.sorted_programs[role]
+        i = bisect.bisect_left(programs, target)
+        if i == 0:
+            return programs[0]
+        if i == len(programs):
+            return programs[-1]
+        before, after = programs[i - 1], programs[i]
+        return before if target - before <= after - target else after
+
+
+def load_catalog(scales_path: Path, instruments_path: Path) -> MusicCatalog:
+    """Load scales and instruments databases into an indexed catalog."""
+    scales = json.loads(scales_path.read_text())
+    instruments = json.loads(instruments_path.read_text())
+    return MusicCatalog(scales, instruments)
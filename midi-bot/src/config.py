@@ -2,7 +2,7 @@
 from pathlib import Path
 from typing import Any
 
-import yaml
+from bot_core import config as core_config
 
 
 DEFAULT_CONFIG = {
@@ -18,6 +18,29 @@ DEFAULT_CONFIG = {
         "file": "inspirations.txt",
         "pick_count": 2,
     },
+    "song": {
+        "bars_per_section": 4,
+        "sections": ["verse"],
+    },
+    "export": {
+        "combined": False,
+    },
+    "preview": {
+        "enabled": False,
+        "tracks": ["song"],
+        "soundfont": "/usr/share/sounds/sf2/FluidR3_GM.sf2",
+        "format": "ogg",
+        "workers": 2,
+        "cache_dir": "~/.cache/midi-bot/previews",
+    },
+    "outbox": {
+        "path": "~/.cache/midi-bot/outbox.db",
+        "max_attempts": 5,
+    },
+    "report": {
+        "path": "~/.cache/midi-bot/run-report.json",
+        "otlp_endpoint": None,
+    },
     "sources": [
         "reuters", "foxnews", "cnn", "bbc",
         "ft", "npr", "guardian", "breitbart"
@@ -27,33 +50,18 @@ DEFAULT_CONFIG = {
 
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load config from YAML file, falling back to defaults."""
-    config = DEFAULT_CONFIG.copy()
-    if config_path.exists():
-        with open(config_path) as f:
-            file_config = yaml.safe_load(f) or {}
-        config = _deep_merge(config, file_config)
-    return config
-
-
-def _deep_merge(base: dict, override: dict) -> dict:
-    """Deep merge override into base."""
-    result = base.copy()
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = _deep_merge(result[key], value)
-        else:
-            result[key] = value
-    return result
+    return core_config.load_config(config_path, DEFAULT_CONFIG)
 
 
 def merge_cli_args(config: dict[str, Any], args) -> dict[str, Any]:
     """Merge CLI arguments into config, overriding where specified."""
-    if hasattr(args, 'channel') and args.channel:
-        config["slack"]["channel"] = args.channel
-    if hasattr(args, 'temperature') and args.temperature is not None:
-        config["prompt"]["temperature"] = args.temperature
-    if hasattr(args, 'sources') and args.sources:
-        config["sources"] = args.sources.split(",")
-    if hasattr(args, 'no_inspirations') and args.no_inspirations:
-        config["inspirations"]["pick_count"] = 0
+    config = core_config.merge_cli_args(config, args)
+    if hasattr(args, 'bars') and args.bars is not None:
+        config["song"]["bars_per_section"] = args.bars
+    if hasattr(args, 'sections') and args.sections:
+        config["song"]["sections"] = args.sections.split(",")
+    if hasattr(args, 'combined') and args.combined:
+        config["export"]["combined"] = True
+    if hasattr(args, 'preview') and args.preview:
+        config["preview"]["enabled"] = True
     return config
@@ -5,43 +5,24 @@ import re
 from pathlib import Path
 from typing import Any
 
-from huggingface_hub import InferenceClient
+from bot_core.llm import build_messages, chat, chat_async, load_template, strip_think_tags
+from src.catalog import MusicCatalog
 
 logger = logging.getLogger(__name__)
 
 
-def load_scales(scales_path: Path) -> list[dict]:
-    """Load scales database from JSON file."""
-    return json.loads(scales_path.read_text())
-
-
-def load_instruments(instruments_path: Path) -> dict[str, list[dict]]:
-    """Load instruments database from JSON file."""
-    return json.loads(instruments_path.read_text())
-
-
-def load_template(template_path: Path) -> tuple[str, str]:
-    """Load prompt template. Returns (system_prompt, user_template)."""
-    content = template_path.read_text()
-    parts = content.split("---", 1)
-    if len(parts) == 2:
-        return parts[0].strip(), parts[1].strip()
-    return "", content.strip()
-
-
 def build_llm_prompt(
     template: str,
     headlines: list[str],
     inspirations: list[str],
-    scales: list[dict],
-    instruments: dict[str, list[dict]],
+    catalog: MusicCatalog,
 ) -> str:
     """Build the prompt with all context injected."""
     headlines_text = "\n".join(f"- {h}" for h in headlines)
     inspirations_text = "\n".join(f"- {i}" for i in inspirations) if inspirations else "(none)"
-    scales_text = "\n".join(f"- {s['name']} ({s['origin']})" for s in scales)
-    melody_text = "\n".join(f"- {i['program']}: {i['name']}" for i in instruments["melody"])
-    chords_text = "\n".join(f"- {i['program']}: {i['name']}" for i in instruments["chords"])
+    scales_text = "\n".join(f"- {s['name']} ({s['origin']})" for s in catalog.scales)
+    melody_text = "\n".join(f"- {i['program']}: {i['name']}" for i in catalog.instruments["melody"])
+    chords_text = "\n".join(f"- {i['program']}: {i['name']}" for i in catalog.instruments["chords"])
 
     return template.format(
         headlines=headlines_text,
@@ -54,9 +35,7 @@ def build_llm_prompt(
 
 def parse_llm_response(response: str) -> dict[str, Any]:
     """Parse the LLM's JSON response, handling code fences and think tags."""
-    # Strip think tags
-    cleaned = re.sub(r'<think>.*?</think>', '', response, flags=re.DOTALL).strip()
-    cleaned = re.sub(r'<think>.*', '', cleaned, flags=re.DOTALL).strip()
+    cleaned = strip_think_tags(response)
     # Strip markdown code fences
     cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
     cleaned = re.sub(r'\n?```\s*$', '', cleaned)
@@ -67,16 +46,7 @@ def parse_llm_response(response: str) -> dict[str, Any]:
         raise ValueError(f"Failed to parse LLM response as JSON: {e}\nResponse: {response[:200]}")
 
 
-def _closest_program(target: int, valid_programs: set[int]) -> int:
-    """Find the closest valid MIDI program number to the target."""
-    return min(valid_programs, key=lambda p: abs(p - target))
-
-
-def validate_params(
-    params: dict[str, Any],
-    scales: list[dict],
-    instruments: dict[str, list[dict]],
-) -> None:
+def validate_params(params: dict[str, Any], catalog: MusicCatalog) -> None:
     """Validate and auto-correct LLM-generated params.
 
     Instead of crashing on invalid values, fix them and log warnings.
@@ -84,10 +54,9 @@ def validate_params(
     """
     import random
 
-    scale_names = {s["name"] for s in scales}
-    if params.get("scale") not in scale_names:
+    if catalog.scale(params.get("scale")) is None:
         old = params.get("scale")
-        params["scale"] = random.choice(list(scale_names))
+        params["scale"] = random.choice(list(catalog.scales_by_name))
         logger.warning(f"Unknown scale '{old}', using '{params['scale']}' instead")
 
     tempo = params.get("tempo", 120)
@@ -100,16 +69,14 @@ def validate_params(
         params["temperature"] = max(0.5, min(1.5, temp))
         logger.warning(f"Clamped temperature {temp} to {params['temperature']}")
 
-    valid_melody = {i["program"] for i in instruments["melody"]}
-    if params.get("melody_instrument") not in valid_melody:
+    if not catalog.has_program("melody", params.get("melody_instrument")):
         old = params.get("melody_instrument")
-        params["melody_instrument"] = _closest_program(old or 0, valid_melody)
+        params["melody_instrument"] = catalog.closest_program("melody", old or 0)
         logger.warning(f"Invalid melody_instrument {old}, using {params['melody_instrument']} instead")
 
-    valid_chords = {i["program"] for i in instruments["chords"]}
-    if params.get("chord_instrument") not in valid_chords:
+    if not catalog.has_program("chords", params.get("chord_instrument")):
         old = params.get("chord_instrument")
-        params["chord_instrument"] = _closest_program(old or 0, valid_chords)
+        params["chord_instrument"] = catalog.closest_program("chords", old or 0)
         logger.warning(f"Invalid chord_instrument {old}, using {params['chord_instrument']} instead")
 
     if not isinstance(params.get("chords"), list) or len(params["chords"]) != 4:
@@ -118,41 +85,54 @@ def validate_params(
         params["chords"] = [f"{root}m", f"{root}m7", f"{root}m", f"{root}m7"]
 
 
-def generate_music_params(
+def _build_messages(
     headlines: list[str],
     inspirations: list[str],
-    scales: list[dict],
-    instruments: dict[str, list[dict]],
-    model: str,
-    temperature: float,
-    api_key: str,
-    template_path: Path = None,
-) -> dict[str, Any]:
-    """Generate structured music parameters via LLM."""
-    client = InferenceClient(token=api_key)
-
+    catalog: MusicCatalog,
+    template_path: Path | None,
+) -> list[dict]:
+    """Build the chat messages for the LLM from the prompt template."""
     if template_path is None:
         template_path = Path(__file__).parent.parent / "prompt_template.txt"
 
     system_prompt, user_template = load_template(template_path)
-    user_prompt = build_llm_prompt(user_template, headlines, inspirations, scales, instruments)
-
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": user_prompt})
-
-    response = client.chat_completion(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=1000,
-    )
+    user_prompt = build_llm_prompt(user_template, headlines, inspirations, catalog)
+    return build_messages(system_prompt, user_prompt)
+
 
-    result_text = response.choices[0].message.content.strip()
+def _params_from_response(result_text: str, catalog: MusicCatalog) -> dict[str, Any]:
+    """Parse and validate the music parameters in an LLM response."""
     logger.info(f"LLM response: {result_text[:200]}")
 
     params = parse_llm_response(result_text)
-    validate_params(params, scales, instruments)
-
+    validate_params(params, catalog)
     return params
+
+
+def generate_music_params(
+    headlines: list[str],
+    inspirations: list[str],
+    catalog: MusicCatalog,
+    model: str,
+    temperature: float,
+    api_key: str,
+    template_path: Path = None,
+) -> dict[str, Any]:
+    """Generate structured music parameters via LLM."""
+    messages = _build_messages(headlines, inspirations, catalog, template_path)
+    return _params_from_response(chat(messages, model, temperature, api_key), catalog)
+
+
+async def generate_music_params_async(
+    headlines: list[str],
+    inspirations: list[str],
+    catalog: MusicCatalog,
+    model: str,
+    temperature: float,
+    api_key: str,
+    template_path: Path = None,
+) -> dict[str, Any]:
+    """Async variant of generate_music_params."""
+    messages = _build_messages(headlines, inspirations, catalog, template_path)
+    result_text = await chat_async(messages, model, temperature, api_key)
+    return _params_from_response(result_text, catalog)
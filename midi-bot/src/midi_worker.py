@@ -0,0 +1,94 @@
+"""Resident Node.js MIDI generator, so the Magenta models load once per process.
+
+Runs `node generate_midi.js --serve` and feeds it one job per line. Used when
+the bot is hosted by a long-running process (e.g. the bot scheduler); the
+one-shot CLI keeps spawning a fresh generator per run.
+"""
+import json
+import logging
+import queue
+import subprocess
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class MidiWorker:
+    """A generate_midi.js --serve subprocess, restarted if it dies or hangs."""
+
+    def __init__(self, script_path: Path):
+        self.script_path = script_path
+        self.process: subprocess.Popen | None = None
+        self.results: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+
+    def _start(self) -> None:
+        logger.info("Starting resident MIDI generator")
+        self.process = subprocess.Popen(
+            ["node", str(self.script_path), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=str(self.script_path.parent),
+        )
+        self.results = queue.Queue()
+        threading.Thread(
+            target=self._read_results, args=(self.process, self.results), daemon=True
+        ).start()
+
+    @staticmethod
+    def _read_results(process: subprocess.Popen, results: queue.Queue) -> None:
+        for line in process.stdout:
+            results.put(line)
+        results.put(None)  # generator exited
+
+    def generate(self, params: dict, output_dir: Path, timeout: float) -> bool:
+        """Generate MIDI files for params into output_dir. Returns True on success."""
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+            job = {"output_dir": str(output_dir), "params": params}
+            try:
+                self.process.stdin.write(json.dumps(job) + "\n")
+                self.process.stdin.flush()
+                line = self.results.get(timeout=timeout)
+            except BrokenPipeError:
+                line = None
+            except queue.Empty:
+                logger.error(f"MIDI generation timed out ({timeout}s), restarting generator")
+                self._stop()
+                return False
+
+            if line is None:
+                logger.error("Resident MIDI generator exited unexpectedly")
+                self._stop()
+                return False
+            try:
+                result = json.loads(line)
+            except ValueError:
+                logger.error(f"Unexpected output from MIDI generator, restarting it: {line.strip()!r}")
+                self._stop()
+                return False
+            if not result.get("ok"):
+                logger.error(f"MIDI generation failed: {result.get('error')}")
+            return bool(result.get("ok"))
+
+    def _stop(self) -> None:
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def close(self) -> None:
+        """Stop the generator (it also exits on its own when stdin closes)."""
+        with self.lock:
+            if self.process is not None and self.process.poll() is None:
+                self.process.stdin.close()
+                try:
+                    self.process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    pass
+            self._stop()
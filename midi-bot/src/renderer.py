@@ -0,0 +1,109 @@
+"""Offline audio previews of generated MIDI via FluidSynth + a GM SoundFont."""
+import hashlib
+import logging
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# libsndfile file types FluidSynth can write, keyed by file extension
+FILE_TYPES = {
+    "ogg": "oga",
+    "flac": "flac",
+    "wav": "wav",
+}
+
+
+def _cache_key(midi_path: Path, soundfont: Path, fmt: str) -> str:
+    """Hash the MIDI content together with everything that affects the render.
+
+    The SoundFont is identified by its path, size and mtime (hashing a
+    100+ MB file per render would cost more than rendering), so replacing
+    or updating it under the same name invalidates its cached previews.
+    """
+    sf = soundfont.stat()
+    digest = hashlib.sha256(midi_path.read_bytes())
+    digest.update(f"|{soundfont.resolve()}|{sf.st_size}|{sf.st_mtime_ns}|{fmt}".encode())
+    return digest.hexdigest()
+
+
+def render_preview(
+    midi_path: Path,
+    output_path: Path,
+    soundfont: Path,
+    cache_dir: Path,
+    fmt: str = "ogg",
+    timeout: int = 120,
+) -> Path | None:
+    """Render one MIDI file to compressed audio. Returns None on failure."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cached = cache_dir / f"{_cache_key(midi_path, soundfont, fmt)}.{fmt}"
+
+    if cached.exists():
+        logger.info(f"Preview cache hit for {midi_path.name}")
+    else:
+        partial = cached.with_suffix(f".partial.{fmt}")
+        try:
+            result = subprocess.run(
+                [
+                    "fluidsynth", "-ni",
+                    "-F", str(partial),
+                    "-T", FILE_TYPES[fmt],
+                    "-r", "44100",
+                    str(soundfont), str(midi_path),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Rendering {midi_path.name} timed out ({timeout}s)")
+            partial.unlink(missing_ok=True)
+            return None
+        if result.returncode != 0 or not partial.exists():
+            logger.warning(f"FluidSynth failed for {midi_path.name}: {result.stderr.strip()}")
+            partial.unlink(missing_ok=True)
+            return None
+        partial.replace(cached)
+        logger.info(f"Rendered {midi_path.name} ({cached.stat().st_size} bytes)")
+
+    shutil.copyfile(cached, output_path)
+    return output_path
+
+
+def render_previews(
+    midi_paths: list[Path],
+    output_dir: Path,
+    soundfont: Path,
+    cache_dir: Path,
+    fmt: str = "ogg",
+    max_workers: int = 2,
+) -> list[Path]:
+    """Render several MIDI files in a bounded worker pool.
+
+    Skips rendering (returns []) if FluidSynth or the SoundFont is missing,
+    since previews are optional. Returns the previews that rendered, in
+    input order.
+    """
+    if fmt not in FILE_TYPES:
+        logger.warning(f"Unsupported preview format '{fmt}', skipping previews")
+        return []
+    if shutil.which("fluidsynth") is None:
+        logger.warning("fluidsynth not installed, skipping previews")
+        return []
+    if not soundfont.exists():
+        logger.warning(f"SoundFont not found: {soundfont}, skipping previews")
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(
+                render_preview, path, output_dir / f"{path.stem}.{fmt}",
+                soundfont, cache_dir, fmt,
+            )
+            for path in midi_paths
+        ]
+        results = [f.result() for f in futures]
+    return [r for r in results if r is not None]
@@ -1,31 +1,33 @@
 """Slack poster with MIDI file upload support."""
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from slack_sdk import WebClient
+from bot_core import tracing
+from bot_core.slack_client import RateLimitedClient, api_base_url
+from src.catalog import MusicCatalog
 
 logger = logging.getLogger(__name__)
 
+TRACKS = ["melody", "drums", "bass", "chords"]
+
 TRACK_LABELS = {
     "melody": ":musical_keyboard: Melody",
     "drums": ":drum_with_drumsticks: Drums",
     "bass": ":guitar: Bass",
     "chords": ":musical_score: Chords",
+    "song": ":musical_note: Full song (all tracks)",
 }
 
+PREVIEW_LABEL = ":headphones: Audio preview"
 
-def _find_instrument_name(program: int, instrument_list: list[dict]) -> str:
-    """Look up instrument name by MIDI program number."""
-    for inst in instrument_list:
-        if inst["program"] == program:
-            return inst["name"]
-    return f"MIDI {program}"
+# Upper bound on concurrent files_upload_v2 calls (Slack tier 2/3 limits)
+UPLOAD_WORKERS = 4
 
 
-def format_message(params: dict, instruments: dict) -> str:
+def format_message(params: dict, catalog: MusicCatalog) -> str:
     """Format the main Slack message with all metadata."""
-    melody_name = _find_instrument_name(params["melody_instrument"], instruments["melody"])
-    chord_name = _find_instrument_name(params["chord_instrument"], instruments["chords"])
+    melody_name = catalog.instrument_name("melody", params["melody_instrument"])
     chords_str = "  ".join(params["chords"])
 
     lines = [
@@ -34,58 +36,127 @@ def format_message(params: dict, instruments: dict) -> str:
         "",
         f":musical_keyboard: Melody — ImprovRNN, {melody_name} (MIDI {params['melody_instrument']}), temperature {params['temperature']}",
         f":drum_with_drumsticks: Drums — DrumsRNN, temperature {params['temperature']}",
-        f":guitar: Bass — Programmatic from chord roots",
+        ":guitar: Bass — Programmatic from chord roots",
         f":musical_score: Chords — {chords_str}",
     ]
     return "\n".join(lines)
 
 
+def _upload_file(client: RateLimitedClient, filepath: Path) -> str | None:
+    """Upload one file without sharing it anywhere yet.
+
+    Returns the file's permalink, or None on failure. The upload response
+    only carries the file ID and title, so the permalink comes from files.info.
+    """
+    if not filepath.exists():
+        logger.warning(f"Missing file: {filepath}")
+        return None
+
+    try:
+        resp = client.files_upload_v2(file=str(filepath), filename=filepath.name)
+        info = client.files_info(file=resp["file"]["id"])
+        logger.info(f"Uploaded {filepath.name}")
+        return info["file"]["permalink"]
+    except Exception as upload_err:
+        logger.warning(f"Failed to upload {filepath.name}: {upload_err}")
+        if hasattr(upload_err, 'response') and upload_err.response:
+            logger.warning(f"Slack API response: {upload_err.response.data}")
+        return None
+
+
+def _share_file(
+    client: RateLimitedClient, channel_id: str, thread_ts: str, filepath: Path,
+    permalink: str, label: str,
+) -> bool:
+    """Share an uploaded file as a threaded reply by posting its permalink."""
+    try:
+        client.chat_postMessage(channel=channel_id, thread_ts=thread_ts, text=f"{label}\n{permalink}")
+        return True
+    except Exception as share_err:
+        logger.warning(f"Failed to share {filepath.name}: {share_err}")
+        return False
+
+
 def post_midi_to_slack(
     params: dict,
-    instruments: dict,
+    catalog: MusicCatalog,
     midi_dir: Path,
     channel: str,
     token: str,
+    combined: bool = False,
+    previews: list[Path] | None = None,
+    progress: dict | None = None,
 ) -> bool:
-    """Post main message + 4 MIDI files as threaded replies."""
+    """Post main message + MIDI files as threaded replies.
+
+    Uploads the 4 per-track files, or just the multi-track song.mid when
+    combined is set, followed by any rendered audio previews.
+
+    If a progress dict is given, the thread, the uploaded files' permalinks
+    and the files shared in the thread are recorded in it, and steps it
+    already lists are skipped, so a retry resumes instead of posting a
+    duplicate message or uploading a file twice.
+
+    Returns False if the main message could not be posted or no file could
+    be shared.
+    """
+    from slack_sdk import WebClient
+
+    progress = {} if progress is None else progress
+    progress.setdefault("uploaded", [])  # shared in the thread
+    progress.setdefault("files", {})  # uploaded: file name -> permalink
     try:
-        client = WebClient(token=token)
-
-        # Post main message
-        message = format_message(params, instruments)
-        resp = client.chat_postMessage(channel=channel, text=message)
-        thread_ts = resp["ts"]
-        channel_id = resp["channel"]  # resolved ID (files_upload_v2 needs ID, not name)
-        logger.info(f"Posted main message to {channel} ({channel_id})")
-
-        # Upload each MIDI file as a threaded reply
-        upload_failures = 0
-        for track in ["melody", "drums", "bass", "chords"]:
-            filepath = midi_dir / f"{track}.mid"
-            if not filepath.exists():
-                logger.warning(f"Missing MIDI file: {filepath}")
-                upload_failures += 1
-                continue
+        client = RateLimitedClient(WebClient(token=token, base_url=api_base_url()))
+
+        # Post main message (unless an earlier attempt already did)
+        if "thread_ts" not in progress:
+            message = format_message(params, catalog)
+            resp = client.chat_postMessage(channel=channel, text=message)
+            progress["thread_ts"] = resp["ts"]
+            progress["channel_id"] = resp["channel"]  # resolved ID, used for the threaded replies
+            logger.info(f"Posted main message to {channel} ({progress['channel_id']})")
+        thread_ts = progress["thread_ts"]
+        channel_id = progress["channel_id"]
 
-            try:
-                client.files_upload_v2(
-                    channel=channel_id,
-                    file=str(filepath),
-                    filename=f"{track}.mid",
-                    initial_comment=TRACK_LABELS[track],
-                    thread_ts=thread_ts,
-                )
-                logger.info(f"Uploaded {track}.mid")
-            except Exception as upload_err:
-                logger.warning(f"Failed to upload {track}.mid: {upload_err}")
-                if hasattr(upload_err, 'response') and upload_err.response:
-                    logger.warning(f"Slack API response: {upload_err.response.data}")
-                upload_failures += 1
+        # Upload each MIDI file (and audio preview) concurrently so posting
+        # costs about one upload round trip, then share them in the thread
+        # one by one so the replies keep the TRACKS order
+        uploads = [
+            (midi_dir / f"{track}.mid", TRACK_LABELS[track])
+            for track in (["song"] if combined else TRACKS)
+        ]
+        uploads += [
+            (path, f"{PREVIEW_LABEL} ({path.stem})") for path in previews or []
+        ]
+        uploads = [u for u in uploads if u[0].name not in progress["uploaded"]]
+        if not uploads:
+            return True
+        to_upload = [path for path, _ in uploads if path.name not in progress["files"]]
+        if to_upload:
+            workers = max(1, min(UPLOAD_WORKERS, len(to_upload)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                permalinks = list(pool.map(lambda path: _upload_file(client, path), to_upload))
+            for path, permalink in zip(to_upload, permalinks):
+                if permalink is not None:
+                    progress["files"][path.name] = permalink
+            tracing.add("bytes", sum(
+                path.stat().st_size for path, permalink in zip(to_upload, permalinks) if permalink
+            ))
 
+        shared = []
+        for path, label in uploads:
+            permalink = progress["files"].get(path.name)
+            if permalink is None:
+                continue
+            if _share_file(client, channel_id, thread_ts, path, permalink, label):
+                shared.append(path.name)
+                progress["uploaded"].append(path.name)
+
+        upload_failures = len(uploads) - len(shared)
         if upload_failures > 0:
-            logger.warning(f"{upload_failures}/4 file uploads failed (missing files:write scope?)")
+            logger.warning(f"{upload_failures}/{len(uploads)} file uploads failed (missing files:write scope?)")
 
-        return True
+        return bool(shared)
     except Exception as e:
         logger.error(f"Failed to post to Slack: {e}")
         return False
@@ -0,0 +1,112 @@
+"""Tests for main bot entrypoint."""
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+import json
+import os
+
+import pytest
+
+PARAMS = {
+    "scale": "Hirajoshi", "root": "D", "tempo": 95,
+    "temperature": 1.2, "melody_instrument": 73,
+    "chord_instrument": 0, "chords": ["Dm", "Am", "Em", "Dm"],
+    "description": "test",
+}
+
+
+class DryRunArgs:
+    dry_run = True
+    channel = None
+    temperature = None
+    sources = None
+    no_inspirations = False
+    bars = None
+    sections = None
+    combined = False
+    preview = False
+    drain = False
+    keep_warm = False
+    use_async = False
+    config = "config.yaml"
+    report = None
+
+
+@pytest.fixture
+def args(tmp_path):
+    class Args(DryRunArgs):
+        report = str(tmp_path / "report.json")
+
+    return Args
+
+
+def test_bot_dry_run_does_not_post(args):
+    """Dry run generates MIDI files but doesn't post to Slack."""
+    with patch("bot.scrape_all_sources", return_value=["Test headline"]), \
+         patch("bot.load_inspirations", return_value=["test style"]), \
+         patch("bot.sample_inspirations", return_value=["test style"]), \
+         patch("bot.generate_music_params", return_value=PARAMS), \
+         patch("bot._generate_files", return_value=[]) as mock_generate, \
+         patch("bot.post_midi_to_slack") as mock_post, \
+         patch.dict(os.environ, {"HF_TOKEN": "test"}):
+
+        import bot
+
+        assert bot.run_bot(args()) == 0
+
+    mock_post.assert_not_called()
+    assert mock_generate.call_args[0][0] == PARAMS
+    assert mock_generate.call_args[0][3] == Path(bot.__file__).parent / "dry-run-output"
+
+
+def test_bot_async_dry_run_does_not_post(args, tmp_path):
+    """--async runs the asyncio pipeline end to end without posting."""
+    with patch("bot.scrape_all_sources_async", AsyncMock(return_value=["Test headline"])), \
+         patch("bot.load_inspirations", return_value=["test style"]), \
+         patch("bot.sample_inspirations", return_value=["test style"]), \
+         patch("bot.generate_music_params_async", AsyncMock(return_value=PARAMS)) as mock_params, \
+         patch("bot._generate_files", return_value=[]) as mock_generate, \
+         patch("bot.post_midi_to_slack") as mock_post, \
+         patch.dict(os.environ, {"HF_TOKEN": "test"}):
+
+        from bot import run_bot
+
+        class AsyncArgs(args):
+            use_async = True
+
+        assert run_bot(AsyncArgs()) == 0
+
+    mock_params.assert_awaited_once()
+    assert mock_params.call_args[1]["headlines"] == ["Test headline"]
+    mock_generate.assert_called_once()
+    mock_post.assert_not_called()
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["spans"]["attributes"]["mode"] == "async"
+    assert report["spans"]["attributes"]["exit_code"] == 0
+
+
+def test_drain_outbox_removes_files_of_dead_posts(tmp_path):
+    """Posts the outbox gives up on don't keep their MIDI files forever."""
+    from bot import drain_outbox
+    from bot_core.outbox import Outbox
+    from src.catalog import MusicCatalog
+
+    outbox = Outbox(tmp_path / "outbox.db")
+    entries = {}
+    for name in ("dead", "pending"):
+        files_dir = tmp_path / "outbox-files" / name
+        files_dir.mkdir(parents=True)
+        (files_dir / "melody.mid").write_bytes(b"fake midi")
+        entries[name] = outbox.enqueue("midi", {
+            "params": PARAMS, "channel": "#test", "files_dir": str(files_dir),
+            "combined": False, "previews": [],
+        })
+    outbox.conn.execute("UPDATE posts SET attempts = 4 WHERE id = ?", (entries["dead"].id,))
+    outbox.conn.commit()
+
+    with patch("bot.post_midi_to_slack", return_value=False):
+        remaining = drain_outbox(outbox, {"outbox": {"max_attempts": 5}}, MusicCatalog([], {}), "xoxb-test")
+
+    assert remaining == 1
+    assert outbox.get(entries["dead"].id).status == "dead"
+    assert not (tmp_path / "outbox-files" / "dead").exists()
+    assert (tmp_path / "outbox-files" / "pending" / "melody.mid").exists()
@@ -0,0 +1,49 @@
+import json
+import pytest
+from src.catalog import MusicCatalog, load_catalog
+
+
+SAMPLE_SCALES = [
+    {"name": "Hirajoshi", "intervals": [0,4,6,7,11], "origin": "Japanese"},
+    {"name": "Blues Hexatonic", "intervals": [0,3,5,6,7,10], "origin": "African-American"},
+]
+
+SAMPLE_INSTRUMENTS = {
+    "melody": [{"program": 73, "name": "Flute"}, {"program": 11, "name": "Vibraphone"}],
+    "chords": [{"program": 0, "name": "Acoustic Grand Piano"}, {"program": 6, "name": "Harpsichord"}],
+}
+
+
+def test_scale_lookup_by_name():
+    """Scales are indexed by name."""
+    catalog = MusicCatalog(SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    assert catalog.scale("Hirajoshi")["intervals"] == [0,4,6,7,11]
+    assert catalog.scale("Nonexistent") is None
+
+
+def test_instrument_name_lookup():
+    """Instrument names resolve by role and program, with a fallback."""
+    catalog = MusicCatalog(SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    assert catalog.instrument_name("melody", 73) == "Flute"
+    assert catalog.instrument_name("chords", 73) == "MIDI 73"
+
+
+def test_closest_program():
+    """Nearest valid program is found by bisect, lower program wins ties."""
+    catalog = MusicCatalog(SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    assert catalog.closest_program("melody", 106) == 73
+    assert catalog.closest_program("melody", 0) == 11
+    assert catalog.closest_program("melody", 50) == 73
+    assert catalog.closest_program("chords", 3) == 0
+    assert catalog.closest_program("chords", 4) == 6
+
+
+def test_load_catalog(tmp_path):
+    """Catalog loads from the scales and instruments JSON files."""
+    scales_path = tmp_path / "scales.json"
+    instruments_path = tmp_path / "instruments.json"
+    scales_path.write_text(json.dumps(SAMPLE_SCALES))
+    instruments_path.write_text(json.dumps(SAMPLE_INSTRUMENTS))
+    catalog = load_catalog(scales_path, instruments_path)
+    assert catalog.has_program("chords", 6)
+    assert not catalog.has_program("chords", 73)
@@ -38,3 +38,22 @@ def test_merge_cli_args():
     result = merge_cli_args(config, Args())
     assert result["slack"]["channel"] == "#override"
     assert result["prompt"]["temperature"] == 0.8
+
+
+def test_merge_cli_args_song_structure():
+    """--bars and --sections override the song structure."""
+    config = {"slack": {"channel": "#midieval"}, "prompt": {"temperature": 1.0},
+              "inspirations": {"pick_count": 2}, "sources": ["reuters"],
+              "song": {"bars_per_section": 4, "sections": ["verse"]}}
+
+    class Args:
+        channel = None
+        temperature = None
+        sources = None
+        no_inspirations = False
+        bars = 8
+        sections = "intro,verse,chorus"
+
+    result = merge_cli_args(config, Args())
+    assert result["song"]["bars_per_section"] == 8
+    assert result["song"]["sections"] == ["intro", "verse", "chorus"]
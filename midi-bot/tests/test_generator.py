@@ -2,6 +2,7 @@ import json
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
+from src.catalog import MusicCatalog
 from src.generator import (
     load_template, build_llm_prompt, parse_llm_response,
     validate_params, generate_music_params
@@ -19,6 +20,8 @@ SAMPLE_INSTRUMENTS = {
     "bass": [{"program": 32, "name": "Acoustic Bass"}],
 }
 
+SAMPLE_CATALOG = MusicCatalog(SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+
 
 def test_load_template(tmp_path):
     """Template splits on --- into system and user parts."""
@@ -36,8 +39,7 @@ def test_build_llm_prompt():
         template,
         headlines=["Test headline"],
         inspirations=["lo-fi jazz"],
-        scales=SAMPLE_SCALES,
-        instruments=SAMPLE_INSTRUMENTS,
+        catalog=SAMPLE_CATALOG,
     )
     assert "Test headline" in prompt
     assert "lo-fi jazz" in prompt
@@ -82,7 +84,7 @@ def test_validate_params_valid():
         "description": "A test"
     }
     # Should not raise
-    validate_params(params, SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    validate_params(params, SAMPLE_CATALOG)
 
 
 def test_validate_params_bad_scale_autocorrects():
@@ -93,7 +95,7 @@ def test_validate_params_bad_scale_autocorrects():
         "melody_instrument": 73, "chord_instrument": 0,
         "description": "test"
     }
-    validate_params(params, SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    validate_params(params, SAMPLE_CATALOG)
     assert params["scale"] in {"Hirajoshi", "Blues Hexatonic"}
 
 
@@ -105,7 +107,7 @@ def test_validate_params_bad_tempo_clamps():
         "melody_instrument": 73, "chord_instrument": 0,
         "description": "test"
     }
-    validate_params(params, SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    validate_params(params, SAMPLE_CATALOG)
     assert params["tempo"] == 200
 
 
@@ -117,5 +119,5 @@ def test_validate_params_bad_instrument_autocorrects():
         "melody_instrument": 106, "chord_instrument": 0,
         "description": "test"
     }
-    validate_params(params, SAMPLE_SCALES, SAMPLE_INSTRUMENTS)
+    validate_params(params, SAMPLE_CATALOG)
     assert params["melody_instrument"] == 73  # Flute is the only option in SAMPLE_INSTRUMENTS
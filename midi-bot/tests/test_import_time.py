@@ -0,0 +1,23 @@
+"""Import-time budget: heavy dependencies load on first use, not at startup."""
+from pathlib import Path
+
+from bot_core.importtime import import_times
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# Only needed once the bot scrapes (requests/bs4, aiohttp with --async), asks
+# the LLM for music parameters, reads its config or uploads the MIDI files
+DEFERRED = ["huggingface_hub", "slack_sdk", "bs4", "requests", "aiohttp", "yaml", "asyncio"]
+
+# Cumulative microseconds for `import bot` (about 50ms lazily, 700ms eagerly)
+BUDGET_US = 300_000
+
+
+def test_heavy_dependencies_are_deferred():
+    times = import_times("bot", PROJECT_DIR)
+    assert [name for name in DEFERRED if name in times] == []
+
+
+def test_import_within_budget():
+    times = import_times("bot", PROJECT_DIR)
+    assert times["bot"] < BUDGET_US, f"import bot took {times['bot'] / 1000:.0f}ms"
@@ -0,0 +1,71 @@
+import shutil
+
+import pytest
+
+from src.midi_worker import MidiWorker
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+
+# Stands in for generate_midi.js --serve: one result line per job, and the
+# job counter proves the same process handles every job.
+FAKE_SERVER = """
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+let jobs = 0;
+const lines = readline.createInterface({ input: process.stdin });
+lines.on('line', line => {
+  const job = JSON.parse(line);
+  if (job.params.hang) return;
+  if (job.params.chatter) {
+    process.stdout.write('Loading model...\\n');
+    return;
+  }
+  jobs += 1;
+  if (job.params.fail) {
+    process.stdout.write(JSON.stringify({ ok: false, error: 'bad params' }) + '\\n');
+    return;
+  }
+  fs.mkdirSync(job.output_dir, { recursive: true });
+  fs.writeFileSync(path.join(job.output_dir, 'melody.mid'), String(jobs));
+  process.stdout.write(JSON.stringify({ ok: true }) + '\\n');
+});
+"""
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / "fake_generate.js"
+    script.write_text(FAKE_SERVER)
+    worker = MidiWorker(script)
+    yield worker
+    worker.close()
+
+
+def test_reuses_one_process_across_jobs(worker, tmp_path):
+    assert worker.generate({"scale": "Dorian"}, tmp_path / "a", timeout=10)
+    pid = worker.process.pid
+    assert worker.generate({"scale": "Dorian"}, tmp_path / "b", timeout=10)
+
+    assert worker.process.pid == pid
+    assert (tmp_path / "b" / "melody.mid").read_text() == "2"
+
+
+def test_reports_failed_jobs(worker, tmp_path):
+    assert worker.generate({"fail": True}, tmp_path / "a", timeout=10) is False
+    assert worker.generate({}, tmp_path / "b", timeout=10) is True
+
+
+def test_restarts_after_timeout(worker, tmp_path):
+    assert worker.generate({"hang": True}, tmp_path / "a", timeout=0.5) is False
+    assert worker.process is None
+
+    assert worker.generate({}, tmp_path / "b", timeout=10) is True
+    assert (tmp_path / "b" / "melody.mid").read_text() == "1"
+
+
+def test_restarts_after_non_json_output(worker, tmp_path):
+    assert worker.generate({"chatter": True}, tmp_path / "a", timeout=10) is False
+    assert worker.process is None
+
+    assert worker.generate({}, tmp_path / "b", timeout=10) is True
@@ -0,0 +1,98 @@
+import subprocess
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from src.renderer import render_preview, render_previews
+
+
+def _fake_fluidsynth(cmd, **kwargs):
+    """Pretend to render by writing the -F output file."""
+    Path(cmd[cmd.index("-F") + 1]).write_bytes(b"OggS fake audio")
+    return MagicMock(returncode=0, stderr="")
+
+
+def test_render_preview_writes_output(tmp_path):
+    """Renders via fluidsynth and copies the result to the output path."""
+    midi = tmp_path / "song.mid"
+    midi.write_bytes(b"MThd fake")
+    soundfont = tmp_path / "gm.sf2"
+    soundfont.write_bytes(b"sfbk")
+
+    with patch("src.renderer.subprocess.run", side_effect=_fake_fluidsynth) as mock_run:
+        out = render_preview(midi, tmp_path / "song.ogg", soundfont, tmp_path / "cache")
+
+    assert out == tmp_path / "song.ogg"
+    assert out.read_bytes() == b"OggS fake audio"
+    assert mock_run.call_args[0][0][0] == "fluidsynth"
+
+
+def test_render_preview_uses_cache(tmp_path):
+    """Identical MIDI content is rendered only once."""
+    midi = tmp_path / "song.mid"
+    midi.write_bytes(b"MThd fake")
+    soundfont = tmp_path / "gm.sf2"
+    soundfont.write_bytes(b"sfbk")
+    cache = tmp_path / "cache"
+
+    with patch("src.renderer.subprocess.run", side_effect=_fake_fluidsynth) as mock_run:
+        render_preview(midi, tmp_path / "a.ogg", soundfont, cache)
+        render_preview(midi, tmp_path / "b.ogg", soundfont, cache)
+
+    assert mock_run.call_count == 1
+    assert (tmp_path / "b.ogg").read_bytes() == b"OggS fake audio"
+
+
+def test_render_preview_cache_follows_soundfont_changes(tmp_path):
+    """Replacing the SoundFont under the same name renders again."""
+    midi = tmp_path / "song.mid"
+    midi.write_bytes(b"MThd fake")
+    soundfont = tmp_path / "gm.sf2"
+    soundfont.write_bytes(b"sfbk v1")
+    cache = tmp_path / "cache"
+
+    with patch("src.renderer.subprocess.run", side_effect=_fake_fluidsynth) as mock_run:
+        render_preview(midi, tmp_path / "a.ogg", soundfont, cache)
+        soundfont.write_bytes(b"sfbk version 2")
+        render_preview(midi, tmp_path / "b.ogg", soundfont, cache)
+
+    assert mock_run.call_count == 2
+
+
+def test_render_preview_failure_returns_none(tmp_path):
+    """A failed render returns None and leaves nothing in the cache."""
+    midi = tmp_path / "song.mid"
+    midi.write_bytes(b"MThd fake")
+    soundfont = tmp_path / "gm.sf2"
+    soundfont.write_bytes(b"sfbk")
+    cache = tmp_path / "cache"
+
+    failed = MagicMock(returncode=1, stderr="bad soundfont")
+    with patch("src.renderer.subprocess.run", return_value=failed):
+        out = render_preview(midi, tmp_path / "song.ogg", soundfont, cache)
+
+    assert out is None
+    assert list(cache.iterdir()) == []
+
+
+def test_render_previews_skips_without_fluidsynth(tmp_path):
+    """Previews are optional: a missing synth just skips them."""
+    with patch("src.renderer.shutil.which", return_value=None):
+        assert render_previews([tmp_path / "song.mid"], tmp_path,
+                               tmp_path / "gm.sf2", tmp_path / "cache") == []
+
+
+def test_render_previews_renders_each_file(tmp_path):
+    """Each MIDI file gets a preview named after it."""
+    soundfont = tmp_path / "gm.sf2"
+    soundfont.write_bytes(b"sf2")
+    midis = []
+    for name in ["melody", "drums"]:
+        midi = tmp_path / f"{name}.mid"
+        midi.write_bytes(name.encode())
+        midis.append(midi)
+
+    with patch("src.renderer.shutil.which", return_value="/usr/bin/fluidsynth"), \
+         patch("src.renderer.subprocess.run", side_effect=_fake_fluidsynth):
+        previews = render_previews(midis, tmp_path, soundfont, tmp_path / "cache")
+
+    assert previews == [tmp_path / "melody.ogg", tmp_path / "drums.ogg"]
@@ -1,8 +1,19 @@
+import importlib.util
+import threading
+
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch, call
+from src.catalog import MusicCatalog
 from src.slack_poster import format_message, post_midi_to_slack
 
+FAKE_SLACK = Path(__file__).parent.parent.parent / "surreal-prompt-bot" / "tests" / "fake_slack.py"
+
+
+def _file_info(file):
+    """files.info stand-in: the permalink ends in the uploaded file's name."""
+    return {"file": {"id": file, "permalink": f"https://slack.test/files/{file}"}}
+
 
 def test_format_message():
     """Message includes all metadata."""
@@ -17,7 +28,7 @@ def test_format_message():
         "chords": [{"program": 0, "name": "Acoustic Grand Piano"}],
         "bass": [{"program": 32, "name": "Acoustic Bass"}],
     }
-    msg = format_message(params, instruments)
+    msg = format_message(params, MusicCatalog([], instruments))
     assert "Hirajoshi" in msg
     assert "D" in msg
     assert "95 BPM" in msg
@@ -26,12 +37,12 @@ def test_format_message():
     assert "A test description" in msg
 
 
-@patch("src.slack_poster.WebClient")
+@patch("slack_sdk.WebClient")
 def test_post_midi_to_slack(mock_client_cls, tmp_path):
     """Posts main message then 4 threaded file uploads."""
     mock_client = MagicMock()
     mock_client_cls.return_value = mock_client
-    mock_client.chat_postMessage.return_value = {"ts": "123.456"}
+    mock_client.chat_postMessage.return_value = {"ts": "123.456", "channel": "C123"}
 
     # Create fake MIDI files
     midi_dir = tmp_path
@@ -52,12 +63,191 @@ def test_post_midi_to_slack(mock_client_cls, tmp_path):
 
     result = post_midi_to_slack(
         params=params,
-        instruments=instruments,
+        catalog=MusicCatalog([], instruments),
         midi_dir=midi_dir,
         channel="#test",
         token="xoxb-fake",
     )
     assert result is True
-    # 1 main message + 4 file uploads
-    mock_client.chat_postMessage.assert_called_once()
+    # 4 file uploads, then 1 main message + 4 threaded replies sharing them
+    assert mock_client.files_upload_v2.call_count == 4
+    assert mock_client.chat_postMessage.call_count == 5
+    assert "thread_ts" not in mock_client.files_upload_v2.call_args[1]
+
+
+@patch("slack_sdk.WebClient")
+def test_post_midi_to_slack_combined(mock_client_cls, tmp_path):
+    """Combined mode uploads only the multi-track song.mid."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+    mock_client.chat_postMessage.return_value = {"ts": "123.456", "channel": "C123"}
+
+    for name in ["melody.mid", "drums.mid", "bass.mid", "chords.mid", "song.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+
+    params = {
+        "scale": "Hirajoshi", "root": "D", "tempo": 95,
+        "temperature": 1.2, "melody_instrument": 73,
+        "chord_instrument": 0, "chords": ["Dm", "Am", "Em", "Dm"],
+        "description": "test"
+    }
+    catalog = MusicCatalog([], {"melody": [{"program": 73, "name": "Flute"}], "chords": []})
+
+    result = post_midi_to_slack(
+        params=params,
+        catalog=catalog,
+        midi_dir=tmp_path,
+        channel="#test",
+        token="xoxb-fake",
+        combined=True,
+    )
+    assert result is True
+    mock_client.files_upload_v2.assert_called_once()
+    assert mock_client.files_upload_v2.call_args[1]["filename"] == "song.mid"
+
+
+@patch("slack_sdk.WebClient")
+def test_post_midi_to_slack_collects_upload_failures(mock_client_cls, tmp_path, caplog):
+    """Concurrent uploads still report per-track failures without aborting."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+    mock_client.chat_postMessage.return_value = {"ts": "123.456", "channel": "C123"}
+
+    def upload(**kwargs):
+        if kwargs["filename"] == "drums.mid":
+            raise Exception("not_allowed")
+        return {"file": {"id": kwargs["filename"]}}
+
+    mock_client.files_upload_v2.side_effect = upload
+    mock_client.files_info.side_effect = _file_info
+
+    # bass.mid is missing on disk
+    for name in ["melody.mid", "drums.mid", "chords.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+
+    params = {
+        "scale": "Hirajoshi", "root": "D", "tempo": 95,
+        "temperature": 1.2, "melody_instrument": 73,
+        "chord_instrument": 0, "chords": ["Dm", "Am", "Em", "Dm"],
+        "description": "test"
+    }
+    catalog = MusicCatalog([], {"melody": [{"program": 73, "name": "Flute"}], "chords": []})
+
+    result = post_midi_to_slack(params, catalog, tmp_path, "#test", "xoxb-fake")
+
+    assert result is True
+    assert mock_client.files_upload_v2.call_count == 3
+    assert "2/4 file uploads failed" in caplog.text
+    replies = [c[1]["text"] for c in mock_client.chat_postMessage.call_args_list[1:]]
+    assert [r.rsplit("/", 1)[1] for r in replies] == ["melody.mid", "chords.mid"]
+
+
+@patch("slack_sdk.WebClient")
+def test_post_midi_to_slack_replies_in_track_order(mock_client_cls, tmp_path):
+    """Thread replies follow TRACKS even when uploads finish out of order."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+    mock_client.chat_postMessage.return_value = {"ts": "123.456", "channel": "C123"}
+    released = threading.Event()
+
+    def upload(**kwargs):
+        # melody finishes last: it waits until chords has been uploaded
+        if kwargs["filename"] == "melody.mid":
+            released.wait(timeout=5)
+        elif kwargs["filename"] == "chords.mid":
+            released.set()
+        return {"file": {"id": kwargs["filename"]}}
+
+    mock_client.files_upload_v2.side_effect = upload
+    mock_client.files_info.side_effect = _file_info
+    for name in ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+    catalog = MusicCatalog([], {"melody": [], "chords": []})
+
+    progress = {"thread_ts": "123.456", "channel_id": "C123"}
+    assert post_midi_to_slack({}, catalog, tmp_path, "#test", "xoxb-fake", progress=progress)
+
+    replies = mock_client.chat_postMessage.call_args_list
+    assert [c[1]["text"].rsplit("/", 1)[1] for c in replies] == [
+        "melody.mid", "drums.mid", "bass.mid", "chords.mid",
+    ]
+    assert all(c[1]["thread_ts"] == "123.456" for c in replies)
+    assert progress["uploaded"] == ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]
+
+
+@patch("slack_sdk.WebClient")
+def test_post_midi_to_slack_resumes_from_progress(mock_client_cls, tmp_path):
+    """A retry with saved progress skips the main message and finished uploads."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+
+    for name in ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+
+    progress = {"thread_ts": "123.456", "channel_id": "C123",
+                "uploaded": ["melody.mid", "drums.mid"]}
+    catalog = MusicCatalog([], {"melody": [], "chords": []})
+
+    result = post_midi_to_slack({}, catalog, tmp_path, "#test", "xoxb-fake", progress=progress)
+
+    assert result is True
+    # only the two remaining threaded replies, no new main message
+    assert [c[1].get("thread_ts") for c in mock_client.chat_postMessage.call_args_list] == ["123.456"] * 2
+    uploaded = {c[1]["filename"] for c in mock_client.files_upload_v2.call_args_list}
+    assert uploaded == {"bass.mid", "chords.mid"}
+    assert sorted(progress["uploaded"]) == ["bass.mid", "chords.mid", "drums.mid", "melody.mid"]
+
+
+@patch("slack_sdk.WebClient")
+def test_post_midi_to_slack_keeps_uploads_that_were_not_shared(mock_client_cls, tmp_path):
+    """Files uploaded before sharing failed are shared, not re-uploaded, on retry."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+    mock_client.files_upload_v2.side_effect = lambda **kwargs: {"file": {"id": kwargs["filename"]}}
+    mock_client.files_info.side_effect = _file_info
+    mock_client.chat_postMessage.side_effect = Exception("channel_not_found")
+
+    for name in ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+    catalog = MusicCatalog([], {"melody": [], "chords": []})
+    progress = {"thread_ts": "123.456", "channel_id": "C123"}
+
+    assert post_midi_to_slack({}, catalog, tmp_path, "#test", "xoxb-fake", progress=progress) is False
+    assert progress["uploaded"] == []
+    assert sorted(progress["files"]) == ["bass.mid", "chords.mid", "drums.mid", "melody.mid"]
+
+    mock_client.chat_postMessage.side_effect = None
+    assert post_midi_to_slack({}, catalog, tmp_path, "#test", "xoxb-fake", progress=progress) is True
     assert mock_client.files_upload_v2.call_count == 4
+    assert progress["uploaded"] == ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]
+
+
+def test_post_midi_to_slack_against_fake_slack(tmp_path, monkeypatch):
+    """End to end against the fake Slack API: all tracks end up in the thread, in order."""
+    spec = importlib.util.spec_from_file_location("fake_slack", FAKE_SLACK)
+    fake_slack = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fake_slack)
+
+    for name in ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]:
+        (tmp_path / name).write_bytes(b"fake midi")
+    catalog = MusicCatalog([], {"melody": [], "chords": []})
+    params = {
+        "scale": "Hirajoshi", "root": "D", "tempo": 95,
+        "temperature": 1.2, "melody_instrument": 73,
+        "chord_instrument": 0, "chords": ["Dm", "Am", "Em", "Dm"],
+        "description": "test"
+    }
+    progress = {}
+
+    with fake_slack.FakeSlack({"channels": [{"id": "C001", "name": "test"}]}) as fake:
+        monkeypatch.setenv("SLACK_API_URL", fake.api_url)
+        assert post_midi_to_slack(params, catalog, tmp_path, "C001", "xoxb-fake", progress=progress)
+
+    thread_ts = fake.posted[0]["ts"]
+    replies = fake.posted[1:]
+    assert [r["thread_ts"] for r in replies] == [thread_ts] * 4
+    assert [r["text"].rsplit("/", 1)[1] for r in replies] == [
+        "melody.mid", "drums.mid", "bass.mid", "chords.mid",
+    ]
+    assert sorted(u["filename"] for u in fake.uploads) == sorted(progress["uploaded"])
+    assert progress["uploaded"] == ["melody.mid", "drums.mid", "bass.mid", "chords.mid"]
@@ -0,0 +1,58 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+
+SONG_PLAN = Path(__file__).parent.parent / "song_plan.js"
+CHORDS = ["Am", "F", "C", "G"]
+
+
+def _node(expression: str):
+    """Evaluate a JS expression against song_plan.js and return it as JSON."""
+    script = f"const sp = require('./{SONG_PLAN.name}'); process.stdout.write(JSON.stringify({expression}));"
+    result = subprocess.run(
+        ["node", "-e", script], cwd=SONG_PLAN.parent, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_sections_follow_each_other():
+    plan = _node("sp.buildSongPlan({bars_per_section: 3, sections: ['intro', 'chorus', 'bridge', 'verse', 'chorus']})")
+
+    assert [s["name"] for s in plan] == ["intro", "chorus", "verse", "chorus"]
+    assert [s["startStep"] for s in plan] == [0, 48, 96, 144]
+    assert all(s["steps"] == 48 for s in plan)
+    assert [s["repeat"] for s in plan] == [False, True, False, True]
+
+
+def test_repeated_chorus_lines_up_with_its_chords():
+    # 3-bar sections are not a multiple of the 4-bar progression
+    params = json.dumps({"bars_per_section": 3, "sections": ["intro", "chorus", "verse", "chorus"]})
+    slots, first, second = _node(
+        f"(() => {{ const plan = sp.buildSongPlan({params}); return ["
+        f"sp.chordSlots(plan, {json.dumps(CHORDS)}),"
+        f"sp.chordsForRange(plan, {json.dumps(CHORDS)}, 48, 48),"
+        f"sp.chordsForRange(plan, {json.dumps(CHORDS)}, 144, 48)]; }})()"
+    )
+
+    assert first == second == ["Am", "F", "C"]
+    by_section = [[s for s in slots if start <= s["startBeat"] < start + 12] for start in (0, 12, 24, 36)]
+    for section in by_section:
+        assert [s["chord"] for s in section] == ["Am", "F", "C"]
+        assert sum(s["beats"] for s in section) == 12
+
+
+def test_partial_slot_is_cut_at_the_section_end():
+    slots = _node(
+        f"sp.chordSlots(sp.buildSongPlan({{bars_per_section: 1, sections: ['verse', 'verse']}}), ['Am', 'G'])"
+    )
+
+    # Two 8-beat chords per 4 bars; a 1-bar section only has room for 4 beats of the first
+    assert slots == [
+        {"chord": "Am", "startBeat": 0, "beats": 4},
+        {"chord": "Am", "startBeat": 4, "beats": 4},
+    ]
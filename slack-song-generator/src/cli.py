@@ -3,13 +3,8 @@ import argparse
 import random
 import sys
 from pathlib import Path
-
-from dotenv import load_dotenv
 import os
 
-from src.slack_fetcher import fetch_messages, SlackConfig
-from src.filter import filter_song_titles, FilterConfig
-from src.generator import generate_html, GeneratorConfig
 from src.cache import save_titles, load_titles
 
 
@@ -108,6 +103,10 @@ def randomize_config(seed: int | None) -> dict:
 
 
 def main() -> int:
+    # Heavy dependencies (slack_sdk, requests, jinja2) load only when used,
+    # so --help and --generate-only start fast
+    from dotenv import load_dotenv
+
     load_dotenv()
     args = parse_args()
 
@@ -127,6 +126,9 @@ def main() -> int:
             print("Error: SLACK_CHANNEL_ID not set (use --channel-id or .env)", file=sys.stderr)
             return 1
 
+        from src.filter import filter_song_titles, FilterConfig
+        from src.slack_fetcher import fetch_messages, SlackConfig
+
         print(f"Fetching messages from Slack channel {channel_id}...")
         slack_config = SlackConfig(token=token, channel_id=channel_id)
         messages = fetch_messages(slack_config, limit=args.title_limit)
@@ -166,6 +168,8 @@ def main() -> int:
         print(f"Randomized settings: {random_settings}")
 
     # Generate HTML
+    from src.generator import generate_html, GeneratorConfig
+
     gen_config = GeneratorConfig(
         seed=args.seed,
         max_rotation=args.max_rotation,
@@ -2,6 +2,8 @@
 from dataclasses import dataclass
 from slack_sdk import WebClient
 
+from bot_core.slack_client import RateLimitedClient, api_base_url
+
 
 @dataclass
 class SlackConfig:
@@ -11,7 +13,7 @@ class SlackConfig:
 
 def fetch_messages(config: SlackConfig, limit: int = 500) -> list[str]:
     """Fetch text messages from a Slack channel, ignoring bots and system messages."""
-    client = WebClient(token=config.token)
+    client = RateLimitedClient(WebClient(token=config.token, base_url=api_base_url()))
 
     messages: list[str] = []
     cursor = None
@@ -48,4 +50,5 @@ def fetch_messages(config: SlackConfig, limit: int = 500) -> list[str]:
         if len(messages) >= limit:
             break
 
+    client.log_stats()
     return messages[:limit]
@@ -0,0 +1,22 @@
+"""Import-time budget: heavy dependencies load on first use, not at startup."""
+from pathlib import Path
+
+from bot_core.importtime import import_times
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# Only needed once the CLI fetches from Slack, filters or renders HTML
+DEFERRED = ["slack_sdk", "requests", "jinja2"]
+
+# Cumulative microseconds for `import src.cli` (about 10ms lazily, 200ms eagerly)
+BUDGET_US = 100_000
+
+
+def test_heavy_dependencies_are_deferred():
+    times = import_times("src.cli", PROJECT_DIR)
+    assert [name for name in DEFERRED if name in times] == []
+
+
+def test_import_within_budget():
+    times = import_times("src.cli", PROJECT_DIR)
+    assert times["src.cli"] < BUDGET_US, f"import src.cli took {times['src.cli'] / 1000:.0f}ms"
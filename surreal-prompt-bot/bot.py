@@ -4,15 +4,17 @@
 import argparse
 import logging
 import os
-import random
 import sys
 from pathlib import Path
 
-from src.config import load_config, merge_cli_args
-from src.scraper import scrape_all_sources
-from src.sampler import load_inspirations, sample_inspirations
-from src.generator import generate_prompt
-from src.slack_poster import post_to_slack
+from bot_core import tracing
+from bot_core.config import get_tokens, load_bot_config
+from bot_core.outbox import Outbox, report_delivery
+from bot_core.sampler import load_inspirations, pick_headlines, sample_inspirations
+from bot_core.scraper import scrape_all_sources, scrape_all_sources_async
+from src.config import DEFAULT_CONFIG
+from src.generator import generate_prompt, generate_prompt_async
+from src.slack_poster import post_to_slack, post_to_slack_async
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,79 +23,187 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_bot(args) -> int:
-    """Main bot logic. Returns exit code."""
-    # Load config
-    script_dir = Path(__file__).parent
-    config_path = script_dir / args.config
-    config = load_config(config_path)
-    config = merge_cli_args(config, args)
-
-    # Get API keys from environment
-    hf_token = os.environ.get("HF_TOKEN")
-    if not hf_token:
-        logger.error("HF_TOKEN environment variable not set")
-        return 1
-
-    slack_token = os.environ.get("SLACK_BOT_TOKEN")
-    if not slack_token and not args.dry_run:
-        logger.error("SLACK_BOT_TOKEN environment variable not set")
-        return 1
-
-    # Scrape headlines
-    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
-    headlines = scrape_all_sources(config["sources"])
+def drain_outbox(outbox: Outbox, config: dict, slack_token: str) -> int:
+    """Deliver queued prompts. Returns the number still pending."""
+    handlers = {
+        "prompt": lambda payload, progress: post_to_slack(
+            payload["message"], payload["channel"], slack_token
+        ),
+    }
+    return outbox.drain(handlers, config["outbox"]["max_attempts"])
 
-    if not headlines:
-        logger.error("No headlines scraped from any source")
-        return 1
 
-    # Pick random subset of headlines
-    max_headlines = config["prompt"]["max_headlines"]
-    if len(headlines) > max_headlines:
-        headlines = random.sample(headlines, max_headlines)
+async def drain_outbox_async(outbox: Outbox, config: dict, slack_token: str) -> int:
+    """Deliver queued prompts with the async Slack client."""
+    handlers = {
+        "prompt": lambda payload, progress: post_to_slack_async(
+            payload["message"], payload["channel"], slack_token
+        ),
+    }
+    return await outbox.drain_async(handlers, config["outbox"]["max_attempts"])
 
-    logger.info(f"Using {len(headlines)} headlines")
 
-    # Load and sample inspirations
+def _pick_inspirations(config: dict) -> list[str]:
+    """Load and sample inspirations."""
     inspirations = []
     if config["inspirations"]["pick_count"] > 0:
-        insp_path = script_dir / config["inspirations"]["file"]
+        insp_path = Path(__file__).parent / config["inspirations"]["file"]
         all_inspirations = load_inspirations(insp_path)
         inspirations = sample_inspirations(
             all_inspirations,
             config["inspirations"]["pick_count"]
         )
         logger.info(f"Using inspirations: {inspirations}")
+    return inspirations
 
-    # Generate prompt
-    logger.info("Generating surreal prompt...")
-    prompt = generate_prompt(
-        headlines=headlines,
-        inspirations=inspirations,
-        model=config["prompt"]["model"],
-        temperature=config["prompt"]["temperature"],
-        api_key=hf_token,
-    )
 
+def _print_prompt(prompt: str) -> None:
     print(f"\n{'='*60}")
     print(f"Generated prompt:\n{prompt}")
     print(f"{'='*60}\n")
 
+
+def run_bot(args) -> int:
+    """Main bot logic. Returns exit code."""
+    if getattr(args, "use_async", False):
+        import asyncio
+
+        return asyncio.run(run_bot_async(args))
+
+    config, outbox_path = load_bot_config(Path(__file__).parent, args, DEFAULT_CONFIG)
+    with tracing.bot_run("surreal-prompt-bot", args, config) as run:
+        code = _run_pipeline(args, config, outbox_path)
+        run.set(exit_code=code)
+    return code
+
+
+def _run_pipeline(args, config: dict, outbox_path: Path) -> int:
+    # Only retry queued posts, no generation
+    if getattr(args, "drain", False):
+        slack_token = os.environ.get("SLACK_BOT_TOKEN")
+        if not slack_token:
+            logger.error("SLACK_BOT_TOKEN environment variable not set")
+            return 1
+        with tracing.span("post"):
+            remaining = drain_outbox(Outbox(outbox_path), config, slack_token)
+        logger.info(f"Outbox drained, {remaining} post(s) still pending")
+        return 0 if remaining == 0 else 1
+
+    # Get API keys from environment
+    tokens = get_tokens(args.dry_run)
+    if tokens is None:
+        return 1
+    hf_token, slack_token = tokens
+
+    # Scrape headlines
+    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
+    with tracing.span("scrape", sources=len(config["sources"])) as span:
+        headlines = scrape_all_sources(config["sources"])
+        span.set(headlines=len(headlines))
+
+    if not headlines:
+        logger.error("No headlines scraped from any source")
+        return 1
+
+    headlines = pick_headlines(headlines, config["prompt"]["max_headlines"])
+    with tracing.span("inspirations"):
+        inspirations = _pick_inspirations(config)
+
+    # Generate prompt
+    logger.info("Generating surreal prompt...")
+    with tracing.span("generate"):
+        prompt = generate_prompt(
+            headlines=headlines,
+            inspirations=inspirations,
+            model=config["prompt"]["model"],
+            temperature=config["prompt"]["temperature"],
+            api_key=hf_token,
+        )
+    _print_prompt(prompt)
+
     # Post to Slack (unless dry run)
     if args.dry_run:
         logger.info("Dry run - not posting to Slack")
         return 0
 
+    # Queue durably first, so a Slack outage never forces a regeneration
     channel = config["slack"]["channel"]
+    outbox = Outbox(outbox_path)
+    entry = outbox.enqueue("prompt", {"message": prompt, "channel": channel})
+
     logger.info(f"Posting to Slack channel {channel}...")
+    with tracing.span("post"):
+        drain_outbox(outbox, config, slack_token)
+    return report_delivery(outbox, entry.id)
 
-    if post_to_slack(prompt, channel, slack_token):
-        logger.info("Successfully posted to Slack!")
-        return 0
-    else:
-        logger.error("Failed to post to Slack")
+
+async def run_bot_async(args) -> int:
+    """Asyncio variant of run_bot. Returns exit code.
+
+    Scraping runs concurrently with inspiration sampling, and inference and
+    posting use async clients, so several bots (e.g. one per channel) can
+    share one event loop via asyncio.gather.
+    """
+    config, outbox_path = load_bot_config(Path(__file__).parent, args, DEFAULT_CONFIG)
+    with tracing.bot_run("surreal-prompt-bot", args, config) as run:
+        code = await _run_pipeline_async(args, config, outbox_path)
+        run.set(exit_code=code)
+    return code
+
+
+async def _run_pipeline_async(args, config: dict, outbox_path: Path) -> int:
+    import asyncio
+
+    if getattr(args, "drain", False):
+        slack_token = os.environ.get("SLACK_BOT_TOKEN")
+        if not slack_token:
+            logger.error("SLACK_BOT_TOKEN environment variable not set")
+            return 1
+        with tracing.span("post"):
+            remaining = await drain_outbox_async(Outbox(outbox_path), config, slack_token)
+        logger.info(f"Outbox drained, {remaining} post(s) still pending")
+        return 0 if remaining == 0 else 1
+
+    tokens = get_tokens(args.dry_run)
+    if tokens is None:
         return 1
+    hf_token, slack_token = tokens
+
+    logger.info(f"Scraping headlines from {len(config['sources'])} sources...")
+    with tracing.span("scrape", sources=len(config["sources"])) as span:
+        headlines, inspirations = await asyncio.gather(
+            scrape_all_sources_async(config["sources"]),
+            asyncio.to_thread(_pick_inspirations, config),
+        )
+        span.set(headlines=len(headlines))
+    if not headlines:
+        logger.error("No headlines scraped from any source")
+        return 1
+    headlines = pick_headlines(headlines, config["prompt"]["max_headlines"])
+
+    logger.info("Generating surreal prompt...")
+    with tracing.span("generate"):
+        prompt = await generate_prompt_async(
+            headlines=headlines,
+            inspirations=inspirations,
+            model=config["prompt"]["model"],
+            temperature=config["prompt"]["temperature"],
+            api_key=hf_token,
+        )
+    _print_prompt(prompt)
+
+    if args.dry_run:
+        logger.info("Dry run - not posting to Slack")
+        return 0
+
+    channel = config["slack"]["channel"]
+    outbox = Outbox(outbox_path)
+    entry = outbox.enqueue("prompt", {"message": prompt, "channel": channel})
+
+    logger.info(f"Posting to Slack channel {channel}...")
+    with tracing.span("post"):
+        await drain_outbox_async(outbox, config, slack_token)
+    return report_delivery(outbox, entry.id)
 
 
 def main():
@@ -123,6 +233,21 @@ def main():
         action="store_true",
         help="Skip inspiration file"
     )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Only retry queued Slack posts from the outbox"
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run on asyncio, overlapping network-bound stages"
+    )
+    parser.add_argument(
+        "--report",
+        help="Write the JSON run report here (default: report.path in config)"
+    )
     parser.add_argument(
         "--config",
         default="config.yaml",
@@ -1,16 +1,27 @@
 #!/usr/bin/env python3
 """Drawma gallery scraper - downloads drawings from the #drawma Slack channel."""
 
+import argparse
+import bisect
+import hashlib
 import json
 import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from urllib.parse import urlparse
 
 import requests
 from slack_sdk import WebClient
 
+from bot_core import tracing
+from bot_core.slack_client import RateLimitedClient, api_base_url
+from src.derivatives import generate_variants
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -23,16 +34,47 @@ OUTPUT_DIR = REPO_ROOT / "img" / "drawma"
 MANIFEST_PATH = OUTPUT_DIR / "manifest.json"
 PROMPTS_PATH = OUTPUT_DIR / "prompts.json"
 
+# Sync state and lookup caches hold Slack workspace, channel and member IDs,
+# so they live outside the published gallery (CI keeps them with actions/cache)
+CACHE_DIR = Path.home() / ".cache" / "drawma-gallery"
+SYNC_STATE_PATH = CACHE_DIR / "sync-state.json"
+USER_CACHE_PATH = CACHE_DIR / "users.json"
+CHANNEL_CACHE_PATH = CACHE_DIR / "channels.json"
+REPORT_PATH = CACHE_DIR / "run-report.json"
+
+# Days of channel history searched for new drawings on each run
+DAYS_BACK = 7
+
+# Threads fetched at once; conversations.replies is Tier 3 (~50/min) and the
+# rate-limited client's shared bucket keeps the pool within it
+THREAD_WORKERS = 4
+
+# Images downloaded at once, and the chunk size they are streamed to disk in
+DOWNLOAD_WORKERS = 8
+CHUNK_SIZE = 64 * 1024
+
+# Artist names are looked up again after this long (people rename themselves)
+USER_CACHE_TTL = 7 * 86400
+
+# Unknown artists at which one users.list sweep beats individual users.info calls
+USER_SWEEP_THRESHOLD = 3
+
+# Files re-hashed at once by --verify (hashlib releases the GIL while hashing)
+VERIFY_WORKERS = 8
+
+# Hosts the bot token may be sent to (plus the API host, which may be a fake)
+SLACK_DOMAINS = ("slack.com", "slack-edge.com", "slack-files.com")
+
 
 def _ts_to_date(ts: str) -> str:
     """Convert a Slack timestamp to a UTC date string (YYYY-MM-DD)."""
     return datetime.fromtimestamp(float(ts), tz=timezone.utc).strftime("%Y-%m-%d")
 
 
-def get_bot_user_id(client: WebClient) -> str:
-    """Get the bot's own user ID via auth_test."""
+def get_bot_identity(client: WebClient) -> tuple[str, str | None]:
+    """Get the bot's own user ID and its workspace (team) ID via auth_test."""
     resp = client.auth_test()
-    return resp["user_id"]
+    return resp["user_id"], resp.get("team_id")
 
 
 def find_channel_id(client: WebClient, channel_name: str) -> str | None:
@@ -53,13 +95,62 @@ def find_channel_id(client: WebClient, channel_name: str) -> str | None:
     return None
 
 
-def fetch_channel_messages(client: WebClient, channel_id: str, days_back: int = 7) -> list[dict]:
-    """Fetch recent channel messages via conversations_history."""
-    oldest = datetime.now(tz=timezone.utc).timestamp() - (days_back * 86400)
+def load_channel_cache() -> dict[str, str]:
+    """Load resolved channel IDs, keyed by "{team_id}/{channel name}"."""
+    if CHANNEL_CACHE_PATH.exists():
+        return json.loads(CHANNEL_CACHE_PATH.read_text())
+    return {}
+
+
+def save_channel_cache(cache: dict[str, str]) -> None:
+    """Save the channel ID cache, replacing the previous file atomically."""
+    CHANNEL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHANNEL_CACHE_PATH.with_name(CHANNEL_CACHE_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True) + "\n")
+    tmp.replace(CHANNEL_CACHE_PATH)
+
+
+def _channel_still_valid(client: WebClient, channel_id: str, name: str) -> bool:
+    """Whether channel_id still names the (unarchived) channel it was cached for."""
+    try:
+        channel = client.conversations_info(channel=channel_id)["channel"]
+    except Exception as e:
+        logger.info(f"Cached channel {channel_id} failed validation: {e}")
+        return False
+    return channel.get("name") == name and not channel.get("is_archived")
+
+
+def resolve_channel_id(
+    client: WebClient, team_id: str | None, channel_name: str, cache: dict[str, str]
+) -> str | None:
+    """Find a channel ID by name, trying the cached ID first.
+
+    A cached ID is confirmed with one conversations_info call; only when
+    that fails (deleted, renamed, archived) is the channel list scanned
+    again. cache is updated in place.
+    """
+    name = channel_name.lstrip("#")
+    key = f"{team_id}/{name}"
+    cached = cache.get(key)
+    if cached and _channel_still_valid(client, cached, name):
+        return cached
+
+    channel_id = find_channel_id(client, channel_name)
+    if channel_id:
+        cache[key] = channel_id
+    else:
+        cache.pop(key, None)
+    return channel_id
+
+
+def _fetch_history(client: WebClient, channel_id: str, oldest: float | None = None) -> list[dict]:
+    """Fetch channel messages via conversations_history, newer than oldest if given."""
     messages = []
     cursor = None
     while True:
-        kwargs = {"channel": channel_id, "oldest": str(oldest), "limit": 200}
+        kwargs = {"channel": channel_id, "limit": 200}
+        if oldest is not None:
+            kwargs["oldest"] = str(oldest)
         if cursor:
             kwargs["cursor"] = cursor
         resp = client.conversations_history(**kwargs)
@@ -70,12 +161,22 @@ def fetch_channel_messages(client: WebClient, channel_id: str, days_back: int =
     return messages
 
 
-def fetch_thread_replies(client: WebClient, channel_id: str, thread_ts: str) -> list[dict]:
-    """Fetch thread replies, excluding the parent message."""
+def fetch_channel_messages(client: WebClient, channel_id: str, days_back: int = DAYS_BACK) -> list[dict]:
+    """Fetch recent channel messages via conversations_history."""
+    oldest = datetime.now(tz=timezone.utc).timestamp() - (days_back * 86400)
+    return _fetch_history(client, channel_id, oldest)
+
+
+def fetch_thread_replies(
+    client: WebClient, channel_id: str, thread_ts: str, oldest: str | None = None
+) -> list[dict]:
+    """Fetch thread replies (newer than oldest if given), excluding the parent message."""
     replies = []
     cursor = None
     while True:
         kwargs = {"channel": channel_id, "ts": thread_ts, "limit": 200}
+        if oldest is not None:
+            kwargs["oldest"] = oldest
         if cursor:
             kwargs["cursor"] = cursor
         resp = client.conversations_replies(**kwargs)
@@ -87,11 +188,83 @@ def fetch_thread_replies(client: WebClient, channel_id: str, thread_ts: str) ->
     return replies[1:] if replies else []
 
 
+def fetch_all_thread_replies(
+    client: WebClient,
+    channel_id: str,
+    thread_tss: list[str],
+    max_workers: int = THREAD_WORKERS,
+    since: dict[str, str | None] | None = None,
+) -> list[dict]:
+    """Fetch replies for several threads concurrently.
+
+    since maps a thread_ts to the oldest reply ts to fetch for it. Replies
+    are returned in the order of thread_tss, so the result does not depend
+    on which request finishes first.
+    """
+    if not thread_tss:
+        return []
+    since = since or {}
+    workers = max(1, min(max_workers, len(thread_tss)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda thread_ts: fetch_thread_replies(client, channel_id, thread_ts, since.get(thread_ts)),
+            thread_tss,
+        ))
+    return [reply for replies in results for reply in replies]
+
+
+def updated_threads(messages: list[dict], seen_replies: dict[str, str]) -> dict[str, str | None]:
+    """Threads with replies since the last run, mapped to the reply ts to fetch from.
+
+    seen_replies maps a thread_ts to the latest_reply already fetched. A thread
+    whose parent reports no newer latest_reply is skipped; an unseen thread (or
+    a parent without latest_reply) is fetched in full (None).
+    """
+    updated = {}
+    for m in messages:
+        if m.get("reply_count", 0) <= 0:
+            continue
+        seen = seen_replies.get(m["ts"])
+        latest = m.get("latest_reply")
+        if seen is not None and latest is not None and float(latest) <= float(seen):
+            continue
+        updated[m["ts"]] = seen
+    return updated
+
+
+def mark_threads_synced(
+    state: dict, messages: list[dict], fetched: list[str], failed: set[str]
+) -> None:
+    """Record latest_reply for each fetched thread whose drawings all downloaded.
+
+    Threads whose parents are no longer among messages (out of the recent
+    window) are forgotten, so the state stays the size of one window.
+    """
+    latest = {m["ts"]: m.get("latest_reply") for m in messages if m.get("reply_count", 0) > 0}
+    threads = {ts: seen for ts, seen in state.get("threads", {}).items() if ts in latest}
+    for ts in fetched:
+        if ts not in failed and latest.get(ts) is not None:
+            threads[ts] = latest[ts]
+    state["threads"] = threads
+
+
+def dedupe_images(images: list[dict]) -> list[dict]:
+    """Drop repeated file_ids, keeping the first occurrence."""
+    seen_ids: set[str] = set()
+    deduped = []
+    for img in images:
+        if img["file_id"] not in seen_ids:
+            seen_ids.add(img["file_id"])
+            deduped.append(img)
+    return deduped
+
+
 def extract_images_from_messages(messages: list[dict]) -> list[dict]:
     """Extract image files from Slack messages.
 
-    Returns a list of dicts with file info, message_ts, and user.
-    Only includes files whose mimetype starts with 'image/'.
+    Returns a list of dicts with file info, message_ts, and user, plus
+    thread_ts for thread replies. Only includes files whose mimetype starts
+    with 'image/'.
     """
     images = []
     for msg in messages:
@@ -99,7 +272,7 @@ def extract_images_from_messages(messages: list[dict]) -> list[dict]:
         for f in files:
             if not f.get("mimetype", "").startswith("image/"):
                 continue
-            images.append({
+            image = {
                 "file_id": f["id"],
                 "name": f["name"],
                 "mimetype": f["mimetype"],
@@ -108,27 +281,65 @@ def extract_images_from_messages(messages: list[dict]) -> list[dict]:
                 "height": f.get("original_h"),
                 "message_ts": msg["ts"],
                 "user": msg.get("user"),
-            })
+            }
+            if msg.get("thread_ts", msg["ts"]) != msg["ts"]:
+                image["thread_ts"] = msg["thread_ts"]
+            images.append(image)
     return images
 
 
-def associate_images_with_prompts(images: list[dict], prompts: list[dict]) -> list[dict]:
-    """Match images to bot prompts from the same UTC day.
+class PromptIndex:
+    """Bot prompts ordered by timestamp, for finding the prompt an image answers.
+
+    Wraps the sync state's prompt list ({"ts", "text"}, oldest first) and
+    keeps it sorted as prompts are added, so the persisted list is the index
+    and each run only inserts the prompts it has just seen.
+    """
 
-    Each image dict gets a 'prompt' key added (text or None).
-    Returns a new list (does not mutate the originals).
+    def __init__(self, prompts: list[dict]):
+        self.prompts = prompts
+        self.timestamps = [float(p["ts"]) for p in prompts]
+        if any(a > b for a, b in zip(self.timestamps, self.timestamps[1:])):
+            # Stores written before the index kept prompts newest first
+            prompts.sort(key=lambda p: float(p["ts"]))
+            self.timestamps.sort()
+
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+    def add(self, ts: str, text: str) -> None:
+        """Insert a prompt, or update its text if ts is already indexed (an edit)."""
+        key = float(ts)
+        i = bisect.bisect_left(self.timestamps, key)
+        if i < len(self.timestamps) and self.timestamps[i] == key:
+            self.prompts[i]["text"] = text
+            return
+        self.timestamps.insert(i, key)
+        self.prompts.insert(i, {"ts": ts, "text": text})
+
+    def prompt_at(self, ts: str) -> str | None:
+        """Text of the latest prompt posted at or before ts, or None if none was."""
+        i = bisect.bisect_right(self.timestamps, float(ts))
+        return self.prompts[i - 1]["text"] if i else None
+
+
+def associate_images_with_prompts(images: list[dict], prompts: PromptIndex | list[dict]) -> list[dict]:
+    """Match each image to the bot prompt it answers.
+
+    A drawing posted in a thread answers the thread's parent, which is the
+    prompt itself (or, for a thread on some other message, the prompt that
+    was current when the thread started), however much later it is posted.
+    A top-level drawing answers the nearest prompt posted before it, which
+    may be late at night or the next day, and a day can have several prompts.
+    Each image dict gets a 'prompt' key added (text, or None if it predates
+    every prompt). Returns a new list (does not mutate the originals).
     """
-    # Build date -> prompt text mapping
-    prompt_by_date: dict[str, str] = {}
-    for p in prompts:
-        date = _ts_to_date(p["ts"])
-        prompt_by_date[date] = p["text"]
+    index = prompts if isinstance(prompts, PromptIndex) else PromptIndex(list(prompts))
 
     result = []
     for img in images:
         entry = dict(img)
-        date = _ts_to_date(img["message_ts"])
-        entry["prompt"] = prompt_by_date.get(date)
+        entry["prompt"] = index.prompt_at(img.get("thread_ts") or img["message_ts"])
         result.append(entry)
     return result
 
@@ -139,46 +350,173 @@ def filter_new_images(images: list[dict], manifest: list[dict]) -> list[dict]:
     return [img for img in images if img["file_id"] not in existing_ids]
 
 
-def _download_with_auth(url: str, token: str, timeout: int = 30) -> requests.Response:
-    """Download a URL, manually following redirects to preserve the auth header.
+def _is_slack_host(url: str) -> bool:
+    """Whether url is on a Slack-owned host that should get the bot token."""
+    parsed = urlparse(url)
+    host = parsed.hostname or ""
+    if host == urlparse(api_base_url()).hostname:
+        return True
+    return parsed.scheme == "https" and any(
+        host == domain or host.endswith("." + domain) for domain in SLACK_DOMAINS
+    )
+
 
-    The requests library strips Authorization headers on cross-domain redirects
-    (a security feature). Slack's url_private_download redirects to a CDN on a
-    different host, so we must follow redirects ourselves.
+class FileSession:
+    """Pooled HTTP session for downloading Slack files.
+
+    Connections are kept alive per host (files.slack.com and the CDN), so
+    each image after the first skips connection setup. Redirects are followed
+    by hand: requests strips Authorization on cross-host redirects, but the
+    token is still sent to Slack-owned hosts, and never to any other host.
     """
-    headers = {"Authorization": f"Bearer {token}"}
-    max_redirects = 5
-    for _ in range(max_redirects):
-        resp = requests.get(url, headers=headers, timeout=timeout, allow_redirects=False)
-        if resp.status_code in (301, 302, 303, 307, 308):
-            url = resp.headers["Location"]
-            continue
-        resp.raise_for_status()
-        return resp
-    raise requests.TooManyRedirects(f"Too many redirects for {url}")
 
+    def __init__(self, token: str, pool_size: int = DOWNLOAD_WORKERS, timeout: int = 30):
+        from requests.adapters import HTTPAdapter
+
+        self.token = token
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "FileSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def get(self, url: str, offset: int = 0) -> requests.Response:
+        """GET a file, streamed; the caller must close the response.
+
+        With offset, only the bytes from offset on are requested (a 206
+        response if the host honors it).
+        """
+        max_redirects = 5
+        for _ in range(max_redirects):
+            headers = {}
+            if _is_slack_host(url):
+                headers["Authorization"] = f"Bearer {self.token}"
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            resp = self.session.get(
+                url, headers=headers, timeout=self.timeout, allow_redirects=False, stream=True
+            )
+            if resp.status_code in (301, 302, 303, 307, 308):
+                url = resp.headers["Location"]
+                resp.close()
+                continue
+            resp.raise_for_status()
+            return resp
+        raise requests.TooManyRedirects(f"Too many redirects for {url}")
+
+
+def _hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentIndex:
+    """SHA-256 -> filename of the images stored in the gallery.
+
+    Built from the manifest's sha256 fields and shared by the download
+    workers, so a drawing uploaded twice (re-posted to a thread, cross-posted)
+    is stored once.
+    """
 
-def download_image(image: dict, output_dir: Path, token: str) -> dict:
+    def __init__(self, output_dir: Path, manifest: list[dict]):
+        self.output_dir = output_dir
+        self.files = {e["sha256"]: e["filename"] for e in manifest if e.get("sha256")}
+        self.lock = threading.Lock()
+
+    def store(self, digest: str, filename: str, part: Path) -> str:
+        """Move a finished download into place as filename, unless its content is already stored.
+
+        Returns the name of the file that holds the content; if that is not
+        filename, part is deleted. The lookup and the rename happen under one
+        lock, so two workers downloading the same content at once keep one copy.
+        """
+        with self.lock:
+            existing = self.files.get(digest)
+            if existing is not None and existing != filename and (self.output_dir / existing).exists():
+                part.unlink()
+                return existing
+            part.replace(self.output_dir / filename)
+            self.files[digest] = filename
+            return filename
+
+
+def download_image(
+    image: dict, output_dir: Path, session: FileSession, index: ContentIndex | None = None
+) -> dict:
     """Download an image and return a manifest entry dict.
 
-    Saves as {date}-{file_id}.{ext} in output_dir.
+    Saves as {date}-{file_id}.{ext} in output_dir. The body is streamed in
+    chunks to {filename}.part and renamed into place once complete; a .part
+    left by an interrupted run is resumed with a Range request. The entry
+    records the content's SHA-256; if index already has a file with that
+    content, the new copy is dropped and the entry points at that file.
     """
     date = _ts_to_date(image["message_ts"])
     ext = Path(image["name"]).suffix.lstrip(".")
     filename = f"{date}-{image['file_id']}.{ext}"
     filepath = output_dir / filename
+    part = filepath.with_name(filename + ".part")
 
-    resp = _download_with_auth(image["url"], token)
-
-    content_type = resp.headers.get("Content-Type", "")
-    if "image" not in content_type:
-        raise ValueError(
-            f"Expected image content, got '{content_type}' for {image['file_id']}"
-        )
-
-    filepath.write_bytes(resp.content)
+    with tracing.span("download", file_id=image["file_id"]):
+        start = time.perf_counter()
+        offset = part.stat().st_size if part.exists() else 0
+        try:
+            resp = session.get(image["url"], offset=offset)
+        except requests.HTTPError as e:
+            # 416: the partial file no longer matches; start over
+            if not offset or e.response is None or e.response.status_code != 416:
+                raise
+            part.unlink()
+            offset = 0
+            resp = session.get(image["url"])
 
-    logger.info(f"Downloaded {filename} ({len(resp.content)} bytes)")
+        try:
+            content_type = resp.headers.get("Content-Type", "")
+            if "image" not in content_type:
+                raise ValueError(
+                    f"Expected image content, got '{content_type}' for {image['file_id']}"
+                )
+            # A host that ignores Range answers 200 with the whole file
+            resumed = offset if resp.status_code == 206 else 0
+            digest = hashlib.sha256()
+            if resumed:
+                with open(part, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+            written = 0
+            with open(part, "ab" if resumed else "wb") as f:
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+        finally:
+            resp.close()
+        sha256 = digest.hexdigest()
+        if index is None:
+            part.replace(filepath)
+        else:
+            stored = index.store(sha256, filename, part)
+            if stored != filename:
+                logger.info(f"{filename} has the same content as {stored}; not stored again")
+                filename = stored
+        tracing.add("bytes", written)
+
+    resumed_note = f", resumed at {resumed}" if resumed else ""
+    logger.info(f"Downloaded {filename} ({written} bytes in "
+                f"{time.perf_counter() - start:.2f}s{resumed_note})")
 
     return {
         "id": image["file_id"],
@@ -188,20 +526,188 @@ def download_image(image: dict, output_dir: Path, token: str) -> dict:
         "artist": image.get("artist"),
         "width": image.get("width"),
         "height": image.get("height"),
+        "sha256": sha256,
     }
 
 
+def download_images(
+    images: list[dict],
+    output_dir: Path,
+    token: str,
+    max_workers: int = DOWNLOAD_WORKERS,
+    index: ContentIndex | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Download images concurrently. Returns (manifest entries, failed images).
+
+    Both lists keep the order of images. A failed download is logged and
+    leaves its .part file to resume from on the next run.
+    """
+    def fetch(image: dict) -> dict | None:
+        try:
+            return download_image(image, output_dir, session, index)
+        except Exception as e:
+            logger.error(f"Failed to download {image['file_id']}: {e}")
+            return None
+
+    if not images:
+        return [], []
+    workers = max(1, min(max_workers, len(images)))
+    with FileSession(token, pool_size=workers) as session, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fetch, images))
+    entries = [entry for entry in results if entry is not None]
+    failed = [image for image, entry in zip(images, results) if entry is None]
+    return entries, failed
+
+
+def _hash_files(filenames: list[str], output_dir: Path, max_workers: int) -> dict[str, str | None]:
+    """SHA-256 of each gallery file, hashed in parallel (None if the file is missing)."""
+
+    def rehash(filename: str) -> str | None:
+        path = output_dir / filename
+        return _hash_file(path) if path.exists() else None
+
+    workers = max(1, min(max_workers, len(filenames)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(filenames, pool.map(rehash, filenames)))
+
+
+def fill_missing_hashes(
+    manifest: list[dict], output_dir: Path, max_workers: int = VERIFY_WORKERS
+) -> int:
+    """Record the sha256 of entries downloaded before hashes were. Returns how many.
+
+    Image variants are keyed by content hash, so older drawings only get
+    variants once this has run.
+    """
+    filenames = sorted({e["filename"] for e in manifest if not e.get("sha256")})
+    if not filenames:
+        return 0
+    digests = _hash_files(filenames, output_dir, max_workers)
+    filled = 0
+    for entry in manifest:
+        if not entry.get("sha256") and digests.get(entry["filename"]):
+            entry["sha256"] = digests[entry["filename"]]
+            filled += 1
+    logger.info(f"Hashed {filled} gallery entries recorded without a SHA-256")
+    return filled
+
+
+def verify_gallery(
+    manifest: list[dict], output_dir: Path, max_workers: int = VERIFY_WORKERS
+) -> list[str]:
+    """Re-hash the gallery's files in parallel and check them against the manifest.
+
+    Entries without a sha256 (downloaded before hashes were recorded) get the
+    current one filled in. Returns a description of each missing or
+    corrupt file.
+    """
+    filenames = sorted({e["filename"] for e in manifest})
+    digests = _hash_files(filenames, output_dir, max_workers)
+
+    problems = {}
+    for entry in manifest:
+        filename = entry["filename"]
+        actual = digests[filename]
+        if actual is None:
+            problems[filename] = f"{filename}: missing"
+        elif entry.get("sha256") is None:
+            entry["sha256"] = actual
+        elif entry["sha256"] != actual:
+            problems[filename] = f"{filename}: SHA-256 mismatch (expected {entry['sha256']}, got {actual})"
+    for problem in problems.values():
+        logger.error(problem)
+    logger.info(f"Verified {len(filenames)} files, {len(problems)} missing or corrupt")
+    return list(problems.values())
+
+
+def _profile_name(user: dict) -> str | None:
+    profile = user.get("profile", {})
+    return profile.get("display_name") or profile.get("real_name") or None
+
+
 def get_slack_username(client: WebClient, user_id: str) -> str:
     """Look up a Slack user's display name."""
     try:
         resp = client.users_info(user=user_id)
-        profile = resp["user"]["profile"]
-        return profile.get("display_name") or profile.get("real_name") or user_id
+        return _profile_name(resp["user"]) or user_id
     except Exception:
         logger.warning(f"Could not resolve username for {user_id}")
         return user_id
 
 
+def fetch_user_directory(client: WebClient) -> dict[str, str]:
+    """Map every workspace member's ID to their name, via paginated users.list."""
+    names = {}
+    cursor = None
+    while True:
+        kwargs = {"limit": 200}
+        if cursor:
+            kwargs["cursor"] = cursor
+        resp = client.users_list(**kwargs)
+        for member in resp["members"]:
+            name = _profile_name(member)
+            if name:
+                names[member["id"]] = name
+        cursor = resp.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    return names
+
+
+def load_user_cache() -> dict:
+    """Load the artist name cache: {user_id: {"name", "fetched_at"}}."""
+    if USER_CACHE_PATH.exists():
+        return json.loads(USER_CACHE_PATH.read_text())
+    return {}
+
+
+def save_user_cache(cache: dict) -> None:
+    """Save the artist name cache, replacing the previous file atomically."""
+    USER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = USER_CACHE_PATH.with_name(USER_CACHE_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(cache, indent=1, sort_keys=True) + "\n")
+    tmp.replace(USER_CACHE_PATH)
+
+
+def resolve_usernames(
+    client: WebClient, user_ids: list[str], cache: dict, now: float | None = None
+) -> dict[str, str]:
+    """Resolve user IDs to names, through the cache. Returns {user_id: name}.
+
+    Names younger than USER_CACHE_TTL come from the cache. With at least
+    USER_SWEEP_THRESHOLD unknown IDs, one users.list sweep resolves them
+    together; otherwise (and for anyone the sweep misses, e.g. guests from
+    other workspaces) users.info is called per ID. Only the requested IDs
+    are stored, not the whole directory. An ID that cannot be resolved
+    maps to itself and is not cached.
+    """
+    now = time.time() if now is None else now
+    names = {}
+    missing = []
+    for uid in dict.fromkeys(user_ids):
+        entry = cache.get(uid)
+        if entry and now - entry["fetched_at"] < USER_CACHE_TTL:
+            names[uid] = entry["name"]
+        else:
+            missing.append(uid)
+
+    directory: dict[str, str] = {}
+    if len(missing) >= USER_SWEEP_THRESHOLD:
+        try:
+            directory = fetch_user_directory(client)
+        except Exception as e:
+            logger.warning(f"users.list failed, looking users up one by one: {e}")
+    for uid in missing:
+        name = directory.get(uid) or get_slack_username(client, uid)
+        names[uid] = name
+        if name != uid:
+            cache[uid] = {"name": name, "fetched_at": int(now)}
+    logger.info(f"Resolved {len(names)} artists ({len(missing)} looked up, "
+                f"{'one users.list sweep' if directory else 'users.info only'})")
+    return names
+
+
 def load_manifest() -> list[dict]:
     """Load existing manifest from disk."""
     if MANIFEST_PATH.exists():
@@ -218,18 +724,73 @@ def save_manifest(manifest: list[dict]) -> None:
 
 def fetch_all_messages(client: WebClient, channel_id: str) -> list[dict]:
     """Fetch ALL channel messages (no time limit)."""
-    messages = []
-    cursor = None
-    while True:
-        kwargs = {"channel": channel_id, "limit": 200}
-        if cursor:
-            kwargs["cursor"] = cursor
-        resp = client.conversations_history(**kwargs)
-        messages.extend(resp["messages"])
-        cursor = resp.get("response_metadata", {}).get("next_cursor")
-        if not cursor:
-            break
-    return messages
+    return _fetch_history(client, channel_id)
+
+
+def _is_prompt(message: dict, bot_user_id: str) -> bool:
+    if message.get("subtype") == "channel_join":
+        return False
+    return message.get("user") == bot_user_id or bool(message.get("bot_id"))
+
+
+def load_sync_state() -> dict:
+    """Load the local prompt store, the channel's high-water mark and thread marks."""
+    if SYNC_STATE_PATH.exists():
+        return json.loads(SYNC_STATE_PATH.read_text())
+    return {"channel_id": None, "watermark": None, "prompts": [], "threads": {}}
+
+
+def save_sync_state(state: dict) -> None:
+    """Save the sync state, replacing the previous file atomically."""
+    SYNC_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SYNC_STATE_PATH.with_name(SYNC_STATE_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=1) + "\n")
+    tmp.replace(SYNC_STATE_PATH)
+
+
+def sync_channel_messages(
+    client: WebClient,
+    channel_id: str,
+    state: dict,
+    bot_user_id: str,
+    days_back: int = DAYS_BACK,
+) -> list[dict]:
+    """Bring the local prompt store up to date. Returns the recent messages.
+
+    The store keeps every bot prompt ({"ts", "text"}, as a PromptIndex) plus the
+    newest ts seen, so only messages after that watermark are new and the
+    full history is read just once (first run, or a different channel).
+
+    The sync is not purely incremental: the last days_back days of top-level
+    messages are re-read each run. A new reply in an older thread changes
+    nothing after the watermark; Slack only reports it through the parent's
+    latest_reply, so finding it would otherwise take one conversations.replies
+    call per open thread, where re-reading the window is usually one page.
+    Only the threads whose latest_reply moved are then fetched (see
+    updated_threads()).
+    """
+    recent_since = datetime.now(tz=timezone.utc).timestamp() - (days_back * 86400)
+    if state.get("channel_id") != channel_id:
+        state.update(channel_id=channel_id, watermark=None, prompts=[], threads={})
+
+    watermark = state["watermark"]
+    if watermark is None:
+        fetched = _fetch_history(client, channel_id)
+        recent = [m for m in fetched if float(m["ts"]) > recent_since]
+    else:
+        fetched = recent = _fetch_history(client, channel_id, min(float(watermark), recent_since))
+
+    prompts = PromptIndex(state["prompts"])
+    for m in fetched:
+        if _is_prompt(m, bot_user_id):
+            prompts.add(m["ts"], m["text"])
+
+    new = [m for m in fetched if watermark is None or float(m["ts"]) > float(watermark)]
+    if new:
+        state["watermark"] = max((m["ts"] for m in new), key=float)
+    logger.info(f"Synced {len(fetched)} messages ({len(new)} new since last run), "
+                f"{len(state['prompts'])} prompts in local store")
+    return recent
 
 
 def save_prompts(prompt_texts: list[str]) -> None:
@@ -238,104 +799,129 @@ def save_prompts(prompt_texts: list[str]) -> None:
     logger.info(f"Saved {len(prompt_texts)} prompts to prompts.json")
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     """Orchestrate the full scrape: fetch messages, find images, download new ones."""
+    parser = argparse.ArgumentParser(description="Download new #drawma drawings into the gallery")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-hash the gallery's files against the manifest instead of scraping",
+    )
+    parser.add_argument("--report", help=f"Write the JSON run report here (default: {REPORT_PATH})")
+    args = parser.parse_args(argv)
+
+    report_path = Path(args.report).expanduser() if args.report else REPORT_PATH
+    with tracing.run("scrape-gallery", report_path, verify=args.verify) as run:
+        code = verify() if args.verify else scrape()
+        run.set(exit_code=code)
+    return code
+
+
+def verify() -> int:
+    """Check the gallery's files against the manifest. Returns exit code."""
+    manifest = load_manifest()
+    problems = verify_gallery(manifest, OUTPUT_DIR)
+    save_manifest(manifest)
+    return 1 if problems else 0
+
+
+def scrape() -> int:
+    """Fetch new messages, find images and download new ones. Returns exit code."""
     token = os.environ.get("SLACK_BOT_TOKEN")
     if not token:
         logger.error("SLACK_BOT_TOKEN environment variable not set")
         return 1
 
-    client = WebClient(token=token)
+    client = RateLimitedClient(WebClient(token=token, base_url=api_base_url()))
 
     # Get bot user ID so we can identify bot prompts
-    bot_user_id = get_bot_user_id(client)
+    bot_user_id, team_id = get_bot_identity(client)
     logger.info(f"Bot user ID: {bot_user_id}")
 
-    # Find the channel
-    channel_id = find_channel_id(client, CHANNEL_NAME)
+    # Find the channel (cached ID, confirmed with one call)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    channel_cache = load_channel_cache()
+    channel_id = resolve_channel_id(client, team_id, CHANNEL_NAME, channel_cache)
+    save_channel_cache(channel_cache)
     if not channel_id:
         logger.error(f"Channel {CHANNEL_NAME} not found")
         return 1
     logger.info(f"Found channel {CHANNEL_NAME}: {channel_id}")
 
-    # Fetch ALL messages for prompts (full history)
-    all_messages = fetch_all_messages(client, channel_id)
-    logger.info(f"Fetched {len(all_messages)} total messages from channel history")
+    # Sync new messages into the local store (full history on the first run)
+    sync_state = load_sync_state()
+    messages = sync_channel_messages(client, channel_id, sync_state, bot_user_id, DAYS_BACK)
+    save_sync_state(sync_state)
 
-    # Identify bot prompts (messages from the bot) — full history
-    all_prompts = [
-        {"text": m["text"], "ts": m["ts"]}
-        for m in all_messages
-        if m.get("user") == bot_user_id or m.get("bot_id")
-    ]
-    logger.info(f"Found {len(all_prompts)} bot prompts (all time)")
+    # Bot prompts (messages from the bot) — full history, from the store
+    prompt_index = PromptIndex(sync_state["prompts"])
+    logger.info(f"Found {len(prompt_index)} bot prompts (all time)")
 
-    # Save all prompt texts for gallery whispers
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # Save all prompt texts for gallery whispers, newest first
     prompt_texts = [
-        p["text"] for p in all_prompts
+        p["text"] for p in reversed(prompt_index.prompts)
         if p["text"].strip() and "has joined the channel" not in p["text"]
     ]
     save_prompts(prompt_texts)
 
-    # Use recent messages for image discovery
-    messages = fetch_channel_messages(client, channel_id)
-
-    # Collect images from top-level messages
+    # Collect images from recent top-level messages
     all_images = extract_images_from_messages(messages)
 
-    # Also collect images from threads (replies to bot prompts)
-    for m in messages:
-        if m.get("reply_count", 0) > 0:
-            replies = fetch_thread_replies(client, channel_id, m["ts"])
-            all_images.extend(extract_images_from_messages(replies))
+    # Also collect images from threads (replies to bot prompts), fetching
+    # only threads with replies since the last run
+    updated = updated_threads(messages, sync_state.get("threads", {}))
+    logger.info(f"Fetching {len(updated)} updated threads")
+    replies = fetch_all_thread_replies(client, channel_id, list(updated), since=updated)
+    all_images.extend(extract_images_from_messages(replies))
 
     # Deduplicate by file_id (same image can appear in both channel and thread)
-    seen_ids: set[str] = set()
-    deduped: list[dict] = []
-    for img in all_images:
-        if img["file_id"] not in seen_ids:
-            seen_ids.add(img["file_id"])
-            deduped.append(img)
-    all_images = deduped
+    all_images = dedupe_images(all_images)
 
     logger.info(f"Found {len(all_images)} unique images")
 
     # Associate images with prompts
-    all_images = associate_images_with_prompts(all_images, all_prompts)
+    all_images = associate_images_with_prompts(all_images, prompt_index)
 
     # Filter out already-downloaded images
     manifest = load_manifest()
     new_images = filter_new_images(all_images, manifest)
     logger.info(f"Found {len(new_images)} new images to download")
 
-    if not new_images:
+    new_entries: list[dict] = []
+    failed: list[dict] = []
+    if new_images:
+        # Resolve usernames
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        user_cache = load_user_cache()
+        artists = resolve_usernames(client, [img["user"] for img in new_images if img.get("user")], user_cache)
+        save_user_cache(user_cache)
+        for img in new_images:
+            uid = img.get("user")
+            img["artist"] = artists.get(uid, uid)
+
+        # Download images and build manifest entries
+        index = ContentIndex(OUTPUT_DIR, manifest)
+        new_entries, failed = download_images(new_images, OUTPUT_DIR, token, index=index)
+        manifest.extend(new_entries)
+        logger.info(f"Downloaded {len(new_entries)} new images")
+    else:
         logger.info("No new images to download")
-        return 0
 
-    # Resolve usernames
-    username_cache: dict[str, str] = {}
-    for img in new_images:
-        uid = img.get("user")
-        if uid and uid not in username_cache:
-            username_cache[uid] = get_slack_username(client, uid)
-        img["artist"] = username_cache.get(uid, uid)
-
-    # Download images and build manifest entries
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    new_entries = []
-    for img in new_images:
-        try:
-            entry = download_image(img, OUTPUT_DIR, token)
-            new_entries.append(entry)
-        except Exception as e:
-            logger.error(f"Failed to download {img['file_id']}: {e}")
+    # Web-sized WebP/AVIF variants for new drawings (and any still missing
+    # them), which needs the content hash of drawings from before hashing
+    hashed = fill_missing_hashes(manifest, OUTPUT_DIR)
+    with_variants = generate_variants(manifest, OUTPUT_DIR)
 
     # Save updated manifest
-    manifest.extend(new_entries)
-    save_manifest(manifest)
+    if new_entries or hashed or with_variants:
+        save_manifest(manifest)
+
+    # Threads with failed downloads are fetched again next run
+    failed_threads = {img.get("thread_ts") for img in failed}
+    mark_threads_synced(sync_state, messages, list(updated), failed_threads)
+    save_sync_state(sync_state)
 
-    logger.info(f"Downloaded {len(new_entries)} new images")
+    client.log_stats()
     return 0
 
 
@@ -2,8 +2,11 @@
 from pathlib import Path
 from typing import Any
 
-import yaml
+from bot_core import config as core_config
+from bot_core.config import merge_cli_args
 
+# The prompt bot has no flags of its own, so bot_core's CLI merge is its own
+__all__ = ["DEFAULT_CONFIG", "load_config", "merge_cli_args"]
 
 DEFAULT_CONFIG = {
     "slack": {
@@ -22,40 +25,17 @@ DEFAULT_CONFIG = {
         "reuters", "foxnews", "cnn", "bbc",
         "ft", "bloomberg", "guardian", "breitbart"
     ],
+    "outbox": {
+        "path": "~/.cache/surreal-prompt-bot/outbox.db",
+        "max_attempts": 5,
+    },
+    "report": {
+        "path": "~/.cache/surreal-prompt-bot/run-report.json",
+        "otlp_endpoint": None,
+    },
 }
 
 
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load config from YAML file, falling back to defaults."""
-    config = DEFAULT_CONFIG.copy()
-
-    if config_path.exists():
-        with open(config_path) as f:
-            file_config = yaml.safe_load(f) or {}
-        config = _deep_merge(config, file_config)
-
-    return config
-
-
-def _deep_merge(base: dict, override: dict) -> dict:
-    """Deep merge override into base."""
-    result = base.copy()
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = _deep_merge(result[key], value)
-        else:
-            result[key] = value
-    return result
-
-
-def merge_cli_args(config: dict[str, Any], args) -> dict[str, Any]:
-    """Merge CLI arguments into config, overriding where specified."""
-    if args.channel:
-        config["slack"]["channel"] = args.channel
-    if args.temperature is not None:
-        config["prompt"]["temperature"] = args.temperature
-    if args.sources:
-        config["sources"] = args.sources.split(",")
-    if args.no_inspirations:
-        config["inspirations"]["pick_count"] = 0
-    return config
+    return core_config.load_config(config_path, DEFAULT_CONFIG)
@@ -0,0 +1,136 @@
+"""Web-sized variants of gallery drawings: resized WebP and AVIF copies.
+
+Drawings arrive as multi-megabyte phone photos. For each one this writes a
+set of width buckets in WebP and AVIF under variants/, named by the content
+hash, so an image that has already been processed (or a duplicate upload of
+it) is never encoded twice. Encoding is CPU-bound and runs in a process pool.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "variants"
+
+# Widths generated for each drawing (never wider than the original)
+WIDTHS = (320, 640, 1280, 1920)
+
+# Format -> (MIME type, Pillow save options). AVIF's default speed (6) is
+# ~12x slower than 8 on a phone photo for a file only a few percent smaller.
+FORMATS = {
+    "avif": ("image/avif", {"quality": 55, "speed": 8}),
+    "webp": ("image/webp", {"quality": 80, "method": 4}),
+}
+
+EXIF_ORIENTATION = 0x0112
+
+
+def target_sizes(width: int, height: int) -> list[tuple[int, int]]:
+    """Width buckets below the original, plus the original capped at the largest."""
+    widths = sorted({w for w in WIDTHS if w < width} | {min(width, WIDTHS[-1])})
+    return [(w, max(1, round(height * w / width))) for w in widths]
+
+
+def variant_path(sha256: str, width: int, fmt: str) -> str:
+    """Path of a variant, relative to the gallery directory."""
+    return f"{VARIANTS_DIR}/{sha256[:16]}-{width}.{fmt}"
+
+
+def make_variants(source: Path, sha256: str, output_dir: Path) -> list[dict]:
+    """Write any missing variants of source; return all of them.
+
+    Returns [{"path", "type", "width", "height"}] with paths relative to
+    output_dir. Existing variant files are kept, so calling this again
+    for the same content only reads the image header.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as img:
+        width, height = img.size
+        # Phone photos are stored sideways with an EXIF rotation
+        sideways = img.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8)
+        if sideways:
+            width, height = height, width
+
+        variants = [
+            {"path": variant_path(sha256, w, fmt), "type": mimetype, "width": w, "height": h}
+            for w, h in target_sizes(width, height)
+            for fmt, (mimetype, _) in FORMATS.items()
+        ]
+        missing = [v for v in variants if not (output_dir / v["path"]).exists()]
+        if not missing:
+            return variants
+
+        sizes = sorted({(v["width"], v["height"]) for v in missing}, reverse=True)
+        # JPEGs can be decoded straight at a reduced scale (no smaller than needed)
+        w, h = sizes[0]
+        img.draft(None, (h, w) if sideways else (w, h))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if img.has_transparency_data else "RGB")
+
+        # Each size is downscaled from the next larger one
+        resized = {}
+        for size in sizes:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+            resized[size[0]] = img
+
+        (output_dir / VARIANTS_DIR).mkdir(parents=True, exist_ok=True)
+        for variant in missing:
+            fmt = Path(variant["path"]).suffix.lstrip(".")
+            path = output_dir / variant["path"]
+            tmp = path.with_name(path.name + ".tmp")
+            resized[variant["width"]].save(tmp, format=fmt.upper(), **FORMATS[fmt][1])
+            tmp.replace(path)
+    return variants
+
+
+def generate_variants(manifest: list[dict], output_dir: Path, max_workers: int | None = None) -> int:
+    """Add "variants" to manifest entries that lack them. Returns how many were updated.
+
+    Entries whose variant files have since been deleted are redone too.
+    Entries are processed once per content hash; entries without a sha256
+    (see scrape_gallery.fill_missing_hashes) or whose file is missing are
+    skipped.
+    A file Pillow cannot identify gets an empty list, so it is not retried
+    every run; other failures are logged and retried next run.
+    """
+    pending: dict[str, list[dict]] = {}
+    for entry in manifest:
+        if not entry.get("sha256"):
+            continue
+        if "variants" in entry and all((output_dir / v["path"]).exists() for v in entry["variants"]):
+            continue
+        if not (output_dir / entry["filename"]).exists():
+            continue
+        pending.setdefault(entry["sha256"], []).append(entry)
+    if not pending:
+        return 0
+    try:
+        from PIL import UnidentifiedImageError
+    except ImportError:
+        logger.warning("Pillow is not installed; skipping image variants")
+        return 0
+
+    updated = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            sha256: pool.submit(make_variants, output_dir / entries[0]["filename"], sha256, output_dir)
+            for sha256, entries in pending.items()
+        }
+        for sha256, future in futures.items():
+            entries = pending[sha256]
+            try:
+                variants = future.result()
+            except UnidentifiedImageError:
+                logger.warning(f"{entries[0]['filename']} is not a readable image; no variants")
+                variants = []
+            except Exception as e:
+                logger.error(f"Failed to make variants of {entries[0]['filename']}: {e}")
+                continue
+            for entry in entries:
+                entry["variants"] = variants
+                updated += 1
+    logger.info(f"Generated variants for {len(pending)} drawings")
+    return updated
@@ -3,26 +3,11 @@ import logging
 import re
 from pathlib import Path
 
-from huggingface_hub import InferenceClient
+from bot_core.llm import build_messages, chat, chat_async, load_template, strip_think_tags
 
 logger = logging.getLogger(__name__)
 
 
-def load_template(template_path: Path) -> tuple[str, str]:
-    """Load prompt template from file. Returns (system_prompt, user_template)."""
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template file not found: {template_path}")
-
-    content = template_path.read_text()
-    parts = content.split("---", 1)
-
-    if len(parts) == 2:
-        return parts[0].strip(), parts[1].strip()
-    else:
-        # No separator, treat whole thing as user template
-        return "", content.strip()
-
-
 def build_llm_prompt(template: str, headlines: list[str], inspirations: list[str]) -> str:
     """Build the prompt using template with placeholders."""
     headlines_text = "\n".join(f"- {h}" for h in headlines)
@@ -34,45 +19,22 @@ def build_llm_prompt(template: str, headlines: list[str], inspirations: list[str
     )
 
 
-def generate_prompt(
-    headlines: list[str],
-    inspirations: list[str],
-    model: str,
-    temperature: float,
-    api_key: str,
-    template_path: Path = None,
-) -> str:
-    """Generate a surreal prompt using Hugging Face Inference API."""
-    client = InferenceClient(token=api_key)
-
-    # Load template
+def _build_messages(
+    headlines: list[str], inspirations: list[str], template_path: Path | None
+) -> list[dict]:
+    """Build the chat messages for the LLM from the prompt template."""
     if template_path is None:
         template_path = Path(__file__).parent.parent / "prompt_template.txt"
 
     system_prompt, user_template = load_template(template_path)
     user_prompt = build_llm_prompt(user_template, headlines, inspirations)
 
-    logger.debug(f"System prompt:\n{system_prompt}")
-    logger.debug(f"User prompt:\n{user_prompt}")
+    return build_messages(system_prompt, user_prompt)
 
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": user_prompt})
 
-    response = client.chat_completion(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        max_tokens=1000,
-    )
-
-    result = response.choices[0].message.content.strip()
-
-    # Strip thinking tags if present (some models output <think>...</think>)
-    result = re.sub(r'<think>.*?</think>', '', result, flags=re.DOTALL).strip()
-    # Also handle unclosed think tags
-    result = re.sub(r'<think>.*', '', result, flags=re.DOTALL).strip()
+def _clean_response(text: str) -> str:
+    """Strip thinking tags from the prompt text and convert it to Slack mrkdwn."""
+    result = strip_think_tags(text)
 
     # Convert standard markdown to Slack mrkdwn format
     # **bold** -> *bold*
@@ -84,3 +46,29 @@ def generate_prompt(
 
     logger.info(f"Generated prompt: {result}")
     return result
+
+
+def generate_prompt(
+    headlines: list[str],
+    inspirations: list[str],
+    model: str,
+    temperature: float,
+    api_key: str,
+    template_path: Path = None,
+) -> str:
+    """Generate a surreal prompt using Hugging Face Inference API."""
+    messages = _build_messages(headlines, inspirations, template_path)
+    return _clean_response(chat(messages, model, temperature, api_key))
+
+
+async def generate_prompt_async(
+    headlines: list[str],
+    inspirations: list[str],
+    model: str,
+    temperature: float,
+    api_key: str,
+    template_path: Path = None,
+) -> str:
+    """Async variant of generate_prompt."""
+    messages = _build_messages(headlines, inspirations, template_path)
+    return _clean_response(await chat_async(messages, model, temperature, api_key))
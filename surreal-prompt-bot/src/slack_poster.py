@@ -1,18 +1,34 @@
 """Slack message poster."""
 import logging
 
-from slack_sdk import WebClient
+from bot_core.slack_client import RateLimitedClient, api_base_url
 
 logger = logging.getLogger(__name__)
 
 
 def post_to_slack(message: str, channel: str, token: str) -> bool:
     """Post a message to Slack channel. Returns True on success."""
+    from slack_sdk import WebClient
+
     try:
-        client = WebClient(token=token)
+        client = RateLimitedClient(WebClient(token=token, base_url=api_base_url()))
         client.chat_postMessage(channel=channel, text=message)
         logger.info(f"Posted to {channel}: {message[:50]}...")
         return True
     except Exception as e:
         logger.error(f"Failed to post to Slack: {e}")
         return False
+
+
+async def post_to_slack_async(message: str, channel: str, token: str) -> bool:
+    """Async variant of post_to_slack using AsyncWebClient."""
+    from slack_sdk.web.async_client import AsyncWebClient
+
+    try:
+        client = RateLimitedClient(AsyncWebClient(token=token, base_url=api_base_url()))
+        await client.chat_postMessage(channel=channel, text=message)
+        logger.info(f"Posted to {channel}: {message[:50]}...")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to post to Slack: {e}")
+        return False
@@ -0,0 +1,311 @@
+"""Local stand-in for the Slack Web API, for offline end-to-end tests and benchmarks.
+
+Serves the handful of methods the bots use from fixture data:
+
+    auth.test, conversations.list, conversations.info, conversations.history,
+    conversations.replies, users.info, users.list, chat.postMessage,
+    files.getUploadURLExternal / completeUploadExternal (files_upload_v2),
+    files.info
+
+plus url_private_download links that 302 to a fake CDN host path. It can
+simulate pagination (page_size), per-request latency and rate limiting
+(every Nth call to a method answers 429 with Retry-After).
+
+Point a client at it with WebClient(base_url=server.api_url), or set
+SLACK_API_URL when running a bot. Standalone:
+
+    python tests/fake_slack.py fixture.json --port 8765 --latency 0.05
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections from concurrent downloads,
+    # which then wait out a 1s SYN retransmit
+    request_queue_size = 128
+
+
+class FakeSlack:
+    """Fixture-backed fake Slack server running in a background thread.
+
+    fixture keys (all optional):
+        bot_user_id: str
+        channels: [{"id", "name"}]
+        messages: {channel_id: [message, ...]}  (newest first, like Slack)
+        replies: {channel_id: {thread_ts: [parent, reply, ...]}}
+        users: {user_id: {"profile": {...}}}
+        files: {file_id: {"content": bytes, "mimetype": str}}
+    """
+
+    def __init__(
+        self,
+        fixture: dict | None = None,
+        page_size: int = 200,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: int = 1,
+    ):
+        self.fixture = fixture or {}
+        self.page_size = page_size
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.calls: list[tuple[str, dict]] = []
+        self.call_counts: Counter = Counter()
+        self.posted: list[dict] = []
+        self.uploads: list[dict] = []
+        self._pending_uploads: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ── lifecycle ──────────────────────────────────────────────────────
+
+    def start(self, port: int = 0) -> "FakeSlack":
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = _Server(("127.0.0.1", port), handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "FakeSlack":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/api/"
+
+    # ── API methods ────────────────────────────────────────────────────
+
+    def _page(self, items: list, params: dict, key: str) -> dict:
+        limit = min(int(params.get("limit", self.page_size)), self.page_size)
+        start = int(params.get("cursor") or 0)
+        end = start + limit
+        next_cursor = str(end) if end < len(items) else ""
+        return {
+            "ok": True,
+            key: items[start:end],
+            "has_more": bool(next_cursor),
+            "response_metadata": {"next_cursor": next_cursor},
+        }
+
+    def _with_file_urls(self, messages: list[dict]) -> list[dict]:
+        """Point url_private_download at this server for fixture files."""
+        result = []
+        for msg in messages:
+            msg = dict(msg)
+            if "files" in msg:
+                msg["files"] = [
+                    {**f, "url_private_download": f"{self.url}/files-pri/{f['id']}/{f['name']}"}
+                    for f in msg["files"]
+                ]
+            result.append(msg)
+        return result
+
+    def auth_test(self, params):
+        return {"ok": True, "user_id": self.fixture.get("bot_user_id", "UBOT"),
+                "team_id": self.fixture.get("team_id", "T0FAKE")}
+
+    def conversations_list(self, params):
+        return self._page(self.fixture.get("channels", []), params, "channels")
+
+    def conversations_info(self, params):
+        for channel in self.fixture.get("channels", []):
+            if channel["id"] == params.get("channel"):
+                return {"ok": True, "channel": channel}
+        return {"ok": False, "error": "channel_not_found"}
+
+    def conversations_history(self, params):
+        messages = self.fixture.get("messages", {}).get(params.get("channel"), [])
+        if params.get("oldest"):
+            messages = [m for m in messages if float(m["ts"]) > float(params["oldest"])]
+        if params.get("latest"):
+            messages = [m for m in messages if float(m["ts"]) < float(params["latest"])]
+        return self._page(self._with_file_urls(messages), params, "messages")
+
+    def conversations_replies(self, params):
+        threads = self.fixture.get("replies", {}).get(params.get("channel"), {})
+        messages = threads.get(params.get("ts"))
+        if messages is None:
+            return {"ok": False, "error": "thread_not_found"}
+        if params.get("oldest"):
+            parent, rest = messages[:1], messages[1:]
+            messages = parent + [m for m in rest if float(m["ts"]) > float(params["oldest"])]
+        return self._page(self._with_file_urls(messages), params, "messages")
+
+    def users_info(self, params):
+        user = self.fixture.get("users", {}).get(params.get("user"))
+        if user is None:
+            return {"ok": False, "error": "user_not_found"}
+        return {"ok": True, "user": {"id": params["user"], **user}}
+
+    def users_list(self, params):
+        members = [{"id": uid, **user} for uid, user in self.fixture.get("users", {}).items()]
+        return self._page(members, params, "members")
+
+    def chat_postMessage(self, params):
+        ts = f"{time.time():.6f}"
+        self.posted.append({**params, "ts": ts})
+        return {"ok": True, "channel": params.get("channel"), "ts": ts}
+
+    def files_getUploadURLExternal(self, params):
+        with self._lock:
+            file_id = f"FUP{len(self._pending_uploads) + len(self.uploads) + 1:05d}"
+            self._pending_uploads[file_id] = {"filename": params.get("filename")}
+        return {"ok": True, "upload_url": f"{self.url}/upload/{file_id}", "file_id": file_id}
+
+    def files_completeUploadExternal(self, params):
+        files = params.get("files")
+        if isinstance(files, str):
+            files = json.loads(files)
+        completed = []
+        for f in files:
+            with self._lock:
+                pending = self._pending_uploads.pop(f["id"], {})
+            upload = {**pending, **params, "id": f["id"], "title": f.get("title")}
+            upload.pop("files", None)
+            self.uploads.append(upload)
+            completed.append({"id": f["id"], "title": f.get("title")})
+        return {"ok": True, "files": completed}
+
+    def files_info(self, params):
+        with self._lock:
+            upload = next((u for u in self.uploads if u["id"] == params.get("file")), None)
+        if upload is None:
+            return {"ok": False, "error": "file_not_found"}
+        return {"ok": True, "file": {
+            "id": upload["id"],
+            "name": upload.get("filename"),
+            "title": upload.get("title"),
+            "permalink": f"{self.url}/files/{upload['id']}/{upload.get('filename')}",
+        }}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeSlack
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, data: dict, headers: dict | None = None):
+        self._send(status, json.dumps(data).encode(), "application/json", headers)
+
+    def _params(self) -> dict:
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length)
+            if "json" in self.headers.get("Content-Type", ""):
+                params.update(json.loads(body or b"{}"))
+            elif "x-www-form-urlencoded" in self.headers.get("Content-Type", ""):
+                params.update({k: v[-1] for k, v in parse_qs(body.decode()).items()})
+        return params
+
+    def _handle(self):
+        fake = self.fake
+        if fake.latency:
+            time.sleep(fake.latency)
+        path = urlparse(self.path).path
+
+        if path.startswith("/files-pri/"):
+            file_id = path.split("/")[2]
+            return self._send(302, b"", "text/plain", {"Location": f"{fake.url}/cdn/{file_id}"})
+        if path.startswith("/cdn/"):
+            f = fake.fixture.get("files", {}).get(path.split("/")[2])
+            if f is None:
+                return self._send(404, b"not found", "text/plain")
+            return self._send(200, f["content"], f.get("mimetype", "image/png"))
+        if path.startswith("/upload/"):
+            self._params()
+            return self._send(200, b"OK - 0", "text/plain")
+        if not path.startswith("/api/"):
+            return self._send(404, b"not found", "text/plain")
+
+        method = path[len("/api/"):].replace(".", "_")
+        params = self._params()
+        with fake._lock:
+            fake.calls.append((method, params))
+            fake.call_counts[method] += 1
+            count = fake.call_counts[method]
+        if fake.rate_limit_every and count % fake.rate_limit_every == 0:
+            return self._json(
+                429, {"ok": False, "error": "ratelimited"},
+                {"Retry-After": str(fake.retry_after)},
+            )
+        handler = getattr(fake, method, None)
+        if handler is None:
+            return self._json(200, {"ok": False, "error": "unknown_method"})
+        self._json(200, handler(params))
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def _load_fixture(path: str) -> dict:
+    with open(path) as f:
+        fixture = json.load(f)
+    for f in fixture.get("files", {}).values():
+        if "content_b64" in f:
+            f["content"] = base64.b64decode(f.pop("content_b64"))
+    return fixture
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake Slack Web API server")
+    parser.add_argument("fixture", help="Fixture JSON (file contents as content_b64)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Answer every Nth call to a method with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    fake = FakeSlack(
+        _load_fixture(args.fixture),
+        page_size=args.page_size,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+    ).start(args.port)
+    print(f"Fake Slack API at {fake.api_url} (set SLACK_API_URL to use it)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 """Tests for main bot entrypoint."""
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
+import json
 import os
 
 import pytest
 
+from bot_core.outbox import Outbox
 
-def test_bot_dry_run_does_not_post():
+
+def test_bot_dry_run_does_not_post(tmp_path):
     """Dry run generates prompt but doesn't post to Slack."""
     with patch("bot.scrape_all_sources", return_value=["Test headline"]), \
          patch("bot.load_inspirations", return_value=["test style"]), \
@@ -23,6 +26,7 @@ def test_bot_dry_run_does_not_post():
             sources = None
             no_inspirations = False
             config = "config.yaml"
+            report = str(tmp_path / "report.json")
 
         result = run_bot(Args())
 
@@ -30,9 +34,10 @@ def test_bot_dry_run_does_not_post():
         assert result == 0
 
 
-def test_bot_posts_on_success():
+def test_bot_posts_on_success(tmp_path):
     """Bot posts generated prompt to Slack."""
     with patch("bot.scrape_all_sources", return_value=["Test headline"]), \
+         patch("bot.Outbox", lambda path: Outbox(tmp_path / "outbox.db")), \
          patch("bot.load_inspirations", return_value=["test style"]), \
          patch("bot.sample_inspirations", return_value=["test style"]), \
          patch("bot.generate_prompt", return_value="Test prompt"), \
@@ -48,8 +53,79 @@ def test_bot_posts_on_success():
             sources = None
             no_inspirations = False
             config = "config.yaml"
+            report = str(tmp_path / "report.json")
 
         result = run_bot(Args())
 
         mock_post.assert_called_once()
         assert result == 0
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["run"] == "surreal-prompt-bot"
+    stages = [span["name"] for span in report["spans"]["children"]]
+    assert stages == ["scrape", "inspirations", "generate", "post"]
+    assert report["spans"]["attributes"]["exit_code"] == 0
+    post = report["spans"]["children"][-1]
+    assert post["children"][0]["attributes"]["delivered"] is True
+
+
+class PostArgs:
+    dry_run = False
+    drain = False
+    channel = "#test"
+    temperature = None
+    sources = None
+    no_inspirations = False
+    config = "config.yaml"
+    report = None
+
+
+def test_bot_queues_failed_post_and_drain_retries(tmp_path):
+    """A failed post stays in the outbox and --drain delivers it later."""
+    outbox_path = tmp_path / "outbox.db"
+    with patch("bot.scrape_all_sources", return_value=["Test headline"]), \
+         patch("bot.load_inspirations", return_value=["test style"]), \
+         patch("bot.sample_inspirations", return_value=["test style"]), \
+         patch("bot.generate_prompt", return_value="Test prompt") as mock_generate, \
+         patch("bot.Outbox", lambda path: Outbox(outbox_path)), \
+         patch.dict(os.environ, {"HF_TOKEN": "test", "SLACK_BOT_TOKEN": "xoxb-test"}):
+
+        from bot import run_bot
+
+        class Args(PostArgs):
+            report = str(tmp_path / "report.json")
+
+        with patch("bot.post_to_slack", return_value=False):
+            assert run_bot(Args()) == 1
+        assert len(Outbox(outbox_path).pending()) == 1
+
+        class DrainArgs(Args):
+            drain = True
+
+        with patch("bot.post_to_slack", return_value=True) as mock_post:
+            assert run_bot(DrainArgs()) == 0
+
+        mock_post.assert_called_once_with("Test prompt", "#test", "xoxb-test")
+        mock_generate.assert_called_once()
+        assert Outbox(outbox_path).pending() == []
+
+
+def test_bot_async_mode_posts(tmp_path):
+    """--async runs the asyncio pipeline end to end."""
+    with patch("bot.scrape_all_sources_async", AsyncMock(return_value=["Test headline"])), \
+         patch("bot.load_inspirations", return_value=["test style"]), \
+         patch("bot.sample_inspirations", return_value=["test style"]), \
+         patch("bot.generate_prompt_async", AsyncMock(return_value="Test prompt")), \
+         patch("bot.post_to_slack_async", AsyncMock(return_value=True)) as mock_post, \
+         patch("bot.Outbox", lambda path: Outbox(tmp_path / "outbox.db")), \
+         patch.dict(os.environ, {"HF_TOKEN": "test", "SLACK_BOT_TOKEN": "xoxb-test"}):
+
+        from bot import run_bot
+
+        class AsyncArgs(PostArgs):
+            use_async = True
+            report = str(tmp_path / "report.json")
+
+        assert run_bot(AsyncArgs()) == 0
+
+    mock_post.assert_awaited_once_with("Test prompt", "#test", "xoxb-test")
@@ -0,0 +1,91 @@
+"""Tests for gallery image variants."""
+import hashlib
+
+import pytest
+
+from src.derivatives import generate_variants, make_variants, target_sizes
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _photo(path, size=(2000, 1500), orientation=None):
+    img = Image.new("RGB", size, (200, 30, 90))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    img.save(path, format="JPEG", exif=exif)
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_target_sizes_keep_aspect_and_never_upscale():
+    assert target_sizes(4032, 3024) == [(320, 240), (640, 480), (1280, 960), (1920, 1440)]
+    assert target_sizes(800, 600) == [(320, 240), (640, 480), (800, 600)]
+    assert target_sizes(200, 100) == [(200, 100)]
+
+
+def test_make_variants_writes_each_size_and_format(tmp_path):
+    sha256 = _photo(tmp_path / "a.jpg")
+
+    variants = make_variants(tmp_path / "a.jpg", sha256, tmp_path)
+
+    assert {v["type"] for v in variants} == {"image/avif", "image/webp"}
+    assert len(variants) == 8
+    assert sorted({v["width"] for v in variants}) == [320, 640, 1280, 1920]
+    for v in variants:
+        with Image.open(tmp_path / v["path"]) as img:
+            assert img.size == (v["width"], v["height"])
+            assert img.format == v["path"].rsplit(".", 1)[1].upper()
+
+
+def test_make_variants_applies_exif_rotation(tmp_path):
+    # Stored landscape, shown portrait (orientation 6 = rotate 90° CW)
+    sha256 = _photo(tmp_path / "a.jpg", size=(800, 600), orientation=6)
+
+    variants = make_variants(tmp_path / "a.jpg", sha256, tmp_path)
+
+    largest = max(variants, key=lambda v: v["width"])
+    assert (largest["width"], largest["height"]) == (600, 800)
+    with Image.open(tmp_path / largest["path"]) as img:
+        assert img.size == (600, 800)
+
+
+def test_make_variants_is_idempotent(tmp_path):
+    sha256 = _photo(tmp_path / "a.jpg", size=(700, 500))
+    first = make_variants(tmp_path / "a.jpg", sha256, tmp_path)
+    mtimes = {v["path"]: (tmp_path / v["path"]).stat().st_mtime_ns for v in first}
+
+    second = make_variants(tmp_path / "a.jpg", sha256, tmp_path)
+
+    assert second == first
+    assert {v["path"]: (tmp_path / v["path"]).stat().st_mtime_ns for v in second} == mtimes
+
+
+def test_generate_variants_once_per_content_hash(tmp_path):
+    sha256 = _photo(tmp_path / "a.jpg", size=(400, 300))
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+    manifest = [
+        {"id": "F1", "filename": "a.jpg", "sha256": sha256},
+        {"id": "F2", "filename": "a.jpg", "sha256": sha256},  # cross-posted duplicate
+        {"id": "F3", "filename": "old.jpg"},  # no hash recorded yet
+        {"id": "F4", "filename": "broken.png", "sha256": "ff" * 32},
+    ]
+
+    assert generate_variants(manifest, tmp_path, max_workers=2) == 3
+
+    assert manifest[0]["variants"] == manifest[1]["variants"]
+    assert [v["width"] for v in manifest[0]["variants"]] == [320, 320, 400, 400]
+    assert "variants" not in manifest[2]
+    # Unreadable files are recorded as having none, so they are not retried
+    assert manifest[3]["variants"] == []
+    assert generate_variants(manifest, tmp_path) == 0
+
+
+def test_generate_variants_redoes_deleted_files(tmp_path):
+    sha256 = _photo(tmp_path / "a.jpg", size=(400, 300))
+    manifest = [{"id": "F1", "filename": "a.jpg", "sha256": sha256}]
+    generate_variants(manifest, tmp_path, max_workers=1)
+    deleted = tmp_path / manifest[0]["variants"][0]["path"]
+    deleted.unlink()
+
+    assert generate_variants(manifest, tmp_path, max_workers=1) == 1
+    assert deleted.exists()
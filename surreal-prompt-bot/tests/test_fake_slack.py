@@ -0,0 +1,198 @@
+"""End-to-end tests against the local fake Slack Web API (no network)."""
+import json
+
+import pytest
+from slack_sdk import WebClient
+
+from bot_core.slack_client import RateLimitedClient
+from tests.fake_slack import FakeSlack
+
+
+def _fixture():
+    prompt = {"type": "message", "user": "UBOT", "text": "Draw a surreal fish",
+              "ts": "1706918400.000000", "reply_count": 1, "latest_reply": "1706918600.000000"}
+    top_level = {"type": "message", "user": "U123", "ts": "1706918500.000000",
+                 "files": [{"id": "F001", "name": "fish.png", "mimetype": "image/png",
+                            "original_w": 800, "original_h": 600}]}
+    reply = {"type": "message", "user": "U456", "ts": "1706918600.000000",
+             "thread_ts": "1706918400.000000",
+             "files": [{"id": "F002", "name": "eel.jpg", "mimetype": "image/jpeg",
+                        "original_w": 640, "original_h": 480}]}
+    return {
+        "bot_user_id": "UBOT",
+        "channels": [{"id": "C000", "name": "general"}, {"id": "C001", "name": "drawma"}],
+        "messages": {"C001": [top_level, prompt]},
+        "replies": {"C001": {"1706918400.000000": [prompt, reply]}},
+        "users": {
+            "U123": {"profile": {"display_name": "jake", "real_name": "Jake"}},
+            "U456": {"profile": {"display_name": "", "real_name": "Eel Person"}},
+        },
+        "files": {
+            "F001": {"content": b"png bytes", "mimetype": "image/png"},
+            "F002": {"content": b"jpeg bytes", "mimetype": "image/jpeg"},
+        },
+    }
+
+
+@pytest.fixture
+def fake_slack(monkeypatch):
+    with FakeSlack(_fixture(), page_size=1) as fake:
+        monkeypatch.setenv("SLACK_API_URL", fake.api_url)
+        monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-fake")
+        yield fake
+
+
+def test_scrape_gallery_main_end_to_end(fake_slack, tmp_path, monkeypatch):
+    """main() pages through the fake API, follows download redirects, writes the manifest."""
+    import scrape_gallery
+
+    output_dir = tmp_path / "img" / "drawma"
+    monkeypatch.setattr(scrape_gallery, "OUTPUT_DIR", output_dir)
+    monkeypatch.setattr(scrape_gallery, "MANIFEST_PATH", output_dir / "manifest.json")
+    monkeypatch.setattr(scrape_gallery, "PROMPTS_PATH", output_dir / "prompts.json")
+    monkeypatch.setattr(scrape_gallery, "SYNC_STATE_PATH", output_dir / "sync-state.json")
+    monkeypatch.setattr(scrape_gallery, "USER_CACHE_PATH", output_dir / "users.json")
+    monkeypatch.setattr(scrape_gallery, "CHANNEL_CACHE_PATH", output_dir / "channels.json")
+    monkeypatch.setattr(scrape_gallery, "REPORT_PATH", output_dir / "run-report.json")
+    # Fixture messages are from 2024; widen the recent-message window
+    monkeypatch.setattr(scrape_gallery, "DAYS_BACK", 365 * 100)
+
+    assert scrape_gallery.main([]) == 0
+
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    by_id = {e["id"]: e for e in manifest}
+    assert set(by_id) == {"F001", "F002"}
+    assert by_id["F001"]["artist"] == "jake"
+    assert by_id["F002"]["artist"] == "Eel Person"
+    assert by_id["F002"]["prompt"] == "Draw a surreal fish"
+    assert (output_dir / "2024-02-03-F001.png").read_bytes() == b"png bytes"
+    assert json.loads((output_dir / "prompts.json").read_text()) == ["Draw a surreal fish"]
+    # page_size=1 forces cursor pagination
+    methods = [m for m, _ in fake_slack.calls]
+    assert methods.count("conversations_list") == 2
+    # Each download is timed in the run report
+    report = json.loads((output_dir / "run-report.json").read_text())
+    downloads = [s for s in report["spans"]["children"] if s["name"] == "download"]
+    assert sorted(s["attributes"]["file_id"] for s in downloads) == ["F001", "F002"]
+    assert report["totals"]["bytes"] == sum(s["counters"]["bytes"] for s in downloads)
+
+
+def test_scrape_gallery_refetches_only_threads_with_new_replies(fake_slack, tmp_path, monkeypatch):
+    """latest_reply marks skip quiet threads and fetch only new replies of busy ones."""
+    import scrape_gallery
+
+    output_dir = tmp_path / "img" / "drawma"
+    monkeypatch.setattr(scrape_gallery, "OUTPUT_DIR", output_dir)
+    monkeypatch.setattr(scrape_gallery, "MANIFEST_PATH", output_dir / "manifest.json")
+    monkeypatch.setattr(scrape_gallery, "PROMPTS_PATH", output_dir / "prompts.json")
+    monkeypatch.setattr(scrape_gallery, "SYNC_STATE_PATH", output_dir / "sync-state.json")
+    monkeypatch.setattr(scrape_gallery, "USER_CACHE_PATH", output_dir / "users.json")
+    monkeypatch.setattr(scrape_gallery, "CHANNEL_CACHE_PATH", output_dir / "channels.json")
+    monkeypatch.setattr(scrape_gallery, "REPORT_PATH", output_dir / "run-report.json")
+    monkeypatch.setattr(scrape_gallery, "DAYS_BACK", 365 * 100)
+
+    def replies_calls():
+        # First pages only; page_size=1 splits each thread over several calls
+        return [params for m, params in fake_slack.calls
+                if m == "conversations_replies" and "cursor" not in params]
+
+    assert scrape_gallery.main([]) == 0
+    assert len(replies_calls()) == 1
+    fake_slack.calls.clear()
+
+    # Nothing new in the thread: no replies calls at all
+    assert scrape_gallery.main([]) == 0
+    assert replies_calls() == []
+
+    # A new drawing in the thread: fetched from the last seen reply on
+    new_reply = {"type": "message", "user": "U123", "ts": "1706918700.000000",
+                 "thread_ts": "1706918400.000000",
+                 "files": [{"id": "F003", "name": "squid.png", "mimetype": "image/png"}]}
+    fake_slack.fixture["replies"]["C001"]["1706918400.000000"].append(new_reply)
+    fake_slack.fixture["files"]["F003"] = {"content": b"squid", "mimetype": "image/png"}
+    prompt = fake_slack.fixture["messages"]["C001"][1]
+    prompt.update(reply_count=2, latest_reply="1706918700.000000")
+
+    assert scrape_gallery.main([]) == 0
+    calls = replies_calls()
+    assert len(calls) == 1
+    assert calls[0]["oldest"] == "1706918600.000000"
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    assert [e["id"] for e in manifest][-1] == "F003"
+    # The artist was resolved on the first run and comes from the user cache
+    assert manifest[-1]["artist"] == "jake"
+    assert "users_info" not in [m for m, _ in fake_slack.calls]
+
+
+def test_scrape_gallery_second_run_is_incremental(fake_slack, tmp_path, monkeypatch):
+    """With a sync state, history is read once, from the watermark/window on."""
+    import scrape_gallery
+
+    output_dir = tmp_path / "img" / "drawma"
+    monkeypatch.setattr(scrape_gallery, "OUTPUT_DIR", output_dir)
+    monkeypatch.setattr(scrape_gallery, "MANIFEST_PATH", output_dir / "manifest.json")
+    monkeypatch.setattr(scrape_gallery, "PROMPTS_PATH", output_dir / "prompts.json")
+    monkeypatch.setattr(scrape_gallery, "SYNC_STATE_PATH", output_dir / "sync-state.json")
+    monkeypatch.setattr(scrape_gallery, "USER_CACHE_PATH", output_dir / "users.json")
+    monkeypatch.setattr(scrape_gallery, "CHANNEL_CACHE_PATH", output_dir / "channels.json")
+    monkeypatch.setattr(scrape_gallery, "REPORT_PATH", output_dir / "run-report.json")
+
+    assert scrape_gallery.main([]) == 0
+    assert json.loads((output_dir / "channels.json").read_text()) == {"T0FAKE/drawma": "C001"}
+    state = json.loads((output_dir / "sync-state.json").read_text())
+    assert state["watermark"] == "1706918500.000000"
+    fake_slack.calls.clear()
+
+    assert scrape_gallery.main([]) == 0
+
+    methods = [m for m, _ in fake_slack.calls]
+    # The channel comes from the cache, confirmed with a single call
+    assert "conversations_list" not in methods
+    assert methods.count("conversations_info") == 1
+    history = [params for m, params in fake_slack.calls if m == "conversations_history"]
+    assert len(history) == 1
+    assert "oldest" in history[0]
+    # Prompts still come from the store, not from a full history read
+    assert json.loads((output_dir / "prompts.json").read_text()) == ["Draw a surreal fish"]
+
+
+def test_post_to_slack_end_to_end(fake_slack):
+    from src.slack_poster import post_to_slack
+
+    assert post_to_slack("Hello fish", "#drawma", "xoxb-fake") is True
+    assert fake_slack.posted[0]["text"] == "Hello fish"
+    assert fake_slack.posted[0]["channel"] == "#drawma"
+
+
+def test_post_to_slack_async_end_to_end(fake_slack):
+    """The AsyncWebClient path talks to the same API."""
+    import asyncio
+
+    from src.slack_poster import post_to_slack_async
+
+    assert asyncio.run(post_to_slack_async("Async fish", "#drawma", "xoxb-fake")) is True
+    assert fake_slack.posted[0]["text"] == "Async fish"
+
+
+def test_file_upload_end_to_end(fake_slack):
+    """files_upload_v2 runs its full three-step flow against the fake."""
+    client = WebClient(token="xoxb-fake", base_url=fake_slack.api_url)
+    client.files_upload_v2(channel="C001", content=b"MThd", filename="melody.mid",
+                           initial_comment="Melody", thread_ts="123.456")
+
+    assert len(fake_slack.uploads) == 1
+    assert fake_slack.uploads[0]["filename"] == "melody.mid"
+    assert fake_slack.uploads[0]["thread_ts"] == "123.456"
+
+
+def test_rate_limits_are_retried():
+    """Simulated 429s are absorbed by the rate-limited client."""
+    slept = []
+    with FakeSlack(_fixture(), rate_limit_every=2, retry_after=7) as fake:
+        client = RateLimitedClient(WebClient(token="xoxb-fake", base_url=fake.api_url),
+                                   sleep=slept.append)
+        for _ in range(3):
+            assert client.users_info(user="U123")["user"]["profile"]["display_name"] == "jake"
+
+    assert client.stats["users_info"]["retries"] == 2
+    assert 7.0 in slept
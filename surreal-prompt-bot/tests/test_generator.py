@@ -56,7 +56,7 @@ def test_generate_prompt_calls_huggingface():
         f.flush()
         template_path = Path(f.name)
 
-    with patch("src.generator.InferenceClient", return_value=mock_client):
+    with patch("huggingface_hub.InferenceClient", return_value=mock_client):
         result = generate_prompt(
             headlines=["Test headline"],
             inspirations=["test style"],
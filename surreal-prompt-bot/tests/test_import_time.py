@@ -0,0 +1,31 @@
+"""Import-time budget: heavy dependencies load on first use, not at startup."""
+from pathlib import Path
+
+from bot_core.importtime import import_times
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# The prompt bot's expensive imports: the Hugging Face client for the prompt,
+# aiohttp for --async scraping and the Slack SDK for posting
+BOT_DEFERRED = ["huggingface_hub", "aiohttp", "slack_sdk", "asyncio"]
+
+# The gallery scraper needs Pillow only when it renders variants
+GALLERY_DEFERRED = ["PIL"]
+
+# Cumulative microseconds for `import bot` (about 50ms with the deferrals above)
+BUDGET_US = 300_000
+
+
+def test_bot_defers_heavy_dependencies():
+    times = import_times("bot", PROJECT_DIR)
+    assert [name for name in BOT_DEFERRED if name in times] == []
+
+
+def test_bot_import_within_budget():
+    times = import_times("bot", PROJECT_DIR)
+    assert times["bot"] < BUDGET_US, f"import bot took {times['bot'] / 1000:.0f}ms"
+
+
+def test_gallery_scraper_defers_pillow():
+    times = import_times("scrape_gallery", PROJECT_DIR)
+    assert [name for name in GALLERY_DEFERRED if name in times] == []
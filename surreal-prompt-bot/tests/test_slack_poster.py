@@ -11,7 +11,7 @@ def test_post_to_slack_sends_message():
     mock_client = MagicMock()
     mock_client.chat_postMessage.return_value = {"ok": True, "ts": "123"}
 
-    with patch("src.slack_poster.WebClient", return_value=mock_client):
+    with patch("slack_sdk.WebClient", return_value=mock_client):
         result = post_to_slack(
             message="Test message",
             channel="#test",
@@ -30,7 +30,7 @@ def test_post_to_slack_handles_error():
     mock_client = MagicMock()
     mock_client.chat_postMessage.side_effect = Exception("API error")
 
-    with patch("src.slack_poster.WebClient", return_value=mock_client):
+    with patch("slack_sdk.WebClient", return_value=mock_client):
         result = post_to_slack(
             message="Test",
             channel="#test",